@@ -37,10 +37,20 @@ class GlobalArgs(BaseModel):
     host: str = constants.MIS_HOST
     port: int = envs.MIS_PORT
     enable_dos_protection: bool = envs.MIS_ENABLE_DOS_PROTECTION
+    enable_admin_api: bool = envs.MIS_ENABLE_ADMIN_API
+    enable_metrics: bool = envs.MIS_ENABLE_METRICS
+    enable_load_report: bool = envs.MIS_ENABLE_LOAD_REPORT
     log_level: str = envs.MIS_LOG_LEVEL
     max_log_len: Optional[int] = envs.MIS_MAX_LOG_LEN
+    access_log_sample_rate: float = envs.MIS_ACCESS_LOG_SAMPLE_RATE
+    loop_stall_threshold_ms: int = envs.MIS_LOOP_STALL_THRESHOLD_MS
+    trace_sample_rate: float = envs.MIS_TRACE_SAMPLE_RATE
+    trace_exporter: str = envs.MIS_TRACE_EXPORTER
+    trace_otlp_endpoint: str = envs.MIS_TRACE_OTLP_ENDPOINT
+    trace_trust_parent: bool = envs.MIS_TRACE_TRUST_PARENT
     disable_log_requests: bool = constants.MIS_DISABLE_LOG_REQUESTS
-    disable_log_stats: bool = constants.MIS_DISABLE_LOG_STATS
+    # Engine stats are only collected when they are re-exported by the metrics endpoint
+    disable_log_stats: bool = constants.MIS_DISABLE_LOG_STATS and not envs.MIS_METRICS_ENGINE_STATS
 
     uvicorn_log_level: str = envs.UVICORN_LOG_LEVEL
 
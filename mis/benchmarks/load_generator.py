@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+"""Load generator replaying chat completion requests against a MIS endpoint.
+
+Every line of the request file is a chat completion body, e.g. {"messages": [{"role": "user", "content": "Hi"}]},
+or {"prompt": "Hi"} for a single user message. An optional "timestamp" (seconds from the start of the trace) times
+the trace arrivals and is not sent. Missing "model" and "max_tokens" are filled in from the options.
+
+Arrivals are open-loop, either a Poisson process at `--rate` requests/sec or the trace timestamps, so a slow server
+builds a queue instead of slowing the load down, or closed-loop with a fixed number of concurrent clients, run once
+per value of `--concurrency`. Each run reports the throughput, the time to first token, the inter-token latency and
+the end-to-end latency percentiles, and the failed requests per status code.
+
+Usage:
+    python -m mis.benchmarks.load_generator --url http://127.0.0.1:8000 --requests chat.jsonl \
+        --arrival poisson --rate 20 --num-requests 1000 --output results.json
+    python -m mis.benchmarks.load_generator --requests chat.jsonl --arrival closed --concurrency 1,8,32,128
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import aiohttp
+
+CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+PERCENTILES = (50, 90, 99)
+ARRIVALS = ("poisson", "trace", "closed")
+
+
+@dataclass
+class RequestResult:
+    """Outcome and timings of one request, times are in seconds"""
+    status: int
+    latency: float
+    ttft: Optional[float] = None
+    inter_token_latencies: List[float] = field(default_factory=list)
+    output_tokens: int = 0
+    error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == 200 and self.error is None
+
+
+def load_requests(path: str, model: str, max_tokens: int) -> List[Dict]:
+    """
+    Read the chat completion bodies of a request file.
+    Args:
+        path (str): The JSONL request file.
+        model (str): The model name used for bodies without one.
+        max_tokens (int): The max_tokens used for bodies without one.
+    Returns:
+        List[Dict]: The request bodies, in file order.
+    """
+    bodies = []
+    with open(path, "r", encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            body = json.loads(line)
+            if "messages" not in body:
+                if "prompt" not in body:
+                    raise ValueError(f"Line {number} of {path} has neither messages nor prompt")
+                body["messages"] = [{"role": "user", "content": body.pop("prompt")}]
+            body.setdefault("model", model)
+            body.setdefault("max_tokens", max_tokens)
+            bodies.append(body)
+    if not bodies:
+        raise ValueError(f"No request in {path}")
+    return bodies
+
+
+def poisson_offsets(count: int, rate: float, rng: random.Random) -> List[float]:
+    """Send times of `count` requests arriving as a Poisson process of `rate` requests/sec."""
+    offsets, now = [], 0.0
+    for _ in range(count):
+        offsets.append(now)
+        now += rng.expovariate(rate)
+    return offsets
+
+
+def trace_offsets(bodies: List[Dict], time_scale: float) -> List[float]:
+    """Send times taken from the trace timestamps, relative to the first one and divided by `time_scale`."""
+    timestamps = [float(body.get("timestamp", 0.0)) for body in bodies]
+    start = min(timestamps)
+    return [(timestamp - start) / time_scale for timestamp in timestamps]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Percentile with linear interpolation between the closest ranks, None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def _distribution(values: List[float]) -> Dict[str, Optional[float]]:
+    """Mean and percentiles of latencies in milliseconds."""
+    summary = {"mean": sum(values) / len(values) * 1000 if values else None}
+    for q in PERCENTILES:
+        value = percentile(values, q)
+        summary[f"p{q}"] = value * 1000 if value is not None else None
+    return summary
+
+
+def summarize(results: List[RequestResult], duration: float) -> Dict:
+    """
+    Aggregate the results of one run.
+    Args:
+        results (List[RequestResult]): The results of every request of the run.
+        duration (float): Wall time of the run in seconds.
+    Returns:
+        Dict: Counts, throughput and latency distributions in milliseconds.
+    """
+    succeeded = [result for result in results if result.succeeded]
+    failures: Dict[str, int] = {}
+    for result in results:
+        if not result.succeeded:
+            key = str(result.status) if result.error is None else f"{result.status}:{result.error}"
+            failures[key] = failures.get(key, 0) + 1
+    output_tokens = sum(result.output_tokens for result in succeeded)
+    return {
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "failures": failures,
+        "failure_rate": (len(results) - len(succeeded)) / len(results) if results else 0.0,
+        "duration_in_sec": duration,
+        "request_throughput": len(succeeded) / duration if duration > 0 else 0.0,
+        "output_token_throughput": output_tokens / duration if duration > 0 else 0.0,
+        "ttft_ms": _distribution([result.ttft for result in succeeded if result.ttft is not None]),
+        "itl_ms": _distribution([gap for result in succeeded for gap in result.inter_token_latencies]),
+        "e2e_ms": _distribution([result.latency for result in succeeded]),
+    }
+
+
+async def send_request(session: aiohttp.ClientSession, url: str, body: Dict, stream: bool) -> RequestResult:
+    """
+    Send one chat completion request and time it.
+    Args:
+        session (aiohttp.ClientSession): The HTTP session.
+        url (str): The chat completions URL.
+        body (Dict): The request body.
+        stream (bool): Whether the response is streamed, only streams measure the token timings.
+    Returns:
+        RequestResult: The outcome of the request.
+    """
+    payload = {key: value for key, value in body.items() if key != "timestamp"}
+    # MIS does not accept stream_options, streamed output tokens are counted as content chunks
+    payload["stream"] = stream
+    start = time.perf_counter()
+    try:
+        async with session.post(url, json=payload) as response:
+            if response.status != 200:
+                await response.read()
+                return RequestResult(status=response.status, latency=time.perf_counter() - start)
+            if not stream:
+                content = await response.json()
+                return RequestResult(status=200, latency=time.perf_counter() - start,
+                                     output_tokens=content.get("usage", {}).get("completion_tokens", 0))
+            return await _read_stream(response, start)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return RequestResult(status=0, latency=time.perf_counter() - start, error=type(e).__name__)
+
+
+async def _read_stream(response: aiohttp.ClientResponse, start: float) -> RequestResult:
+    result = RequestResult(status=200, latency=0.0)
+    last_token_at = None
+    async for line in response.content:
+        line = line.strip()
+        if not line.startswith(b"data: "):
+            continue
+        data = line[len(b"data: "):]
+        if data == b"[DONE]":
+            break
+        chunk = json.loads(data)
+        if "error" in chunk:
+            result.error = "stream_error"
+            break
+        if not any(choice.get("delta", {}).get("content") for choice in chunk.get("choices", [])):
+            continue
+        now = time.perf_counter()
+        result.output_tokens += 1
+        if last_token_at is None:
+            result.ttft = now - start
+        else:
+            result.inter_token_latencies.append(now - last_token_at)
+        last_token_at = now
+    result.latency = time.perf_counter() - start
+    return result
+
+
+def _session(concurrency: int, timeout_in_sec: float) -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency),
+                                 timeout=aiohttp.ClientTimeout(total=timeout_in_sec))
+
+
+async def run_open_loop(url: str, bodies: List[Dict], offsets: List[float], stream: bool,
+                        timeout_in_sec: float) -> Dict:
+    """Send every request at its offset from the start of the run, whatever the number of requests in flight."""
+    async with _session(0, timeout_in_sec) as session:
+        start = time.perf_counter()
+
+        async def send_at(body: Dict, offset: float) -> RequestResult:
+            await asyncio.sleep(max(start + offset - time.perf_counter(), 0))
+            return await send_request(session, url, body, stream)
+
+        results = await asyncio.gather(*(send_at(body, offset) for body, offset in zip(bodies, offsets)))
+        return summarize(list(results), time.perf_counter() - start)
+
+
+async def run_closed_loop(url: str, bodies: List[Dict], concurrency: int, stream: bool,
+                          timeout_in_sec: float) -> Dict:
+    """Send the requests from `concurrency` clients, each sending its next request when the previous one ends."""
+    async with _session(concurrency, timeout_in_sec) as session:
+        start = time.perf_counter()
+        pending = iter(bodies)
+        results: List[RequestResult] = []
+
+        async def client() -> None:
+            for body in pending:
+                results.append(await send_request(session, url, body, stream))
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return summarize(results, time.perf_counter() - start)
+
+
+def _print_run(name: str, summary: Dict) -> None:
+    def row(label: str, distribution: Dict) -> str:
+        values = " ".join(f"{key}={value:.1f}" if value is not None else f"{key}=n/a"
+                          for key, value in distribution.items())
+        return f"  {label:<5} ms: {values}"
+
+    print(f"{name}: {summary['succeeded']}/{summary['requests']} succeeded in {summary['duration_in_sec']:.1f}s, "
+          f"{summary['request_throughput']:.2f} req/s, {summary['output_token_throughput']:.1f} tokens/s")
+    if summary["failures"]:
+        print(f"  failures: {summary['failures']} ({summary['failure_rate']:.2%})")
+    for label, key in (("TTFT", "ttft_ms"), ("ITL", "itl_ms"), ("E2E", "e2e_ms")):
+        print(row(label, summary[key]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay chat completion requests against a MIS endpoint")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the MIS server")
+    parser.add_argument("--requests", required=True, help="JSONL file of chat completion bodies")
+    parser.add_argument("--model", default="Qwen3-8B", help="Model name of bodies without one")
+    parser.add_argument("--max-tokens", type=int, default=128, help="max_tokens of bodies without one")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="poisson", help="Arrival process of the requests")
+    parser.add_argument("--rate", type=float, default=10.0, help="Poisson arrival rate in requests/sec")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Speedup of the trace timestamps")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma separated closed-loop client counts")
+    parser.add_argument("--num-requests", type=int, default=None,
+                        help="Requests per run, the file is cycled. Default is one pass over the file")
+    parser.add_argument("--no-stream", action="store_true", help="Send non-streaming requests, without TTFT/ITL")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Timeout of one request in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the Poisson arrivals")
+    parser.add_argument("--output", default=None, help="JSON file the results are written to")
+    options = parser.parse_args()
+    if options.rate <= 0 or options.time_scale <= 0:
+        parser.error("--rate and --time-scale must be positive")
+
+    bodies = load_requests(options.requests, options.model, options.max_tokens)
+    count = options.num_requests or len(bodies)
+    if options.arrival == "trace":
+        # The trace timestamps are only replayed once
+        count = min(count, len(bodies))
+    bodies = [bodies[index % len(bodies)] for index in range(count)]
+    url = options.url.rstrip("/") + CHAT_COMPLETIONS_PATH
+    stream = not options.no_stream
+    runs = {}
+    if options.arrival == "closed":
+        for concurrency in (int(value) for value in options.concurrency.split(",")):
+            runs[f"concurrency={concurrency}"] = asyncio.run(
+                run_closed_loop(url, bodies, concurrency, stream, options.timeout))
+            _print_run(f"concurrency={concurrency}", runs[f"concurrency={concurrency}"])
+    else:
+        if options.arrival == "poisson":
+            name = f"poisson rate={options.rate}"
+            offsets = poisson_offsets(count, options.rate, random.Random(options.seed))
+        else:
+            name = f"trace time_scale={options.time_scale}"
+            offsets = trace_offsets(bodies, options.time_scale)
+        runs[name] = asyncio.run(run_open_loop(url, bodies, offsets, stream, options.timeout))
+        _print_run(name, runs[name])
+
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            json.dump({"options": vars(options), "runs": runs}, file, indent=2)
+        print(f"Results written to {options.output}")
+
+
+if __name__ == "__main__":
+    main()
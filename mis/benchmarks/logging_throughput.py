@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+"""Throughput benchmark of the MIS logging subsystem.
+
+The loggers are real MIS loggers writing to a temporary log directory, the console handler writes to os.devnull.
+Measured are:
+    init_logger:             loggers set up per second, new names sharing the handlers of one log directory
+    enabled.<level>:         records/sec of EnhancedLogger until the records are written by the log writer thread,
+                             and the cost of a call on the calling thread, the cost a request handler sees
+    disabled.<level>:        the cost of a call whose level is disabled, with one lazily formatted argument
+    filter_invalid_chars:    _filter_invalid_chars calls per second for clean messages and messages with control chars
+    rotating_file_handler:   records/sec written by RotatingFileWithArchiveHandler without and with rollover
+The best of the rounds is reported. The results are printed as JSON with sorted keys. `--max-disabled-ns` makes the
+benchmark exit with status 1 when a disabled call costs more, so a logging change can be held to that budget.
+
+Usage:
+    python -m mis.benchmarks.logging_throughput --records 50000 --max-disabled-ns 500 --output logging.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional
+
+from mis import logger as mis_logger
+from mis.logger import (AsyncStreamHandler, EnhancedLogger, LogType, RotatingFileWithArchiveHandler, _DATE_FORMAT,
+                        _FORMAT, _filter_invalid_chars, flush_logs, init_logger)
+
+LEVELS = ("debug", "info", "warning", "error", "critical")
+LOGGER_NAME = "mis.benchmark.logging"
+MESSAGE = "[IP: 127.0.0.1] 200 Chat completion request finished, prompt tokens: 512, completion tokens: 128"
+CONTROL_CHARS_MESSAGE = "Invalid parameter:\n\tmax_tokens\r\nexpected an integer\x07 got a string"
+ROLLOVER_MAX_BYTES = 1024 * 1024
+
+
+def _best_ns_per_call(function: Callable[[int], None], calls: int, rounds: int) -> float:
+    """Run `function(calls)` for each round and return the best nanoseconds per call"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        function(calls)
+        elapsed = (time.perf_counter_ns() - start) / calls
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _rate(ns_per_call: float) -> Dict[str, float]:
+    return {"calls_per_sec": round(1e9 / ns_per_call, 2), "ns_per_call": round(ns_per_call, 2)}
+
+
+def _setup_logger(log_dir: str) -> EnhancedLogger:
+    """Set up the benchmark logger, its console handler writes to os.devnull"""
+    enhanced_logger = init_logger(LOGGER_NAME, log_dir=log_dir, log_type=LogType.SERVICE)
+    for handler in enhanced_logger.logger.handlers:
+        if isinstance(handler, AsyncStreamHandler):
+            handler.setStream(open(os.devnull, "w", encoding="utf-8"))
+    return enhanced_logger
+
+
+def _set_level(enhanced_logger: EnhancedLogger, level: int) -> None:
+    enhanced_logger.logger.setLevel(level)
+    for handler in enhanced_logger.logger.handlers:
+        handler.setLevel(level)
+
+
+def bench_init_logger(log_dir: str, calls: int, rounds: int) -> Dict[str, float]:
+    counter = iter(range(sys.maxsize))
+
+    def setup(count: int) -> None:
+        for _ in range(count):
+            init_logger(f"{LOGGER_NAME}.init{next(counter)}", log_dir=log_dir, log_type=LogType.SERVICE)
+
+    return _rate(_best_ns_per_call(setup, calls, rounds))
+
+
+def bench_enabled_levels(enhanced_logger: EnhancedLogger, records: int, rounds: int) -> Dict[str, Dict[str, Any]]:
+    """Measure the enabled levels, in batches small enough for the log queue so no record is dropped"""
+    writer = mis_logger._get_async_log_writer()
+    # Every record is queued once per handler
+    batch = max(writer.queue_size // (2 * len(enhanced_logger.logger.handlers)), 1) if writer else records
+    _set_level(enhanced_logger, logging.DEBUG)
+    results = {}
+    for level in LEVELS:
+        log = getattr(enhanced_logger, level)
+        best_total = best_caller = None
+        for _ in range(rounds):
+            caller_ns = 0
+            start = time.perf_counter_ns()
+            for offset in range(0, records, batch):
+                batch_start = time.perf_counter_ns()
+                for _ in range(min(batch, records - offset)):
+                    log(MESSAGE)
+                caller_ns += time.perf_counter_ns() - batch_start
+                flush_logs()
+            total_ns = time.perf_counter_ns() - start
+            best_total = total_ns if best_total is None else min(best_total, total_ns)
+            best_caller = caller_ns if best_caller is None else min(best_caller, caller_ns)
+        results[level] = {"records_per_sec": round(records / best_total * 1e9, 2),
+                          "caller_ns_per_record": round(best_caller / records, 2)}
+    return results
+
+
+def bench_disabled_levels(enhanced_logger: EnhancedLogger, calls: int, rounds: int) -> Dict[str, Dict[str, float]]:
+    _set_level(enhanced_logger, logging.CRITICAL + 10)
+    results = {}
+    for level in LEVELS:
+        log = getattr(enhanced_logger, level)
+
+        def call(count: int) -> None:
+            for index in range(count):
+                log("Request %s finished", index)
+
+        results[level] = _rate(_best_ns_per_call(call, calls, rounds))
+    return results
+
+
+def bench_filter_invalid_chars(calls: int, rounds: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, message in (("clean", MESSAGE), ("control_chars", CONTROL_CHARS_MESSAGE)):
+        def call(count: int, text: str = message) -> None:
+            for _ in range(count):
+                _filter_invalid_chars(text)
+
+        results[name] = _rate(_best_ns_per_call(call, calls, rounds))
+    return results
+
+
+def bench_rotating_file_handler(log_dir: str, records: int, rounds: int,
+                                max_bytes: int = ROLLOVER_MAX_BYTES) -> Dict[str, Dict[str, Any]]:
+    """Measure the writes of the handler on the calling thread, like the log writer thread does them"""
+    record = logging.makeLogRecord({"name": LOGGER_NAME, "levelno": logging.INFO, "levelname": "INFO",
+                                    "filename": "api_server.py", "lineno": 1, "funcName": "create_chat_completions",
+                                    "msg": MESSAGE})
+    # The handler opens its file before checking its directory, like LogManager the directory is created first
+    os.makedirs(log_dir, mode=mis_logger.DIRECTORY_PERMISSIONS, exist_ok=True)
+    results = {}
+    for name, handler_max_bytes in (("no_rollover", 0), ("rollover", max_bytes)):
+        filepath = os.path.join(log_dir, f"{mis_logger.MIS_LOG_PREFIX}benchmark_{name}.log")
+        handler = RotatingFileWithArchiveHandler(filepath, max_bytes=handler_max_bytes,
+                                                 backup_count=mis_logger.MIS_MAX_ARCHIVE_COUNT, log_dir=log_dir)
+        handler.setFormatter(logging.Formatter(_FORMAT, _DATE_FORMAT))
+        rollovers = 0
+        do_rollover = handler.doRollover
+
+        def counting_rollover() -> None:
+            nonlocal rollovers
+            rollovers += 1
+            do_rollover()
+
+        handler.doRollover = counting_rollover
+
+        def write(count: int) -> None:
+            for _ in range(count):
+                handler.write_record(record)
+
+        try:
+            ns_per_record = _best_ns_per_call(write, records, rounds)
+            mis_logger._get_log_archiver().join()
+        finally:
+            handler.close()
+        results[name] = {"records_per_sec": round(1e9 / ns_per_record, 2), "ns_per_record": round(ns_per_record, 2),
+                         "rollovers": rollovers}
+    return results
+
+
+def run(records: int = 50000, rounds: int = 3, max_disabled_ns: Optional[float] = None) -> Dict[str, Any]:
+    """Run the benchmark
+    Args:
+        records (int): Number of records or calls per round of each case, init_logger is called records / 100 times.
+        rounds (int): Number of rounds, the best round is reported.
+        max_disabled_ns (float): Budget of a call of a disabled level in nanoseconds. Default is None, no budget.
+    Returns:
+        Dict[str, Any]: The environment, the parameters, the results and the levels over the budget.
+    """
+    if records <= 0 or rounds <= 0:
+        raise ValueError("records and rounds must be positive")
+    writer = mis_logger._get_async_log_writer()
+    with tempfile.TemporaryDirectory() as directory:
+        log_dir = os.path.join(directory, "log")
+        enhanced_logger = _setup_logger(log_dir)
+        results = {
+            "init_logger": bench_init_logger(log_dir, max(records // 100, 1), rounds),
+            "enabled": bench_enabled_levels(enhanced_logger, records, rounds),
+            "disabled": bench_disabled_levels(enhanced_logger, records, rounds),
+            "filter_invalid_chars": bench_filter_invalid_chars(records, rounds),
+            "rotating_file_handler": bench_rotating_file_handler(log_dir, records, rounds),
+        }
+        flush_logs()
+        for handler in enhanced_logger.logger.handlers:
+            if isinstance(handler, AsyncStreamHandler):
+                handler.stream.close()
+    over_budget = []
+    if max_disabled_ns is not None:
+        over_budget = [level for level, result in results["disabled"].items()
+                       if result["ns_per_call"] > max_disabled_ns]
+    return {
+        "environment": {"python": platform.python_version()},
+        "parameters": {"records": records, "rounds": rounds, "max_disabled_ns": max_disabled_ns,
+                       "log_queue_size": writer.queue_size if writer else 0,
+                       "log_overflow_policy": writer.overflow_policy if writer else None,
+                       "rollover_max_bytes": ROLLOVER_MAX_BYTES},
+        "results": results,
+        "over_budget": over_budget,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the throughput of the MIS logging subsystem")
+    parser.add_argument("--records", type=int, default=50000, help="Number of records or calls per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of rounds, the best round is reported")
+    parser.add_argument("--max-disabled-ns", type=float, default=None,
+                        help="Budget of a call of a disabled level in nanoseconds, exceeding it exits with status 1")
+    parser.add_argument("--output", default=None, help="JSON file the results are written to")
+    options = parser.parse_args()
+    results = run(options.records, options.rounds, options.max_disabled_ns)
+    content = json.dumps(results, indent=2, sort_keys=True)
+    print(content)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(content + "\n")
+    if results["over_budget"]:
+        print(f"Disabled levels over the budget of {options.max_disabled_ns} ns: {results['over_budget']}",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
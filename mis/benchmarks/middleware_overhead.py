@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+"""Microbenchmark of the middleware and request validation hot path.
+
+Chat completion requests are sent to the ASGI app in-process, `await app(scope, receive, send)` without a socket or
+an engine, the endpoint only reads the body. Every middleware is measured alone in front of the endpoint and the
+full stack is built by the same launcher functions as the service. `MISChatCompletionRequest(**body)` is measured
+separately. Each case runs for small, medium and large payloads and reports:
+    us_per_request:  median over the rounds of the mean time of a request in microseconds
+    overhead_us:     us_per_request minus the one of the app without middleware, for the same payload
+    peak_bytes:      median of the traced peak memory above the start of a request (tracemalloc)
+    retained_bytes:  traced memory still allocated after the requests, divided by the number of requests
+The rate limit is lifted after the first request, so every request takes the admitted path. The results are printed
+as JSON with sorted keys, so runs can be diffed and compared by tools.
+
+Usage:
+    python -m mis.benchmarks.middleware_overhead --requests 2000 --rounds 5 --output overhead.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import fastapi
+import starlette
+from fastapi import FastAPI, Request, Response
+
+from mis import constants
+from mis.args import GlobalArgs
+from mis.llm.entrypoints import launcher
+from mis.llm.entrypoints.access_log import AccessLogMiddleware, AccessRecorder
+from mis.llm.entrypoints.middleware import (DEFAULT_ADMISSION_POOLS, DEFAULT_ROUTE_LIMITS, ConcurrencyLimitMiddleware,
+                                            RateLimitConfig, RateLimitMiddleware, RequestHeaderSizeLimitMiddleware,
+                                            RequestSizeLimitMiddleware, RequestTimeoutMiddleware, find_middleware)
+from mis.llm.entrypoints.openai.api_extensions import MISChatCompletionRequest
+
+CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+CLIENT = ("127.0.0.1", 50000)
+UNLIMITED_REQUESTS_PER_MINUTE = 2 ** 62
+ALLOCATION_SAMPLES = 50
+# Name: (number of messages, characters per message)
+PAYLOADS = {
+    "small": (1, 128),
+    "medium": (8, 1024),
+    "large": (32, 8192),
+}
+_RESPONSE_CONTENT = b'{"id":"chatcmpl-benchmark","object":"chat.completion","choices":[]}'
+
+
+async def _endpoint(request: Request) -> Response:
+    await request.body()
+    return Response(_RESPONSE_CONTENT, media_type="application/json")
+
+
+def _add_rate_limit(app: FastAPI) -> None:
+    app.add_middleware(RateLimitMiddleware, config=RateLimitConfig(), route_limits=DEFAULT_ROUTE_LIMITS)
+
+
+def _add_full_stack(app: FastAPI) -> None:
+    """The middlewares of `launcher._build_app`, in the same order"""
+    launcher._add_middlewares(GlobalArgs(), app)
+    launcher._add_exception_handlers(app)
+    launcher._add_restrict_host_middleware(app)
+    app.add_middleware(AccessLogMiddleware, recorder=AccessRecorder())
+
+
+# Name: function adding the middleware of the case to the app
+CASES: Dict[str, Callable[[FastAPI], None]] = {
+    "baseline": lambda app: None,
+    "header_size_limit": lambda app: app.add_middleware(RequestHeaderSizeLimitMiddleware,
+                                                        max_header_size=constants.MAX_REQUEST_HEADER_SIZE),
+    "request_size_limit": lambda app: app.add_middleware(RequestSizeLimitMiddleware,
+                                                         max_body_size=constants.MAX_REQUEST_BODY_SIZE),
+    "concurrency_limit": lambda app: app.add_middleware(ConcurrencyLimitMiddleware,
+                                                        max_concurrent_requests=constants.MAX_CONCURRENT_REQUESTS,
+                                                        pools=DEFAULT_ADMISSION_POOLS,
+                                                        route_limits=DEFAULT_ROUTE_LIMITS),
+    "rate_limit": _add_rate_limit,
+    "request_timeout": lambda app: app.add_middleware(RequestTimeoutMiddleware,
+                                                      request_timeout_in_sec=constants.REQUEST_TIMEOUT_IN_SEC,
+                                                      route_limits=DEFAULT_ROUTE_LIMITS),
+    "restrict_host": launcher._add_restrict_host_middleware,
+    "access_log": lambda app: app.add_middleware(AccessLogMiddleware, recorder=AccessRecorder()),
+    "full_stack": _add_full_stack,
+}
+
+
+def build_body(messages: int, characters: int) -> Dict[str, Any]:
+    """
+    Build a chat completion body.
+    Args:
+        messages (int): Number of messages, alternating between user and assistant and ending with a user message.
+        characters (int): Characters of the content of each message.
+    Returns:
+        Dict[str, Any]: The chat completion body.
+    """
+    roles = ("user", "assistant")
+    return {
+        "model": "Qwen3-8B",
+        "messages": [{"role": roles[(messages - 1 - index) % 2], "content": "x" * characters}
+                     for index in range(messages)],
+        "max_tokens": 128,
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "stream": False,
+    }
+
+
+def build_app(case: str) -> FastAPI:
+    """
+    Build the app of a benchmark case, must be called in a running event loop.
+    Args:
+        case (str): The case name, a key of CASES.
+    Returns:
+        FastAPI: The app with the middlewares of the case in front of the endpoint.
+    """
+    app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None, redirect_slashes=False)
+    app.add_api_route(CHAT_COMPLETIONS_PATH, _endpoint, methods=["POST"])
+    CASES[case](app)
+    return app
+
+
+async def send_request(app: FastAPI, body: bytes) -> int:
+    """
+    Send one request to the app in-process.
+    Args:
+        app (FastAPI): The ASGI app.
+        body (bytes): The request body.
+    Returns:
+        int: The status code of the response.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": CHAT_COMPLETIONS_PATH,
+        "raw_path": CHAT_COMPLETIONS_PATH.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", f"{constants.MIS_HOST}:8000".encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())],
+        "client": CLIENT,
+        "server": (constants.MIS_HOST, 8000),
+        "state": {},
+    }
+    status = []
+    body_received = False
+    response_complete = asyncio.Event()
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal body_received
+        if not body_received:
+            body_received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Like a server, the client only disconnects after the response
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_complete.set()
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def _measure_app(app: FastAPI, body: bytes, requests: int, rounds: int) -> Tuple[List[float], List[int], float]:
+    for _ in range(max(requests // 10, 1)):
+        await send_request(app, body)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await send_request(app, body)
+        timings.append((time.perf_counter() - start) / requests * 1e6)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(ALLOCATION_SAMPLES):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            await send_request(app, body)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(requests):
+            await send_request(app, body)
+        gc.collect()
+        retained = (tracemalloc.get_traced_memory()[0] - before) / requests
+    finally:
+        tracemalloc.stop()
+    return timings, peaks, retained
+
+
+async def _run_case(case: str, bodies: Dict[str, bytes], requests: int, rounds: int) -> Dict[str, Dict[str, Any]]:
+    app = build_app(case)
+    results = {}
+    for payload, body in bodies.items():
+        status = await send_request(app, body)
+        if status != 200:
+            raise RuntimeError(f"Case {case} answered the {payload} payload with status {status}")
+        # The budget of the service allows 60 requests/min, lift it to measure the admitted path
+        rate_limit = find_middleware(app, RateLimitMiddleware)
+        if rate_limit is not None:
+            rate_limit.set_requests_per_minute(UNLIMITED_REQUESTS_PER_MINUTE)
+        timings, peaks, retained = await _measure_app(app, body, requests, rounds)
+        results[payload] = {"us_per_request": statistics.median(timings),
+                            "peak_bytes": statistics.median(peaks),
+                            "retained_bytes": retained}
+    rate_limit = find_middleware(app, RateLimitMiddleware)
+    if rate_limit is not None:
+        await rate_limit.shutdown()
+    return results
+
+
+def _measure_validation(body: Dict[str, Any], requests: int, rounds: int) -> Dict[str, float]:
+    for _ in range(max(requests // 10, 1)):
+        MISChatCompletionRequest(**body)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            MISChatCompletionRequest(**body)
+        timings.append((time.perf_counter() - start) / requests * 1e6)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(ALLOCATION_SAMPLES):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            MISChatCompletionRequest(**body)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return {"us_per_request": statistics.median(timings), "peak_bytes": statistics.median(peaks)}
+
+
+def run(requests: int = 2000, rounds: int = 5, cases: List[str] = None) -> Dict[str, Any]:
+    """Run the benchmark
+    Args:
+        requests (int): Number of requests per round and payload.
+        rounds (int): Number of timed rounds, the median round is reported.
+        cases (List[str]): Names of the middleware cases to run. Default is all cases.
+    Returns:
+        Dict[str, Any]: The environment, the parameters and the results per case and payload.
+    """
+    cases = ["baseline"] + [case for case in (cases or CASES) if case != "baseline"]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown cases {unknown}, choose from {list(CASES)}")
+    if requests <= 0 or rounds <= 0:
+        raise ValueError("requests and rounds must be positive")
+    body_dicts = {payload: build_body(*shape) for payload, shape in PAYLOADS.items()}
+    bodies = {payload: json.dumps(body).encode() for payload, body in body_dicts.items()}
+
+    async def _run_cases() -> Dict[str, Dict[str, Any]]:
+        return {case: await _run_case(case, bodies, requests, rounds) for case in cases}
+
+    middleware = asyncio.run(_run_cases())
+    for case_results in middleware.values():
+        for payload, result in case_results.items():
+            result["overhead_us"] = result["us_per_request"] - middleware["baseline"][payload]["us_per_request"]
+    validation = {payload: _measure_validation(body, requests, rounds) for payload, body in body_dicts.items()}
+    return {
+        "environment": {"python": platform.python_version(), "fastapi": fastapi.__version__,
+                        "starlette": starlette.__version__},
+        "parameters": {"requests": requests, "rounds": rounds, "allocation_samples": ALLOCATION_SAMPLES,
+                       "payload_bytes": {payload: len(body) for payload, body in bodies.items()}},
+        "middleware": _rounded(middleware),
+        "validation": _rounded(validation),
+    }
+
+
+def _rounded(results: Any) -> Any:
+    if isinstance(results, dict):
+        return {key: _rounded(value) for key, value in results.items()}
+    if isinstance(results, float):
+        return round(results, 2)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the per-request cost of the MIS middlewares")
+    parser.add_argument("--requests", type=int, default=2000, help="Number of requests per round and payload")
+    parser.add_argument("--rounds", type=int, default=5, help="Number of rounds, the median round is reported")
+    parser.add_argument("--cases", default=None, help=f"Comma separated cases, from {','.join(CASES)}")
+    parser.add_argument("--output", default=None, help="JSON file the results are written to")
+    options = parser.parse_args()
+    results = run(options.requests, options.rounds, options.cases.split(",") if options.cases else None)
+    content = json.dumps(results, indent=2, sort_keys=True)
+    print(content)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(content + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+"""Throughput benchmark of the streaming path of chat completions.
+
+Synthetic SSE chunk streams, serialized by the vLLM protocol models like `OpenAIServingChat` does, are fed through
+`_align_streaming_response` and `StreamingResponse` into an in-process ASGI client, for several numbers of concurrent
+streams. The engine side yields to the event loop after every chunk, so the streams interleave like engine outputs.
+vLLM only sets stop_reason in the last chunk of a stream, `--stop-reason every` sets it in every chunk (the default),
+which makes every chunk take the parse and re-serialize path of the alignment.
+
+Each mode is measured for every concurrency:
+    align:        the chunks go through `_align_streaming_response`, like the service
+    passthrough:  the chunks go straight into `StreamingResponse`, the cost of the ASGI plumbing alone
+and reports the chunks/sec received by the clients and the CPU time per token in microseconds. The results are
+printed as JSON with sorted keys.
+
+Usage:
+    python -m mis.benchmarks.streaming_throughput --concurrency 1,10,100,1000 --tokens 128 --output streaming.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import starlette
+from starlette.responses import StreamingResponse
+from vllm.entrypoints.openai.protocol import (ChatCompletionResponseStreamChoice, ChatCompletionStreamResponse,
+                                              DeltaMessage)
+
+from mis.llm.entrypoints.openai.api_server import STREAM_DONE_CHUNK, _align_streaming_response
+
+MODES = ("align", "passthrough")
+STOP_REASON_CHUNKS = ("every", "final")
+_WORDS = ("the", "model", "inference", "service", "token", "of", "a", "streaming", "response", "is", "to", "and",
+          "Ascend", "request", "latency", "with", "chunk", "in", "throughput", ",", ".", "\n")
+
+
+def build_chunks(tokens: int, stop_reason: str = "every", seed: int = 0) -> List[str]:
+    """
+    Build the SSE chunks of one chat completion stream: the role, one chunk per token, the finish reason and DONE.
+    Args:
+        tokens (int): Number of content chunks.
+        stop_reason (str): "every" to set stop_reason in every chunk, "final" to only set it in the last one.
+        seed (int): Seed of the token texts.
+    Returns:
+        List[str]: The chunks, "data: <json>\n\n" like vLLM.
+    """
+    if stop_reason not in STOP_REASON_CHUNKS:
+        raise ValueError(f"stop_reason must be one of {STOP_REASON_CHUNKS}, got {stop_reason}")
+    rng = random.Random(seed)
+    every = stop_reason == "every"
+
+    def chunk(delta: DeltaMessage, finish_reason: Optional[str] = None, final: bool = False) -> str:
+        choice_fields = {"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish_reason}
+        if every or final:
+            choice_fields["stop_reason"] = None
+        response = ChatCompletionStreamResponse(id="chatcmpl-0123456789abcdef0123456789abcdef",
+                                                object="chat.completion.chunk", created=1760000000,
+                                                model="Qwen3-8B",
+                                                choices=[ChatCompletionResponseStreamChoice(**choice_fields)])
+        return f"data: {response.model_dump_json(exclude_unset=True)}\n\n"
+
+    chunks = [chunk(DeltaMessage(role="assistant", content=""))]
+    for _ in range(tokens):
+        chunks.append(chunk(DeltaMessage(content=" " + rng.choice(_WORDS))))
+    chunks.append(chunk(DeltaMessage(content=""), finish_reason="length", final=True))
+    chunks.append(STREAM_DONE_CHUNK)
+    return chunks
+
+
+def build_app(chunks: List[str], mode: str) -> Callable:
+    """
+    Build the ASGI app streaming the chunks.
+    Args:
+        chunks (List[str]): The chunks of every stream.
+        mode (str): "align" or "passthrough", see MODES.
+    Returns:
+        Callable: The ASGI app.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode}")
+
+    async def engine_stream():
+        for content in chunks:
+            yield content
+            await asyncio.sleep(0)
+
+    async def app(scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        generator = engine_stream()
+        if mode == "align":
+            generator = _align_streaming_response(generator)
+        await StreamingResponse(content=generator, media_type="text/event-stream")(scope, receive, send)
+
+    return app
+
+
+async def consume_stream(app: Callable, body: Optional[List[bytes]] = None) -> Tuple[int, int]:
+    """
+    Request one stream from the app in-process and read it to the end.
+    Args:
+        app (Callable): The ASGI app.
+        body (List[bytes]): Collects the body chunks if given.
+    Returns:
+        Tuple[int, int]: The status code and the number of body chunks received.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/openai/v1/chat/completions",
+        "raw_path": b"/openai/v1/chat/completions",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"127.0.0.1:8000"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    status = []
+    received = 0
+    body_read = False
+    response_complete = asyncio.Event()
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal body_read
+        if not body_read:
+            body_read = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal received
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        elif message["type"] == "http.response.body":
+            if message.get("body"):
+                received += 1
+                if body is not None:
+                    body.append(message["body"])
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    return status[0], received
+
+
+async def _measure(app: Callable, concurrency: int, tokens: int) -> Dict[str, float]:
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    results = await asyncio.gather(*(consume_stream(app) for _ in range(concurrency)))
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    failed = [status for status, _ in results if status != 200]
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {concurrency} streams failed with status {failed[0]}")
+    chunks = sum(received for _, received in results)
+    return {"chunks_per_sec": chunks / wall, "cpu_us_per_token": cpu / (concurrency * tokens) * 1e6}
+
+
+def run(concurrencies: List[int] = None, tokens: int = 128, rounds: int = 3,
+        stop_reason: str = "every") -> Dict[str, Any]:
+    """Run the benchmark
+    Args:
+        concurrencies (List[int]): Numbers of concurrent streams. Default is 1, 10, 100 and 1000.
+        tokens (int): Number of content chunks per stream.
+        rounds (int): Number of rounds, the median round is reported.
+        stop_reason (str): "every" to set stop_reason in every chunk, "final" to only set it in the last one.
+    Returns:
+        Dict[str, Any]: The environment, the parameters and the results per mode and concurrency.
+    """
+    concurrencies = concurrencies or [1, 10, 100, 1000]
+    if tokens <= 0 or rounds <= 0 or min(concurrencies) <= 0:
+        raise ValueError("concurrencies, tokens and rounds must be positive")
+    chunks = build_chunks(tokens, stop_reason)
+
+    async def _run_modes() -> Dict[str, Dict[str, Dict[str, float]]]:
+        results = {}
+        for mode in MODES:
+            app = build_app(chunks, mode)
+            await _measure(app, 1, tokens)
+            results[mode] = {}
+            for concurrency in concurrencies:
+                measured = [await _measure(app, concurrency, tokens) for _ in range(rounds)]
+                results[mode][str(concurrency)] = {
+                    key: round(statistics.median(result[key] for result in measured), 2)
+                    for key in ("chunks_per_sec", "cpu_us_per_token")
+                }
+        return results
+
+    return {
+        "environment": {"python": platform.python_version(), "starlette": starlette.__version__},
+        "parameters": {"concurrencies": concurrencies, "tokens": tokens, "rounds": rounds,
+                       "stop_reason": stop_reason, "chunk_bytes": round(statistics.mean(map(len, chunks)), 2)},
+        "results": asyncio.run(_run_modes()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the streaming path of MIS chat completions")
+    parser.add_argument("--concurrency", default="1,10,100,1000", help="Comma separated numbers of streams")
+    parser.add_argument("--tokens", type=int, default=128, help="Number of content chunks per stream")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of rounds, the median round is reported")
+    parser.add_argument("--stop-reason", choices=STOP_REASON_CHUNKS, default="every",
+                        help="Chunks carrying the stop_reason field")
+    parser.add_argument("--output", default=None, help="JSON file the results are written to")
+    options = parser.parse_args()
+    concurrencies = [int(value) for value in options.concurrency.split(",")]
+    results = run(concurrencies, options.tokens, options.rounds, options.stop_reason)
+    content = json.dumps(results, indent=2, sort_keys=True)
+    print(content)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(content + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,7 @@ import stat
 
 MIS_MODEL_LIST = ("Qwen3-8B", )
 
-MIS_ENGINE_TYPES = ("vllm",)
+MIS_ENGINE_TYPES = ("vllm", "mock")
 
 MIS_CONFIGS_LIST = ("atlas800ia2-1x32gb-bf16-vllm-default",
                     "atlas800ia2-1x32gb-bf16-vllm-latency",
@@ -34,6 +34,7 @@ MIS_HOST = "127.0.0.1"
 MIS_MAX_CONFIG_SIZE = 1024 * 1024
 
 MIS_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+MIS_LOG_OVERFLOW_POLICIES = ("drop", "block")
 
 MIS_DISABLE_LOG_REQUESTS = True
 
@@ -51,6 +52,86 @@ MAX_REQUEST_BODY_SIZE = 50 * 1024 * 1024
 MAX_CONCURRENT_REQUESTS = 512
 RATE_LIMIT_PER_MINUTE = 60
 REQUEST_TIMEOUT_IN_SEC = 2500
+# Upper bound of the rate limit accepted by the admin API
+MAX_RATE_LIMIT_PER_MINUTE = 6000
+
+# Admission pools of the concurrency limit, requests are classified by estimated prompt tokens
+ADMISSION_BYTES_PER_TOKEN = 4
+ADMISSION_SHORT_PROMPT_MAX_TOKENS = 4096
+ADMISSION_SHORT_POOL_MAX_CONCURRENT = 448
+ADMISSION_LONG_POOL_MAX_CONCURRENT = 64
+ADMISSION_POOL_MAX_QUEUED = 128
+
+# Limits of the lightweight route classes, generation routes use the limits above
+METADATA_ROUTE_MAX_CONCURRENT = 32
+METADATA_ROUTE_RATE_LIMIT_PER_MINUTE = 600
+METADATA_ROUTE_TIMEOUT_IN_SEC = 10
+TOKENIZATION_ROUTE_MAX_CONCURRENT = 64
+TOKENIZATION_ROUTE_RATE_LIMIT_PER_MINUTE = 600
+TOKENIZATION_ROUTE_TIMEOUT_IN_SEC = 30
+ADMIN_ROUTE_MAX_CONCURRENT = 4
+ADMIN_ROUTE_RATE_LIMIT_PER_MINUTE = 60
+# Covers the longest profiling session of the admin API
+ADMIN_ROUTE_TIMEOUT_IN_SEC = 150
+
+# Circuit breaker around the engine client
+CIRCUIT_BREAKER_WINDOW_IN_SEC = 60
+CIRCUIT_BREAKER_MIN_REQUESTS = 20
+CIRCUIT_BREAKER_ERROR_RATE = 0.5
+CIRCUIT_BREAKER_TIMEOUT_RATE = 0.2
+CIRCUIT_BREAKER_OPEN_IN_SEC = 30
+CIRCUIT_BREAKER_HALF_OPEN_MAX_REQUESTS = 3
+# Engine calls time out this much before the request timeout of their route, so the breaker sees the timeout
+ENGINE_CALL_TIMEOUT_MARGIN_IN_SEC = 0.5
+
+# Rejection logging, full lines are logged up to the burst per interval, the rest are aggregated into a summary
+REJECTION_LOG_INTERVAL_IN_SEC = 10
+REJECTION_LOG_BURST = 5
+
+# Access logging, successful requests are aggregated into one summary line per interval
+ACCESS_LOG_INTERVAL_IN_SEC = 60
+ACCESS_LOG_MAX_TRACKED_KEYS = 10000
+ACCESS_LOG_SUMMARY_MAX_ENTRIES = 50
+
+# Minimum interval between automatic flight recorder dumps, e.g. on internal errors
+FLIGHT_RECORDER_DUMP_INTERVAL_IN_SEC = 60
+
+# Event loop monitoring, the loop is probed every interval and stalls log at most one stack per log interval
+LOOP_MONITOR_INTERVAL_IN_SEC = 0.1
+LOOP_STALL_LOG_INTERVAL_IN_SEC = 60
+LOOP_STALL_STACK_DEPTH = 30
+
+# Sampling profiler of the admin API, at most one session runs at a time
+PROFILE_SAMPLE_INTERVAL_IN_SEC = 0.005
+PROFILE_DEFAULT_DURATION_IN_SEC = 10
+PROFILE_MAX_DURATION_IN_SEC = 120
+
+# Memory diagnostics of the admin API, tracemalloc only runs between an explicit start and stop
+TRACEMALLOC_DEFAULT_FRAMES = 1
+TRACEMALLOC_MAX_FRAMES = 64
+MEMORY_REPORT_DEFAULT_LIMIT = 20
+MEMORY_REPORT_MAX_LIMIT = 200
+MEMORY_REPORT_GROUP_BY = ("lineno", "filename", "traceback")
+
+# Load report of the /load endpoint, refreshed in the background so polling it costs no computation
+LOAD_REPORT_INTERVAL_IN_SEC = 0.5
+
+# Mock engine defaults, the mock generates deterministic tokens with simulated latency and capacity
+MOCK_LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "exponential")
+MOCK_MAX_NUM_SEQS = 256
+MOCK_KV_CACHE_TOKENS = 262144
+MOCK_PREFILL_LATENCY_MS = 20.0
+MOCK_PREFILL_MS_PER_TOKEN = 0.05
+MOCK_DECODE_LATENCY_MS = 25.0
+MOCK_MAX_OUTPUT_TOKENS = 256
+MOCK_VOCAB_SIZE = 1024
+
+# Request tracing, spans are exported in the OTLP JSON encoding to a local trace log file or an OTLP/HTTP endpoint
+MIS_TRACE_EXPORTERS = ("file", "otlp")
+TRACE_EXPORT_QUEUE_SIZE = 10000
+TRACE_EXPORT_BATCH_SIZE = 256
+TRACE_EXPORT_INTERVAL_IN_SEC = 5
+TRACE_EXPORT_TIMEOUT_IN_SEC = 5
 
 DIRECTORY_PERMISSIONS = stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP  # 750
 FILE_PERMISSIONS = stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP  # 640
@@ -17,6 +17,7 @@ MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
 See the Mulan PSL v2 for more details.
 -------------------------------------------------------------------------
 """
+import math
 import os
 from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 
@@ -34,8 +35,21 @@ if TYPE_CHECKING:
 
     MIS_PORT: int = 8000
     MIS_ENABLE_DOS_PROTECTION: bool = True
+    MIS_ENABLE_ADMIN_API: bool = False
+    MIS_ENABLE_METRICS: bool = True
+    MIS_METRICS_ENGINE_STATS: bool = False
+    MIS_ENABLE_LOAD_REPORT: bool = True
     MIS_LOG_LEVEL: str = "INFO"
     MIS_MAX_LOG_LEN: Optional[int] = 2048
+    MIS_LOG_QUEUE_SIZE: int = 10000
+    MIS_LOG_OVERFLOW_POLICY: str = "drop"
+    MIS_ACCESS_LOG_SAMPLE_RATE: float = 0.0
+    MIS_FLIGHT_RECORDER_SIZE: int = 0
+    MIS_LOOP_STALL_THRESHOLD_MS: int = 500
+    MIS_TRACE_SAMPLE_RATE: float = 0.0
+    MIS_TRACE_EXPORTER: str = "file"
+    MIS_TRACE_OTLP_ENDPOINT: str = "http://127.0.0.1:4318/v1/traces"
+    MIS_TRACE_TRUST_PARENT: bool = False
 
     UVICORN_LOG_LEVEL: str = "info"
 
@@ -47,8 +61,25 @@ environment_variables: Dict[str, Callable[[], Any]] = {
 
     "MIS_PORT": lambda: _get_int_from_env("MIS_PORT", 8000, 1024, 65535),
     "MIS_ENABLE_DOS_PROTECTION": lambda: _get_bool_from_env("MIS_ENABLE_DOS_PROTECTION", True),
+    "MIS_ENABLE_ADMIN_API": lambda: _get_bool_from_env("MIS_ENABLE_ADMIN_API", False),
+    "MIS_ENABLE_METRICS": lambda: _get_bool_from_env("MIS_ENABLE_METRICS", True),
+    "MIS_METRICS_ENGINE_STATS": lambda: _get_bool_from_env("MIS_METRICS_ENGINE_STATS", False),
+    "MIS_ENABLE_LOAD_REPORT": lambda: _get_bool_from_env("MIS_ENABLE_LOAD_REPORT", True),
     "MIS_LOG_LEVEL": lambda: _get_str_from_env("MIS_LOG_LEVEL", "INFO", constants.MIS_LOG_LEVELS),
     "MIS_MAX_LOG_LEN": lambda: _get_int_from_env("MIS_MAX_LOG_LEN", 2048, min_value=0, max_value=8192),
+    "MIS_LOG_QUEUE_SIZE": lambda: _get_int_from_env("MIS_LOG_QUEUE_SIZE", 10000, min_value=0, max_value=1000000),
+    "MIS_LOG_OVERFLOW_POLICY": lambda: _get_str_from_env("MIS_LOG_OVERFLOW_POLICY", "drop",
+                                                         constants.MIS_LOG_OVERFLOW_POLICIES),
+    "MIS_ACCESS_LOG_SAMPLE_RATE": lambda: _get_float_from_env("MIS_ACCESS_LOG_SAMPLE_RATE", 0.0, 0.0, 1.0),
+    "MIS_FLIGHT_RECORDER_SIZE": lambda: _get_int_from_env("MIS_FLIGHT_RECORDER_SIZE", 0, min_value=0,
+                                                          max_value=100000),
+    "MIS_LOOP_STALL_THRESHOLD_MS": lambda: _get_int_from_env("MIS_LOOP_STALL_THRESHOLD_MS", 500, min_value=0,
+                                                             max_value=60000),
+    "MIS_TRACE_SAMPLE_RATE": lambda: _get_float_from_env("MIS_TRACE_SAMPLE_RATE", 0.0, 0.0, 1.0),
+    "MIS_TRACE_EXPORTER": lambda: _get_str_from_env("MIS_TRACE_EXPORTER", "file", constants.MIS_TRACE_EXPORTERS),
+    "MIS_TRACE_OTLP_ENDPOINT": lambda: _get_str_from_env("MIS_TRACE_OTLP_ENDPOINT",
+                                                         "http://127.0.0.1:4318/v1/traces"),
+    "MIS_TRACE_TRUST_PARENT": lambda: _get_bool_from_env("MIS_TRACE_TRUST_PARENT", False),
 
     "UVICORN_LOG_LEVEL": lambda: _get_str_from_env("UVICORN_LOG_LEVEL", "info", constants.UVICORN_LOG_LEVELS),
 
@@ -92,6 +123,30 @@ def _get_int_from_env(name: str, default: Optional[int],
     return value
 
 
+def _get_float_from_env(name: str, default: Optional[float],
+                        min_value: float = None, max_value: float = None) -> Optional[float]:
+    """
+    Get a float value from the environment variable.
+    Args:
+        name (str): The name of the environment variable.
+        default (Optional[float]): The default value to return if the environment variable is not set.
+        min_value (float, optional): The minimum allowed value. Defaults to None.
+        max_value (float, optional): The maximum allowed value. Defaults to None.
+    Returns:
+        Optional[float]: The float value of the environment variable or the default value.
+    """
+    if name not in os.environ:
+        return default
+    try:
+        value = float(os.environ[name])
+    except ValueError as e:
+        raise ValueError(f"ENV {name} is not a valid float value") from e
+    if math.isnan(value):
+        raise ValueError(f"ENV {name} is not a valid float value")
+    GeneralChecker.check_float(name, value, min_value, max_value)
+    return value
+
+
 def _get_str_from_env(name: str, default: Optional[str], valid_values: tuple[str] = None) -> Optional[str]:
     """
     Get a string value from the environment variable.
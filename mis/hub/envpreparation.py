@@ -23,6 +23,7 @@ import mis.constants as constants
 from mis.args import GlobalArgs
 from mis.llm.engines.config_parser import ConfigParser
 from mis.logger import init_logger, LogType
+from mis.utils.startup_timing import STARTUP_TIMER
 from mis.utils.utils import get_model_path
 
 logger = init_logger(__name__, log_type=LogType.SERVICE)
@@ -53,16 +54,19 @@ def environment_preparation(args: GlobalArgs) -> GlobalArgs:
     logger.info("Loaded component environment variables")
 
     # preferred config
-    configparser = ConfigParser(args)
-    args = configparser.engine_config_loading()
+    with STARTUP_TIMER.phase("environment_preparation.config_loading"):
+        configparser = ConfigParser(args)
+        args = configparser.engine_config_loading()
     logger.debug("Loaded engine configuration")
 
     if args.served_model_name is None:
         args.served_model_name = args.model
         logger.info(f"Set served_model_name to {args.model}")
 
-    args.model = get_model_path(args.model)
+    with STARTUP_TIMER.phase("environment_preparation.model_path"):
+        args.model = get_model_path(args.model)
     logger.debug("Resolved model path")
 
+    STARTUP_TIMER.lap("environment_preparation")
     logger.info("Environment preparation completed")
     return args
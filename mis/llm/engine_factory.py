@@ -51,6 +51,9 @@ class AutoEngine:
         if args.engine_type == "vllm":
             logger.info("Using vllm backend.")
             return VLLMEngine.from_args(args)
+        elif args.engine_type == "mock":
+            logger.warning("Using mock backend, the outputs are generated without a model.")
+            return MockEngine.from_args(args)
         else:
             logger.error(f"Model Engine for '{args.engine_type}' is not implemented, "
                          f"available types are {constants.MIS_ENGINE_TYPES}.")
@@ -108,3 +111,37 @@ class VLLMEngine:
         except Exception as e:
             logger.error(f"Failed to initialize AsyncLLMEngine: {e}")
             raise Exception(f"Failed to initialize AsyncLLMEngine: {e}") from e
+
+
+class MockEngine:
+    """A class that builds the mock engine, which serves deterministic tokens for tests and benchmarks."""
+
+    @staticmethod
+    def from_args(args: GlobalArgs) -> 'MockEngineClient':
+        """Factory method to create the mock engine client using the provided GlobalArgs.
+        The model directory only needs the model and tokenizer configuration, no weights are loaded.
+        Args:
+            args (GlobalArgs): A GlobalArgs instance containing the configuration for the mock engine.
+        Returns:
+            MockEngineClient: The mock engine client.
+        """
+        if not args or not isinstance(args, GlobalArgs):
+            logger.error(f"Invalid args type: {type(args)}, GlobalArgs needed")
+            raise TypeError(f"Invalid args type: {type(args)}, GlobalArgs needed")
+        from vllm.config import ModelConfig
+        from vllm.transformers_utils.tokenizer import get_tokenizer
+
+        from mis.llm.engines.mock_engine import MockEngineClient, MockEngineConfig
+
+        model_config = ModelConfig(model=args.model,
+                                   task="generate",
+                                   tokenizer=args.model,
+                                   tokenizer_mode="auto",
+                                   trust_remote_code=False,
+                                   dtype="auto",
+                                   seed=0,
+                                   served_model_name=args.served_model_name)
+        tokenizer = get_tokenizer(args.model, tokenizer_mode="auto", trust_remote_code=False)
+        logger.info("Mock engine args initialized successfully.")
+        return MockEngineClient(model_config, tokenizer, MockEngineConfig(**args.engine_optimization_config),
+                                log_stats=not args.disable_log_stats)
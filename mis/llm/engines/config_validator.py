@@ -20,6 +20,7 @@ See the Mulan PSL v2 for more details.
 from abc import ABC
 from typing import Callable, Dict, Type, Union
 
+from mis import constants
 from mis.logger import init_logger, LogType
 from mis.utils.utils import ConfigChecker
 
@@ -111,6 +112,58 @@ CHECKER_VLLM = {
     },
 }
 
+CHECKER_MOCK = {
+    "max_num_seqs": {
+        "type": "int",
+        "min": 1,
+        "max": 4096
+    },
+    "kv_cache_tokens": {
+        "type": "int",
+        "min": 1,
+        "max": 16777216
+    },
+    "prefill_latency_ms": {
+        "type": "float",
+        "min": 0.0,
+        "max": 60000.0
+    },
+    "prefill_ms_per_token": {
+        "type": "float",
+        "min": 0.0,
+        "max": 1000.0
+    },
+    "decode_latency_ms": {
+        "type": "float",
+        "min": 0.0,
+        "max": 60000.0
+    },
+    "latency_distribution": {
+        "type": "str_in",
+        "valid_values": constants.MOCK_LATENCY_DISTRIBUTIONS
+    },
+    "latency_jitter": {
+        "type": "float",
+        "min": 0.0,
+        "max": 1.0
+    },
+    "batch_slowdown": {
+        "type": "float",
+        "min": 0.0,
+        "max": 100.0
+    },
+    "max_output_tokens": {
+        "type": "int",
+        "min": 1,
+        "max": 64000
+    },
+    "seed": {
+        "type": "int",
+        "min": 0,
+        "max": 2 ** 31 - 1
+    },
+}
+
 
 class AbsEngineConfigValidator(ABC):
     """Abstract engine configuration validator."""
@@ -225,3 +278,14 @@ class VLLMEngineConfigValidator(AbsEngineConfigValidator):
         :param config: Configuration parameters.
         """
         super().__init__(config, CHECKER_VLLM)
+
+
+@AbsEngineConfigValidator.register("mock")
+class MockEngineConfigValidator(AbsEngineConfigValidator):
+    """Mock engine configuration validator."""
+    def __init__(self, config: Dict) -> None:
+        """
+        Mock engine configuration validator initialization.
+        :param config: Configuration parameters.
+        """
+        super().__init__(config, CHECKER_MOCK)
@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import asyncio
+import random
+import zlib
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncGenerator, Dict, List, Mapping, Optional
+
+from vllm.config import DecodingConfig, ModelConfig
+from vllm.engine.protocol import EngineClient
+from vllm.outputs import CompletionOutput, RequestOutput
+from vllm.sampling_params import RequestOutputKind, SamplingParams
+
+from mis import constants
+from mis.logger import init_logger, LogType
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+
+# Engine gauges of the default prometheus_client registry, registered once per process and shared by mock clients
+_ENGINE_GAUGES: Dict[str, object] = {}
+
+
+@dataclass
+class MockEngineConfig:
+    """Mock engine configuration, latencies are the means of `latency_distribution`"""
+    max_num_seqs: int = constants.MOCK_MAX_NUM_SEQS
+    kv_cache_tokens: int = constants.MOCK_KV_CACHE_TOKENS
+    prefill_latency_ms: float = constants.MOCK_PREFILL_LATENCY_MS
+    prefill_ms_per_token: float = constants.MOCK_PREFILL_MS_PER_TOKEN
+    decode_latency_ms: float = constants.MOCK_DECODE_LATENCY_MS
+    latency_distribution: str = constants.MOCK_LATENCY_DISTRIBUTIONS[0]
+    latency_jitter: float = 0.1
+    batch_slowdown: float = 0.0
+    max_output_tokens: int = constants.MOCK_MAX_OUTPUT_TOKENS
+    seed: int = 0
+
+
+def sample_latency(rng: random.Random, mean: float, distribution: str, jitter: float) -> float:
+    """
+    Draw a latency from a distribution.
+    Args:
+        rng (random.Random): The random generator of the request.
+        mean (float): The mean latency.
+        distribution (str): "constant", "uniform" in mean * (1 +- jitter), "normal" with standard deviation
+                            mean * jitter, or "exponential".
+        jitter (float): The relative spread of the uniform and normal distributions.
+    Returns:
+        float: The latency, never negative.
+    """
+    if mean <= 0 or distribution == "constant":
+        return max(mean, 0.0)
+    if distribution == "uniform":
+        return rng.uniform(mean * (1 - jitter), mean * (1 + jitter))
+    if distribution == "normal":
+        return max(rng.gauss(mean, mean * jitter), 0.0)
+    return rng.expovariate(1 / mean)
+
+
+class _MockScheduler:
+    """Batch slots and KV cache of the mock engine.
+
+    A request reserves the KV cache of its prompt and of all its output tokens when it enters the batch and
+    frees both when it finishes, requests that do not fit wait in FIFO order. The scheduler is only used from the
+    event loop thread, so it needs no locking.
+    """
+
+    def __init__(self, max_num_seqs: int, kv_cache_tokens: int) -> None:
+        self.max_num_seqs = max_num_seqs
+        self.kv_cache_tokens = kv_cache_tokens
+        self.running = 0
+        self.kv_used = 0
+        self._waiters: deque = deque()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, waiter in self._waiters if not waiter.done())
+
+    @property
+    def kv_cache_usage(self) -> float:
+        return self.kv_used / self.kv_cache_tokens
+
+    async def admit(self, tokens: int) -> None:
+        """Enter the batch with a KV cache reservation, waiting while the batch or the KV cache is full."""
+        if not self._waiters and self._fits(tokens):
+            self._take(tokens)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((tokens, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted right before the cancellation, hand the reservation to the next request
+                self.release(tokens)
+            raise
+
+    def release(self, tokens: int) -> None:
+        """Leave the batch and free the KV cache reservation."""
+        self.running -= 1
+        self.kv_used -= tokens
+        while self._waiters:
+            next_tokens, waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(next_tokens):
+                break
+            self._waiters.popleft()
+            self._take(next_tokens)
+            waiter.set_result(None)
+
+    def _fits(self, tokens: int) -> bool:
+        return self.running < self.max_num_seqs and self.kv_used + tokens <= self.kv_cache_tokens
+
+    def _take(self, tokens: int) -> None:
+        self.running += 1
+        self.kv_used += tokens
+
+
+class MockEngineClient(EngineClient):
+    """Engine client generating deterministic tokens without an accelerator.
+
+    The output tokens of a request only depend on the seed, the request seed and the prompt, so runs are repeatable.
+    Prefill and every decoding step sleep for a latency drawn from the configured distribution, the decoding latency
+    grows with the batch occupancy by `batch_slowdown`, and the scheduler limits the batch size and the KV cache.
+    Logprobs, n > 1, beam search and pooling are not simulated.
+    """
+
+    def __init__(self, model_config: ModelConfig, tokenizer, config: Optional[MockEngineConfig] = None,
+                 log_stats: bool = False) -> None:
+        """
+        Initialize the mock engine client.
+        Args:
+            model_config (ModelConfig): The model configuration served to the OpenAI layer.
+            tokenizer: The tokenizer of the model, only used to build the vocabulary of generated tokens.
+            config (MockEngineConfig): The simulated engine. Default is a default instance.
+            log_stats (bool): Whether the engine gauges are exported like the stats of a real engine.
+        """
+        if config is not None and not isinstance(config, MockEngineConfig):
+            logger.error(f"Invalid config type: {type(config)}, MockEngineConfig needed")
+            raise TypeError(f"Invalid config type: {type(config)}, MockEngineConfig needed")
+        self.model_config = model_config
+        self.tokenizer = tokenizer
+        self.config = config or MockEngineConfig()
+        if self.config.latency_distribution not in constants.MOCK_LATENCY_DISTRIBUTIONS:
+            logger.error(f"latency_distribution must be one of {constants.MOCK_LATENCY_DISTRIBUTIONS}")
+            raise ValueError(f"latency_distribution must be one of {constants.MOCK_LATENCY_DISTRIBUTIONS}")
+        if min(self.config.max_num_seqs, self.config.kv_cache_tokens, self.config.max_output_tokens) <= 0:
+            logger.error("max_num_seqs, kv_cache_tokens and max_output_tokens of mock engine must be positive.")
+            raise ValueError("max_num_seqs, kv_cache_tokens and max_output_tokens of mock engine must be positive.")
+        self.scheduler = _MockScheduler(self.config.max_num_seqs, self.config.kv_cache_tokens)
+        self._vocabulary = self._build_vocabulary(tokenizer)
+        # Ids of the requests being generated, only their aborts are recorded
+        self._active = set()
+        self._aborted = set()
+        self._stopped = False
+        if log_stats:
+            self._export_gauges()
+
+    @staticmethod
+    def _build_vocabulary(tokenizer) -> List[tuple]:
+        """Pick the tokens to generate: regular tokens whose text decodes on its own, as (token id, text)."""
+        special_ids = set(tokenizer.all_special_ids)
+        vocabulary = []
+        for token_id in range(len(tokenizer)):
+            if token_id in special_ids:
+                continue
+            text = tokenizer.decode([token_id])
+            if text.strip() and "�" not in text:
+                vocabulary.append((token_id, text))
+                if len(vocabulary) >= constants.MOCK_VOCAB_SIZE:
+                    break
+        if not vocabulary:
+            logger.error("The tokenizer has no regular token for the mock engine to generate.")
+            raise ValueError("The tokenizer has no regular token for the mock engine to generate.")
+        return vocabulary
+
+    def _export_gauges(self) -> None:
+        """Export the batch and KV cache state under the gauge names of vLLM, read when the gauges are collected."""
+        from prometheus_client import Gauge
+
+        if not _ENGINE_GAUGES:
+            for name, documentation in (("vllm:num_requests_running", "Requests in the mock engine batch."),
+                                        ("vllm:num_requests_waiting", "Requests waiting for the mock engine batch."),
+                                        ("vllm:kv_cache_usage_perc", "KV cache usage of the mock engine.")):
+                _ENGINE_GAUGES[name] = Gauge(name, documentation, ["model_name"])
+        model_name = self.model_config.served_model_name
+        _ENGINE_GAUGES["vllm:num_requests_running"].labels(model_name).set_function(lambda: self.scheduler.running)
+        _ENGINE_GAUGES["vllm:num_requests_waiting"].labels(model_name).set_function(lambda: self.scheduler.waiting)
+        _ENGINE_GAUGES["vllm:kv_cache_usage_perc"].labels(model_name).set_function(
+            lambda: self.scheduler.kv_cache_usage)
+
+    @property
+    def is_running(self) -> bool:
+        return not self._stopped
+
+    @property
+    def is_stopped(self) -> bool:
+        return self._stopped
+
+    @property
+    def errored(self) -> bool:
+        return False
+
+    @property
+    def dead_error(self) -> BaseException:
+        return RuntimeError("The mock engine does not fail")
+
+    async def generate(
+            self,
+            prompt,
+            sampling_params: SamplingParams,
+            request_id: str,
+            lora_request=None,
+            trace_headers: Optional[Mapping[str, str]] = None,
+            prompt_adapter_request=None,
+            priority: int = 0,
+    ) -> AsyncGenerator[RequestOutput, None]:
+        """
+        Generate the deterministic output of a request with simulated latency.
+        Args:
+            prompt: The prompt, a text or tokens prompt.
+            sampling_params (SamplingParams): Only max_tokens, seed and output_kind are used.
+            request_id (str): The unique id of the request.
+        Yields:
+            RequestOutput: The outputs of the request, in the output kind of the sampling parameters.
+        """
+        prompt_token_ids = self._prompt_token_ids(prompt)
+        config = self.config
+        num_tokens = min(sampling_params.max_tokens or config.max_output_tokens, config.max_output_tokens)
+        checksum = zlib.crc32(array("l", prompt_token_ids).tobytes())
+        rng = random.Random(f"{config.seed}:{sampling_params.seed}:{checksum}")
+        # A request larger than the whole KV cache runs alone instead of waiting forever
+        reserved = min(len(prompt_token_ids) + num_tokens, config.kv_cache_tokens)
+        self._active.add(request_id)
+        admitted = False
+        try:
+            await self.scheduler.admit(reserved)
+            admitted = True
+            prefill_ms = config.prefill_latency_ms + config.prefill_ms_per_token * len(prompt_token_ids)
+            await asyncio.sleep(self._latency(rng, prefill_ms))
+            token_ids, texts = [], []
+            for index in range(num_tokens):
+                if index:
+                    occupancy = self.scheduler.running / config.max_num_seqs
+                    await asyncio.sleep(self._latency(rng, config.decode_latency_ms * (1 + config.batch_slowdown *
+                                                                                       occupancy)))
+                if request_id in self._aborted:
+                    return
+                token_id, text = self._vocabulary[rng.randrange(len(self._vocabulary))]
+                token_ids.append(token_id)
+                texts.append(text)
+                finished = index == num_tokens - 1
+                if sampling_params.output_kind == RequestOutputKind.FINAL_ONLY and not finished:
+                    continue
+                finish_reason = None
+                if finished:
+                    finish_reason = "length" if num_tokens == sampling_params.max_tokens else "stop"
+                if sampling_params.output_kind == RequestOutputKind.DELTA:
+                    output = CompletionOutput(0, text, [token_id], None, None, finish_reason)
+                else:
+                    output = CompletionOutput(0, "".join(texts), list(token_ids), None, None, finish_reason)
+                yield RequestOutput(request_id, None, prompt_token_ids, None, [output], finished)
+        finally:
+            if admitted:
+                self.scheduler.release(reserved)
+            self._active.discard(request_id)
+            self._aborted.discard(request_id)
+
+    def _prompt_token_ids(self, prompt) -> List[int]:
+        if isinstance(prompt, str):
+            return self.tokenizer.encode(prompt)
+        if isinstance(prompt, dict) and prompt.get("prompt_token_ids") is not None:
+            return list(prompt["prompt_token_ids"])
+        if isinstance(prompt, dict) and prompt.get("prompt") is not None:
+            return self.tokenizer.encode(prompt["prompt"])
+        logger.error(f"Unsupported prompt type for the mock engine: {type(prompt)}")
+        raise TypeError(f"Unsupported prompt type for the mock engine: {type(prompt)}")
+
+    def _latency(self, rng: random.Random, mean_ms: float) -> float:
+        return sample_latency(rng, mean_ms, self.config.latency_distribution, self.config.latency_jitter) / 1000
+
+    def encode(self, prompt, pooling_params, request_id: str, lora_request=None, trace_headers=None,
+               priority: int = 0):
+        raise NotImplementedError("Pooling is not supported by the mock engine")
+
+    async def abort(self, request_id: str) -> None:
+        # Aborts of finished or unknown requests are ignored, they would never be removed again
+        if request_id in self._active:
+            self._aborted.add(request_id)
+
+    async def get_vllm_config(self):
+        raise NotImplementedError("The mock engine has no vLLM configuration")
+
+    async def get_model_config(self) -> ModelConfig:
+        return self.model_config
+
+    async def get_decoding_config(self) -> DecodingConfig:
+        return DecodingConfig()
+
+    async def get_input_preprocessor(self):
+        raise NotImplementedError("The mock engine has no input preprocessor")
+
+    async def get_tokenizer(self, lora_request=None):
+        return self.tokenizer
+
+    async def is_tracing_enabled(self) -> bool:
+        return False
+
+    async def do_log_stats(self, scheduler_outputs=None, model_output=None) -> None:
+        pass
+
+    async def check_health(self) -> None:
+        pass
+
+    async def start_profile(self) -> None:
+        pass
+
+    async def stop_profile(self) -> None:
+        pass
+
+    async def reset_mm_cache(self) -> None:
+        pass
+
+    async def reset_prefix_cache(self, device=None) -> None:
+        pass
+
+    async def sleep(self, level: int = 1) -> None:
+        pass
+
+    async def wake_up(self, tags: Optional[List[str]] = None) -> None:
+        pass
+
+    async def is_sleeping(self) -> bool:
+        return False
+
+    async def add_lora(self, lora_request) -> None:
+        raise NotImplementedError("LoRA adapters are not supported by the mock engine")
+
+    def shutdown(self) -> None:
+        self._stopped = True
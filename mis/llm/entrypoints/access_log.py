@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import asyncio
+import logging
+import random
+import time
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from mis import constants
+from mis.llm.entrypoints.metrics import REQUEST_DURATION, REQUESTS, REQUESTS_IN_FLIGHT
+from mis.llm.entrypoints.tracing import TRACEPARENT_HEADER, Tracer
+from mis.logger import init_logger, LogType
+from mis.utils.utils import get_client_ip
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+op_logger = init_logger(__name__ + ".operation", log_type=LogType.OPERATION)
+
+OTHER_CLIENTS = "other"
+UNMATCHED_ROUTE = "unmatched"
+
+
+class AccessRecorder:
+    """Aggregating recorder of handled requests.
+
+    Requests are counted per client IP, route and status code together with their latency, and the counters are
+    written as one summary line per interval, e.g.
+    "Access summary of the last 60s: 1520 requests, 3 errors; [IP: 10.0.0.1] /openai/v1/chat/completions 200 x1517
+    avg 35.2ms max 120.0ms; ...". Error responses are logged in full where they are produced, successful requests only
+    get a full line for the sampled fraction `sample_rate`.
+    """
+
+    def __init__(self, interval_in_sec: int = constants.ACCESS_LOG_INTERVAL_IN_SEC, sample_rate: float = 0.0,
+                 operation_logger: Optional[logging.Logger] = None,
+                 max_tracked_keys: int = constants.ACCESS_LOG_MAX_TRACKED_KEYS) -> None:
+        """
+        Initialize the recorder.
+        Args:
+            interval_in_sec (int): Length of one summary interval in seconds.
+            sample_rate (float): Fraction of successful requests logged as full lines, between 0 and 1.
+            operation_logger (logging.Logger): The operation logger to write to. Default is the one of this module.
+            max_tracked_keys (int): Counters kept per interval, further client IPs are counted as "other".
+        """
+        if not isinstance(interval_in_sec, int) or not isinstance(max_tracked_keys, int):
+            logger.error("interval_in_sec and max_tracked_keys of access log must be integers.")
+            raise TypeError("interval_in_sec and max_tracked_keys of access log must be integers.")
+        if interval_in_sec <= 0 or max_tracked_keys <= 0:
+            logger.error("interval_in_sec and max_tracked_keys of access log must be positive.")
+            raise ValueError("interval_in_sec and max_tracked_keys of access log must be positive.")
+        if not isinstance(sample_rate, (int, float)) or not 0 <= sample_rate <= 1:
+            logger.error(f"sample_rate of access log must be between 0 and 1, got {sample_rate}.")
+            raise ValueError(f"sample_rate of access log must be between 0 and 1, got {sample_rate}.")
+        self.interval_in_sec = interval_in_sec
+        self.sample_rate = sample_rate
+        self.operation_logger = operation_logger or op_logger
+        self.max_tracked_keys = max_tracked_keys
+        self._window_start = time.monotonic()
+        # Counters of the current interval: (client IP, route, status code) -> [count, total latency, max latency]
+        self._stats: Dict[Tuple[str, str, int], List[float]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def record(self, client_ip: str, route: str, status_code: int, latency_in_sec: float) -> None:
+        """
+        Record one handled request.
+        Args:
+            client_ip (str): The client IP address.
+            route (str): The path of the matched route.
+            status_code (int): The status code of the response.
+            latency_in_sec (float): Time until the response started, in seconds.
+        """
+        now = time.monotonic()
+        if now - self._window_start >= self.interval_in_sec:
+            self.flush(now)
+        key = (client_ip, route, status_code)
+        entry = self._stats.get(key)
+        if entry is None:
+            if len(self._stats) >= self.max_tracked_keys:
+                key = (OTHER_CLIENTS, route, status_code)
+                entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = [0, 0.0, 0.0]
+                self._schedule_flush()
+        entry[0] += 1
+        entry[1] += latency_in_sec
+        if latency_in_sec > entry[2]:
+            entry[2] = latency_in_sec
+        if status_code < HTTPStatus.BAD_REQUEST and self.sample_rate and random.random() < self.sample_rate:
+            self.operation_logger.info("[IP: %s] %d %s %.1fms", client_ip, status_code, route,
+                                       latency_in_sec * 1000)
+
+    def flush(self, now: Optional[float] = None) -> None:
+        """
+        Log the summary line of the current interval and start a new one.
+        Args:
+            now (float): The current monotonic time. Default is read from the clock.
+        """
+        now = time.monotonic() if now is None else now
+        if self._stats:
+            elapsed = max(int(now - self._window_start), 1)
+            entries = sorted(self._stats.items(), key=lambda item: item[1][0], reverse=True)
+            total = sum(count for _, (count, _, _) in entries)
+            errors = sum(count for (_, _, status_code), (count, _, _) in entries
+                         if status_code >= HTTPStatus.BAD_REQUEST)
+            parts = [f"[IP: {client_ip}] {route} {status_code} x{count} avg {total_latency / count * 1000:.1f}ms "
+                     f"max {max_latency * 1000:.1f}ms"
+                     for (client_ip, route, status_code), (count, total_latency, max_latency)
+                     in entries[:constants.ACCESS_LOG_SUMMARY_MAX_ENTRIES]]
+            if len(entries) > constants.ACCESS_LOG_SUMMARY_MAX_ENTRIES:
+                parts.append(f"{len(entries) - constants.ACCESS_LOG_SUMMARY_MAX_ENTRIES} more")
+            self.operation_logger.info(f"Access summary of the last {elapsed}s: {total} requests, {errors} errors; "
+                                       + "; ".join(parts))
+        self._stats = {}
+        self._window_start = now
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _schedule_flush(self) -> None:
+        """Make sure the summary is logged even if no further request arrives after this interval."""
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        delay = max(self.interval_in_sec - (time.monotonic() - self._window_start), 0)
+        self._flush_handle = loop.call_later(delay, self._on_flush_timer)
+
+    def _on_flush_timer(self) -> None:
+        self._flush_handle = None
+        self.flush()
+
+
+class AccessLogMiddleware(BaseHTTPMiddleware):
+    """Middleware recording every request in an AccessRecorder and the request metrics, it is added last to also see
+    rejected requests. It also starts the trace of sampled requests, whose root span it covers."""
+
+    def __init__(self, app: ASGIApp, recorder: Optional[AccessRecorder] = None,
+                 tracer: Optional[Tracer] = None) -> None:
+        """
+        Initialize the middleware.
+        Args:
+            app (ASGIApp): The ASGIApp application instance.
+            recorder (AccessRecorder): The access recorder. Default is a recorder with default settings.
+            tracer (Tracer): The request tracer. Default is None, requests are not traced.
+        """
+        if recorder is not None and not isinstance(recorder, AccessRecorder):
+            logger.error(f"Invalid recorder type: {type(recorder)}, AccessRecorder needed")
+            raise TypeError(f"Invalid recorder type: {type(recorder)}, AccessRecorder needed")
+        if tracer is not None and not isinstance(tracer, Tracer):
+            logger.error(f"Invalid tracer type: {type(tracer)}, Tracer needed")
+            raise TypeError(f"Invalid tracer type: {type(tracer)}, Tracer needed")
+        super().__init__(app)
+        self.recorder = recorder or AccessRecorder()
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Count the request in flight until its response body is sent or the client disconnected."""
+        if scope["type"] != "http":
+            await super().__call__(scope, receive, send)
+            return
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+
+    async def dispatch(self, request: Request, call_next: callable) -> Response:
+        """
+        Dispatch the request and record its status and latency.
+        Args:
+            request (Request): The incoming HTTP request.
+            call_next (Callable): The next middleware or route handler in the chain.
+        Returns:
+            Response: The response from the next middleware or route handler.
+        """
+        start = time.perf_counter()
+        request.state.received_at = start
+        trace = self.tracer.start_trace(request.headers.get(TRACEPARENT_HEADER)) if self.tracer else None
+        if trace is not None:
+            request.state.trace = trace
+            trace.hold()
+        status_code = HTTPStatus.INTERNAL_SERVER_ERROR.value
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            if trace is not None:
+                response.headers[TRACEPARENT_HEADER] = trace.traceparent()
+            return response
+        finally:
+            latency = time.perf_counter() - start
+            # The router stores the matched route in the shared scope
+            route = getattr(request.scope.get("route"), "path", UNMATCHED_ROUTE)
+            REQUEST_DURATION.labels(route).observe(latency)
+            REQUESTS.labels(route, str(status_code)).inc()
+            self.recorder.record(get_client_ip(request), route, status_code, latency)
+            if trace is not None:
+                trace.attributes.update({"http.route": route, "http.response.status_code": status_code})
+                trace.is_error = status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+                trace.release()
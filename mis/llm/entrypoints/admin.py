@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import asyncio
+import gc
+import ipaddress
+import threading
+from http import HTTPStatus
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Request
+from pydantic import BaseModel, ConfigDict, StrictBool, StrictInt, StrictStr
+from starlette.responses import JSONResponse, PlainTextResponse
+
+from mis import constants
+from mis.llm.entrypoints.middleware import (MAX_MIDDLEWARE_STACK_DEPTH, ConcurrencyLimitMiddleware,
+                                            RateLimitMiddleware, RequestTimeoutMiddleware, find_middleware)
+from mis.logger import (init_logger, LogType, dump_flight_recorder, get_log_level, is_flight_recorder_enabled,
+                        set_log_level)
+from mis.utils.memory import MemoryDiagnostics, container_sizes, get_rss_bytes
+from mis.utils.profiler import SamplingProfiler
+from mis.utils.utils import ConfigChecker, get_client_ip
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+op_logger = init_logger(__name__ + ".operation", log_type=LogType.OPERATION)
+
+router = APIRouter()
+
+# Held while a profiling session runs, a second session is rejected instead of queued
+_PROFILE_LOCK = asyncio.Lock()
+_MEMORY_DIAGNOSTICS = MemoryDiagnostics()
+
+
+class LimitsUpdateRequest(BaseModel):
+    """Runtime limits to change, omitted fields keep their current value"""
+    model_config = ConfigDict(extra="forbid")
+
+    max_concurrent_requests: Optional[StrictInt] = None
+    rate_limit_per_minute: Optional[StrictInt] = None
+    request_timeout_in_sec: Optional[StrictInt] = None
+    log_level: Optional[StrictStr] = None
+
+
+class ProfileRequest(BaseModel):
+    """Profiling session to run"""
+    model_config = ConfigDict(extra="forbid")
+
+    duration_in_sec: StrictInt = constants.PROFILE_DEFAULT_DURATION_IN_SEC
+    all_threads: StrictBool = False
+
+
+class MemoryTracingRequest(BaseModel):
+    """Allocation tracing to start or stop"""
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: StrictBool
+    frames: StrictInt = constants.TRACEMALLOC_DEFAULT_FRAMES
+
+
+def is_local_request(raw_request: Request) -> bool:
+    """
+    Check whether a request comes from the loopback interface.
+    Args:
+        raw_request (Request): The incoming request.
+    Returns:
+        bool: True if the client address is a loopback address.
+    """
+    try:
+        return ipaddress.ip_address(get_client_ip(raw_request)).is_loopback
+    except ValueError:
+        return False
+
+
+def forbidden_response(client_ip: str) -> JSONResponse:
+    """Response for admin requests not coming from localhost."""
+    op_logger.warning(f"[IP: {client_ip}] {HTTPStatus.FORBIDDEN.value} Admin API is only available on localhost")
+    return JSONResponse(status_code=HTTPStatus.FORBIDDEN.value, content={"detail": "Forbidden"})
+
+
+def _current_limits(raw_request: Request) -> Dict:
+    """Read the limits currently applied by the running middlewares, None for disabled middlewares."""
+    app = raw_request.app
+    concurrency = find_middleware(app, ConcurrencyLimitMiddleware)
+    rate_limit = find_middleware(app, RateLimitMiddleware)
+    timeout = find_middleware(app, RequestTimeoutMiddleware)
+    return {
+        "max_concurrent_requests": concurrency.max_concurrent_requests if concurrency else None,
+        "rate_limit_per_minute": rate_limit.config.requests_per_minute if rate_limit else None,
+        "request_timeout_in_sec": timeout.timeout if timeout else getattr(app.state, "request_timeout", None),
+        "log_level": get_log_level(),
+    }
+
+
+def _structure_sizes(app) -> Dict:
+    """Sizes of the containers held by the running middlewares and the application state."""
+    middlewares = {}
+    node = getattr(app, "middleware_stack", None)
+    for _ in range(MAX_MIDDLEWARE_STACK_DEPTH):
+        if node is None:
+            break
+        sizes = container_sizes(node)
+        if sizes:
+            middlewares[type(node).__name__] = sizes
+        node = getattr(node, "app", None)
+    app_state = {}
+    for name, value in vars(app.state).get("_state", {}).items():
+        if isinstance(value, (dict, list, tuple, set)):
+            app_state[name] = len(value)
+        elif type(value).__module__.startswith("mis."):
+            app_state.update({f"{name}.{nested}": size for nested, size in container_sizes(value).items()})
+    return {"middlewares": middlewares, "app_state": app_state}
+
+
+def _memory_report(limit: int, group_by: str) -> Dict:
+    """Memory report of the process, blocking while the allocation snapshot and the object count are taken."""
+    return {
+        "rss_bytes": get_rss_bytes(),
+        "gc_objects": len(gc.get_objects()),
+        "tracemalloc": _MEMORY_DIAGNOSTICS.report(limit, group_by),
+    }
+
+
+def _validate_update(update: LimitsUpdateRequest, raw_request: Request) -> List[str]:
+    """
+    Check every requested change before anything is applied.
+    Args:
+        update (LimitsUpdateRequest): The requested changes.
+        raw_request (Request): The incoming request.
+    Returns:
+        List[str]: Validation errors, empty if the update can be applied.
+    """
+    errors = []
+    app = raw_request.app
+    checks = (
+        ("max_concurrent_requests", update.max_concurrent_requests, 1, constants.MAX_CONCURRENT_REQUESTS,
+         ConcurrencyLimitMiddleware),
+        ("rate_limit_per_minute", update.rate_limit_per_minute, 1, constants.MAX_RATE_LIMIT_PER_MINUTE,
+         RateLimitMiddleware),
+        ("request_timeout_in_sec", update.request_timeout_in_sec, 1, constants.REQUEST_TIMEOUT_IN_SEC,
+         RequestTimeoutMiddleware),
+    )
+    for name, value, min_value, max_value, middleware_class in checks:
+        if value is None:
+            continue
+        if not ConfigChecker.is_value_in_range(name, value, min_value, max_value):
+            errors.append(f"{name} must be in [{min_value}, {max_value}]")
+        elif find_middleware(app, middleware_class) is None:
+            errors.append(f"{name} cannot be changed, the middleware is not enabled")
+    concurrency = find_middleware(app, ConcurrencyLimitMiddleware)
+    if (update.max_concurrent_requests is not None and concurrency is not None
+            and update.max_concurrent_requests < len(concurrency.pools)):
+        errors.append(f"max_concurrent_requests must be at least {len(concurrency.pools)}, one per admission pool")
+    if update.log_level is not None and not ConfigChecker.is_value_in_enum("log_level", update.log_level,
+                                                                           constants.MIS_LOG_LEVELS):
+        errors.append(f"log_level must be one of {constants.MIS_LOG_LEVELS}")
+    return errors
+
+
+def _apply_update(update: LimitsUpdateRequest, raw_request: Request) -> None:
+    """Apply a validated update, nothing is awaited so requests never observe a partial update."""
+    app = raw_request.app
+    if update.max_concurrent_requests is not None:
+        find_middleware(app, ConcurrencyLimitMiddleware).set_max_concurrent_requests(update.max_concurrent_requests)
+    if update.rate_limit_per_minute is not None:
+        find_middleware(app, RateLimitMiddleware).set_requests_per_minute(update.rate_limit_per_minute)
+    if update.request_timeout_in_sec is not None:
+        find_middleware(app, RequestTimeoutMiddleware).set_timeout(update.request_timeout_in_sec)
+        app.state.request_timeout = update.request_timeout_in_sec
+    if update.log_level is not None:
+        set_log_level(update.log_level)
+
+
+@router.get("/admin/limits")
+async def show_limits(raw_request: Request):
+    client_ip = get_client_ip(raw_request)
+    if not is_local_request(raw_request):
+        return forbidden_response(client_ip)
+    return JSONResponse(content=_current_limits(raw_request))
+
+
+@router.put("/admin/limits")
+async def update_limits(update: LimitsUpdateRequest, raw_request: Request):
+    client_ip = get_client_ip(raw_request)
+    if not is_local_request(raw_request):
+        return forbidden_response(client_ip)
+    errors = _validate_update(update, raw_request)
+    if errors:
+        op_logger.warning(f"[IP: {client_ip}] {HTTPStatus.BAD_REQUEST.value} Invalid limits update: {errors}")
+        return JSONResponse(status_code=HTTPStatus.BAD_REQUEST.value, content={"detail": errors})
+    previous = _current_limits(raw_request)
+    _apply_update(update, raw_request)
+    current = _current_limits(raw_request)
+    changes = {name: f"{previous[name]} -> {value}" for name, value in current.items() if previous[name] != value}
+    op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} Limits updated: {changes}")
+    return JSONResponse(content=current)
+
+
+@router.post("/admin/flight-recorder")
+async def dump_flight_recorder_records(raw_request: Request):
+    client_ip = get_client_ip(raw_request)
+    if not is_local_request(raw_request):
+        return forbidden_response(client_ip)
+    if not is_flight_recorder_enabled():
+        return JSONResponse(status_code=HTTPStatus.BAD_REQUEST.value,
+                            content={"detail": "The flight recorder is disabled, set MIS_FLIGHT_RECORDER_SIZE"})
+    path = await asyncio.to_thread(dump_flight_recorder, "Requested by the admin API")
+    if path is None:
+        return JSONResponse(status_code=HTTPStatus.INTERNAL_SERVER_ERROR.value,
+                            content={"detail": "Failed to dump the flight recorder"})
+    op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} Flight recorder dumped to {path}")
+    return JSONResponse(content={"path": path})
+
+
+@router.post("/admin/profile")
+async def profile_server(raw_request: Request, session: Optional[ProfileRequest] = None):
+    client_ip = get_client_ip(raw_request)
+    if not is_local_request(raw_request):
+        return forbidden_response(client_ip)
+    session = session or ProfileRequest()
+    if not ConfigChecker.is_value_in_range("duration_in_sec", session.duration_in_sec, 1,
+                                           constants.PROFILE_MAX_DURATION_IN_SEC):
+        return JSONResponse(status_code=HTTPStatus.BAD_REQUEST.value,
+                            content={"detail": f"duration_in_sec must be in "
+                                               f"[1, {constants.PROFILE_MAX_DURATION_IN_SEC}]"})
+    if _PROFILE_LOCK.locked():
+        op_logger.warning(f"[IP: {client_ip}] {HTTPStatus.CONFLICT.value} A profiling session is already running")
+        return JSONResponse(status_code=HTTPStatus.CONFLICT.value,
+                            content={"detail": "A profiling session is already running"})
+    async with _PROFILE_LOCK:
+        # By default only the event loop thread serving the API is profiled
+        thread_ids = None if session.all_threads else [threading.get_ident()]
+        profiler = SamplingProfiler(constants.PROFILE_SAMPLE_INTERVAL_IN_SEC, thread_ids)
+        op_logger.info(f"[IP: {client_ip}] Profiling started for {session.duration_in_sec}s")
+        await asyncio.to_thread(profiler.run, session.duration_in_sec)
+    op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} Profiling finished with {profiler.samples} samples")
+    return PlainTextResponse(content=profiler.collapsed())
+
+
+@router.get("/admin/memory")
+async def show_memory(raw_request: Request, limit: int = constants.MEMORY_REPORT_DEFAULT_LIMIT,
+                      group_by: str = constants.MEMORY_REPORT_GROUP_BY[0]):
+    client_ip = get_client_ip(raw_request)
+    if not is_local_request(raw_request):
+        return forbidden_response(client_ip)
+    if not ConfigChecker.is_value_in_range("limit", limit, 1, constants.MEMORY_REPORT_MAX_LIMIT):
+        return JSONResponse(status_code=HTTPStatus.BAD_REQUEST.value,
+                            content={"detail": f"limit must be in [1, {constants.MEMORY_REPORT_MAX_LIMIT}]"})
+    if not ConfigChecker.is_value_in_enum("group_by", group_by, constants.MEMORY_REPORT_GROUP_BY):
+        return JSONResponse(status_code=HTTPStatus.BAD_REQUEST.value,
+                            content={"detail": f"group_by must be one of {constants.MEMORY_REPORT_GROUP_BY}"})
+    # The containers are changed by the event loop while requests are handled, so they are measured on its thread
+    structures = _structure_sizes(raw_request.app)
+    report = await asyncio.to_thread(_memory_report, limit, group_by)
+    report["structures"] = structures
+    op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} Memory report, rss: {report['rss_bytes']} bytes")
+    return JSONResponse(content=report)
+
+
+@router.post("/admin/memory/tracing")
+async def update_memory_tracing(tracing: MemoryTracingRequest, raw_request: Request):
+    client_ip = get_client_ip(raw_request)
+    if not is_local_request(raw_request):
+        return forbidden_response(client_ip)
+    if not tracing.enabled:
+        _MEMORY_DIAGNOSTICS.stop()
+        op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} Memory tracing stopped")
+        return JSONResponse(content={"tracing": False})
+    if not ConfigChecker.is_value_in_range("frames", tracing.frames, 1, constants.TRACEMALLOC_MAX_FRAMES):
+        return JSONResponse(status_code=HTTPStatus.BAD_REQUEST.value,
+                            content={"detail": f"frames must be in [1, {constants.TRACEMALLOC_MAX_FRAMES}]"})
+    if _MEMORY_DIAGNOSTICS.is_tracing():
+        op_logger.warning(f"[IP: {client_ip}] {HTTPStatus.CONFLICT.value} Memory tracing is already running")
+        return JSONResponse(status_code=HTTPStatus.CONFLICT.value,
+                            content={"detail": "Memory tracing is already running"})
+    _MEMORY_DIAGNOSTICS.start(tracing.frames)
+    op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} Memory tracing started with {tracing.frames} frames")
+    return JSONResponse(content={"tracing": True, "frames": tracing.frames})
+
+
+@router.post("/admin/memory/baseline")
+async def take_memory_baseline(raw_request: Request):
+    client_ip = get_client_ip(raw_request)
+    if not is_local_request(raw_request):
+        return forbidden_response(client_ip)
+    if not _MEMORY_DIAGNOSTICS.is_tracing():
+        return JSONResponse(status_code=HTTPStatus.CONFLICT.value,
+                            content={"detail": "Memory tracing is not running, start it first"})
+    await asyncio.to_thread(_MEMORY_DIAGNOSTICS.take_baseline)
+    op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} Memory baseline taken")
+    return JSONResponse(content={"tracing": True})
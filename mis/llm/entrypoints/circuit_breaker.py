@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+from mis import constants
+from mis.llm.entrypoints.metrics import CIRCUIT_BREAKER_STATE, CIRCUIT_BREAKER_TRANSITIONS
+from mis.logger import init_logger, LogType
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CallOutcome(Enum):
+    SUCCESS = 0
+    FAILURE = 1
+    TIMEOUT = 2
+    IGNORED = 3  # The call ended without a verdict on engine health, e.g. client disconnect
+
+
+@dataclass
+class CircuitBreakerConfig:
+    """Circuit breaker configuration"""
+    window_in_sec: int = constants.CIRCUIT_BREAKER_WINDOW_IN_SEC
+    min_requests: int = constants.CIRCUIT_BREAKER_MIN_REQUESTS
+    error_rate_threshold: float = constants.CIRCUIT_BREAKER_ERROR_RATE
+    timeout_rate_threshold: float = constants.CIRCUIT_BREAKER_TIMEOUT_RATE
+    open_in_sec: int = constants.CIRCUIT_BREAKER_OPEN_IN_SEC
+    half_open_max_requests: int = constants.CIRCUIT_BREAKER_HALF_OPEN_MAX_REQUESTS
+
+
+class CircuitBreaker:
+    """Circuit breaker around the engine client.
+
+    Outcomes are counted in one-second buckets over a rolling window. When the error or timeout rate of the window
+    exceeds its threshold the circuit opens and calls fail fast. After `open_in_sec` a limited number of probe calls
+    are let through (half-open); if all of them succeed the circuit closes, any failure opens it again.
+    The breaker is only used from the event loop thread, so it needs no locking.
+    """
+
+    def __init__(self, config: CircuitBreakerConfig = None) -> None:
+        """
+        Initialize the circuit breaker.
+        Args:
+            config (CircuitBreakerConfig): The circuit breaker configuration. Default is a default instance.
+        """
+        if config and not isinstance(config, CircuitBreakerConfig):
+            logger.error(f"Invalid config type: {type(config)}, CircuitBreakerConfig needed")
+            raise TypeError(f"Invalid config type: {type(config)}, CircuitBreakerConfig needed")
+        self.config = config or CircuitBreakerConfig()
+        if self.config.window_in_sec <= 0 or self.config.half_open_max_requests <= 0:
+            logger.error("window_in_sec and half_open_max_requests of circuit breaker must be positive.")
+            raise ValueError("window_in_sec and half_open_max_requests of circuit breaker must be positive.")
+        self.state = CircuitState.CLOSED
+        self._export_state()
+        self.transitions: Dict[str, int] = {}
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        # Each bucket is [second, total, failures, timeouts]
+        self._buckets: List[List[int]] = [[0, 0, 0, 0] for _ in range(self.config.window_in_sec)]
+
+    def try_acquire(self) -> bool:
+        """
+        Check whether a call to the engine is allowed, a successful acquire must be followed by `release`.
+        Returns:
+            bool: True if the call is allowed, False if it should fail fast.
+        """
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.config.open_in_sec:
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+        if self._half_open_in_flight >= self.config.half_open_max_requests:
+            return False
+        self._half_open_in_flight += 1
+        return True
+
+    def release(self, outcome: CallOutcome, acquired_state: CircuitState = None) -> None:
+        """
+        Record the outcome of an allowed call.
+        Args:
+            outcome (CallOutcome): The outcome of the call.
+            acquired_state (CircuitState): The state when the call was acquired, defaults to the current state.
+        """
+        if not isinstance(outcome, CallOutcome):
+            raise TypeError(f"Invalid outcome type: {type(outcome)}, CallOutcome needed")
+        acquired_state = acquired_state or self.state
+        if acquired_state == CircuitState.HALF_OPEN and self._half_open_in_flight > 0:
+            self._half_open_in_flight -= 1
+        if outcome == CallOutcome.IGNORED:
+            return
+        self._record(outcome)
+
+        # Calls admitted before the circuit went half-open are no probes, they only count in the window
+        if acquired_state == CircuitState.HALF_OPEN and self.state == CircuitState.HALF_OPEN:
+            if outcome != CallOutcome.SUCCESS:
+                self._transition(CircuitState.OPEN)
+                return
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.config.half_open_max_requests:
+                self._transition(CircuitState.CLOSED)
+        elif self.state == CircuitState.CLOSED and outcome != CallOutcome.SUCCESS:
+            total, failures, timeouts = self._window_counts()
+            if total < self.config.min_requests:
+                return
+            if (failures / total >= self.config.error_rate_threshold or
+                    timeouts / total >= self.config.timeout_rate_threshold):
+                self._transition(CircuitState.OPEN)
+
+    def retry_after(self) -> int:
+        """Seconds until the open circuit lets probe calls through."""
+        if self.state != CircuitState.OPEN:
+            return 1
+        return max(int(self.config.open_in_sec - (time.monotonic() - self._opened_at)) + 1, 1)
+
+    def stats(self) -> Dict:
+        """
+        Export the circuit state, rolling window counts and state transition counters.
+        Returns:
+            Dict: The circuit breaker statistics.
+        """
+        total, failures, timeouts = self._window_counts()
+        return {
+            "state": self.state.value,
+            "window_requests": total,
+            "window_failures": failures,
+            "window_timeouts": timeouts,
+            "transitions": dict(self.transitions),
+        }
+
+    def _record(self, outcome: CallOutcome) -> None:
+        now = int(time.monotonic())
+        bucket = self._buckets[now % self.config.window_in_sec]
+        if bucket[0] != now:
+            bucket[:] = [now, 0, 0, 0]
+        bucket[1] += 1
+        if outcome == CallOutcome.FAILURE:
+            bucket[2] += 1
+        elif outcome == CallOutcome.TIMEOUT:
+            bucket[3] += 1
+
+    def _window_counts(self) -> Tuple[int, int, int]:
+        lower = int(time.monotonic()) - self.config.window_in_sec
+        total = failures = timeouts = 0
+        for second, bucket_total, bucket_failures, bucket_timeouts in self._buckets:
+            if second > lower:
+                total += bucket_total
+                failures += bucket_failures
+                timeouts += bucket_timeouts
+        return total, failures, timeouts
+
+    def _export_state(self) -> None:
+        for state in CircuitState:
+            CIRCUIT_BREAKER_STATE.labels(state.value).set(1 if state == self.state else 0)
+
+    def _transition(self, new_state: CircuitState) -> None:
+        old_state = self.state
+        self.state = new_state
+        key = f"{old_state.value}->{new_state.value}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        CIRCUIT_BREAKER_TRANSITIONS.labels(old_state.value, new_state.value).inc()
+        self._export_state()
+        if new_state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+            total, failures, timeouts = self._window_counts()
+            logger.warning(f"Engine circuit breaker {key}, window requests: {total}, "
+                           f"failures: {failures}, timeouts: {timeouts}")
+        else:
+            logger.info(f"Engine circuit breaker {key}")
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        if new_state == CircuitState.CLOSED:
+            for bucket in self._buckets:
+                bucket[:] = [0, 0, 0, 0]
+
+
+class EngineCall:
+    """Context manager recording the outcome of one engine call admitted by a circuit breaker.
+
+    The caller sets `outcome` once the call returns; an exception escaping the block is recorded as a failure.
+    A call whose result is only known later, e.g. a streamed response, is deferred and ended by `finish`, a half-open
+    probe keeps its slot until then.
+    A None breaker makes the context manager a no-op.
+    """
+
+    def __init__(self, breaker: Optional[CircuitBreaker]) -> None:
+        self.breaker = breaker
+        self.outcome = CallOutcome.IGNORED
+        self._acquired_state = breaker.state if breaker is not None else None
+        self._deferred = False
+        self._finished = False
+
+    def __enter__(self) -> "EngineCall":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.outcome = CallOutcome.FAILURE
+        elif exc_type is None and self._deferred:
+            return
+        self.finish(self.outcome)
+
+    def defer(self) -> None:
+        """Leave the outcome to `finish` when the block is left without an exception."""
+        self._deferred = True
+
+    def finish(self, outcome: CallOutcome) -> None:
+        """
+        Record the outcome of the call in the breaker, only the first outcome of a call counts.
+        Args:
+            outcome (CallOutcome): The outcome of the call.
+        """
+        if self.breaker is None or self._finished:
+            return
+        self._finished = True
+        self.outcome = outcome
+        self.breaker.release(outcome, self._acquired_state)
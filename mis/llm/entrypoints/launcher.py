@@ -39,11 +39,17 @@ from mis import constants
 from mis.args import ARGS, GlobalArgs
 from mis.hub.envpreparation import environment_preparation
 from mis.llm.engine_factory import AutoEngine
-from mis.llm.entrypoints.middleware import (RateLimitConfig, RequestSizeLimitMiddleware,
-                                            RequestHeaderSizeLimitMiddleware,
+from mis.llm.entrypoints.access_log import AccessLogMiddleware, AccessRecorder
+from mis.llm.entrypoints.loop_monitor import EventLoopMonitor
+from mis.llm.entrypoints.metrics import STARTUP_DURATION, STARTUP_PHASE_DURATION
+from mis.llm.entrypoints.tracing import build_tracer
+from mis.llm.entrypoints.middleware import (DEFAULT_ADMISSION_POOLS, DEFAULT_ROUTE_LIMITS, EncodedRejection,
+                                            PreEncodedResponse, RateLimitConfig, RejectionLogAggregator,
+                                            RequestSizeLimitMiddleware, RequestHeaderSizeLimitMiddleware,
                                             ConcurrencyLimitMiddleware, RateLimitMiddleware,
                                             RequestTimeoutMiddleware)
-from mis.logger import init_logger, LogType
+from mis.logger import init_logger, LogType, dump_flight_recorder, is_flight_recorder_enabled
+from mis.utils.startup_timing import STARTUP_TIMER
 from mis.utils.utils import get_client_ip
 
 logger = init_logger(__name__, log_type=LogType.SERVICE)
@@ -65,13 +71,39 @@ async def lifespan(app: ASGIApp) -> None:
     if app is None:
         logger.error("ASGIApp application instance is required and cannot be None.")
         raise ValueError("ASGIApp application instance is required and cannot be None.")
+    loop_monitor = getattr(app.state, "loop_monitor", None)
+    if loop_monitor is not None:
+        loop_monitor.start()
+    load_reporter = getattr(app.state, "load_reporter", None)
+    if load_reporter is not None:
+        load_reporter.start()
+    STARTUP_TIMER.lap("server_start")
+    _report_startup()
     yield
     logger.info("Application is shutting down.")
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+    if load_reporter is not None:
+        await load_reporter.stop()
+    tracer = getattr(app.state, "tracer", None)
+    if tracer is not None:
+        # The exporters wait for their queued spans, which must not block the event loop
+        await asyncio.to_thread(tracer.exporter.shutdown)
     if hasattr(app.state, "rate_limit_middleware"):
         logger.info("Shutting down rate limit middleware.")
         await app.state.rate_limit_middleware.shutdown()
 
 
+def _report_startup() -> None:
+    """Log the startup report of the process once and export it as metrics."""
+    report = STARTUP_TIMER.report()
+    if report is None:
+        return
+    STARTUP_DURATION.set(report["total_in_sec"])
+    for phase, duration in report["phases"].items():
+        STARTUP_PHASE_DURATION.labels(phase).set(duration)
+
+
 @asynccontextmanager
 async def _build_engine_client_from_args(args: GlobalArgs) -> EngineClient:
     """
@@ -131,6 +163,11 @@ def _add_exception_handlers(app: ASGIApp):
         client_ip = get_client_ip(request)
         op_logger.error(f"[IP: {client_ip}] {HTTPStatus.INTERNAL_SERVER_ERROR.value} "
                         "Internal server error")
+        # Keep the DEBUG records leading up to the error, the dump is written off the event loop
+        if is_flight_recorder_enabled():
+            asyncio.get_running_loop().run_in_executor(
+                None, dump_flight_recorder, f"Internal server error: {type(exc).__name__}",
+                constants.FLIGHT_RECORDER_DUMP_INTERVAL_IN_SEC)
         return JSONResponse(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
             content={
@@ -145,18 +182,24 @@ def _add_middlewares(args: GlobalArgs, app: ASGIApp):
     # Add request size limiting middleware using configured limit
     app.add_middleware(RequestSizeLimitMiddleware, max_body_size=constants.MAX_REQUEST_BODY_SIZE)
 
-    # Add concurrent request limiting middleware using configured limit
-    app.add_middleware(ConcurrencyLimitMiddleware, max_concurrent_requests=constants.MAX_CONCURRENT_REQUESTS)
+    # Add concurrent request limiting middleware, short and long-context requests are admitted from separate pools,
+    # metadata and tokenization routes get their own small pools outside of the generation slots
+    app.add_middleware(ConcurrencyLimitMiddleware, max_concurrent_requests=constants.MAX_CONCURRENT_REQUESTS,
+                       pools=DEFAULT_ADMISSION_POOLS, route_limits=DEFAULT_ROUTE_LIMITS)
 
-    # Add rate limiting middleware
+    # Add rate limiting middleware, every route class is counted in its own budget
     rate_limit_config = RateLimitConfig(requests_per_minute=constants.RATE_LIMIT_PER_MINUTE)
 
-    rate_limit_middleware = RateLimitMiddleware(app, config=rate_limit_config)
-    app.add_middleware(rate_limit_middleware.__class__, config=rate_limit_config)
-    app.add_middleware(RequestTimeoutMiddleware, request_timeout_in_sec=constants.REQUEST_TIMEOUT_IN_SEC)
+    rate_limit_middleware = RateLimitMiddleware(app, config=rate_limit_config, route_limits=DEFAULT_ROUTE_LIMITS)
+    app.add_middleware(rate_limit_middleware.__class__, config=rate_limit_config, route_limits=DEFAULT_ROUTE_LIMITS)
+    app.add_middleware(RequestTimeoutMiddleware, request_timeout_in_sec=constants.REQUEST_TIMEOUT_IN_SEC,
+                       route_limits=DEFAULT_ROUTE_LIMITS)
 
 
 def _add_restrict_host_middleware(app: ASGIApp):
+    rejection = EncodedRejection(HTTPStatus.FORBIDDEN, {"detail": "Forbidden: Invalid Host"})
+    rejection_log = RejectionLogAggregator(operation_logger=op_logger, reason="invalid_host")
+
     @app.middleware("http")
     async def restrict_host_middleware(request: Request, call_next: callable) -> JSONResponse:
         """
@@ -180,11 +223,8 @@ def _add_restrict_host_middleware(app: ASGIApp):
         try:
             host = request.headers.get("host", "").split(":")[0]
             if host not in allowed_hosts:
-                op_logger.warning(f"[IP: {client_ip}] {HTTPStatus.FORBIDDEN.value} Invalid host")
-                return JSONResponse(
-                    status_code=HTTPStatus.FORBIDDEN,
-                    content={"detail": "Forbidden: Invalid Host"}
-                )
+                rejection_log.record("warning", HTTPStatus.FORBIDDEN, client_ip, "Invalid host")
+                return PreEncodedResponse(rejection)
             return await call_next(request)
         except AttributeError as e:
             op_logger.error(
@@ -228,10 +268,32 @@ def _build_app(args: GlobalArgs) -> ASGIApp:
                        "For security, please correctly set MIS_ENABLE_DOS_PROTECTION.")
     _add_exception_handlers(app)
     _add_restrict_host_middleware(app)
+    # Added last, so the access log also counts requests rejected by the other middlewares
+    tracer = build_tracer(args.trace_sample_rate, args.trace_exporter, args.trace_otlp_endpoint,
+                          args.trace_trust_parent)
+    app.add_middleware(AccessLogMiddleware, recorder=AccessRecorder(sample_rate=args.access_log_sample_rate),
+                       tracer=tracer)
+    app.state.tracer = tracer
+    if args.loop_stall_threshold_ms:
+        app.state.loop_monitor = EventLoopMonitor(threshold_in_sec=args.loop_stall_threshold_ms / 1000)
 
     from mis.llm.entrypoints.openai.api_server import router as openai_router
     app.include_router(openai_router)
 
+    if args.enable_metrics:
+        from mis.llm.entrypoints.metrics import router as metrics_router
+        app.include_router(metrics_router)
+
+    if args.enable_load_report:
+        from mis.llm.entrypoints.load import LoadReporter, router as load_router
+        app.include_router(load_router)
+        app.state.load_reporter = LoadReporter(app)
+
+    if args.enable_admin_api:
+        from mis.llm.entrypoints.admin import router as admin_router
+        app.include_router(admin_router)
+        logger.warning("The admin API is enabled, runtime limits can be changed from localhost.")
+
     return app
 
 
@@ -273,6 +335,7 @@ async def _run_server(args: GlobalArgs) -> None:
     sock = create_server_socket(sock_addr)
     logger.debug("Setting ulimit")
     set_ulimit()
+    STARTUP_TIMER.lap("server_socket")
 
     def signal_handler(*_: object) -> None:
         logger.error("Received SIGTERM, terminating")
@@ -280,18 +343,28 @@ async def _run_server(args: GlobalArgs) -> None:
 
     signal.signal(signal.SIGTERM, signal_handler)
 
+    if is_flight_recorder_enabled():
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGUSR1, lambda: loop.run_in_executor(
+            None, dump_flight_recorder, "Received SIGUSR1"))
+        logger.info("Flight recorder is enabled, send SIGUSR1 to dump it")
+
     async with _build_engine_client_from_args(args) as engine_client:
+        STARTUP_TIMER.lap("engine_build")
         logger.info("Building ASGIApp application")
         app = _build_app(args)
+        STARTUP_TIMER.lap("app_build")
 
         app.state.engine_client = engine_client
         app.state.log_stats = not args.disable_log_stats
 
         logger.info("Getting model configuration")
         model_config = await engine_client.get_model_config()
+        STARTUP_TIMER.lap("model_config")
 
         logger.info("Initializing app state")
         await _init_app_state(engine_client, model_config, app, args)
+        STARTUP_TIMER.lap("app_state")
 
         logger.info("Starting HTTP server")
         shutdown_task = await serve_http(
@@ -342,6 +415,7 @@ async def _run(args: GlobalArgs) -> None:
 
 def main() -> None:
     """Main entry point for the application."""
+    STARTUP_TIMER.lap("import")
     args = environment_preparation(ARGS)
     uvloop.run(_run(args))
 
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import asyncio
+import json
+import time
+from http import HTTPStatus
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Request
+from starlette.responses import Response
+from starlette.types import ASGIApp
+
+from mis import constants
+from mis.llm.entrypoints.metrics import REQUESTS_IN_FLIGHT
+from mis.llm.entrypoints.middleware import ConcurrencyLimitMiddleware, find_middleware
+from mis.logger import init_logger, LogType
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+
+router = APIRouter()
+
+# Engine gauges in the default prometheus_client registry, the KV cache gauge was renamed in vLLM 0.10
+ENGINE_RUNNING_METRIC = "vllm:num_requests_running"
+ENGINE_WAITING_METRIC = "vllm:num_requests_waiting"
+ENGINE_KV_CACHE_METRICS = ("vllm:kv_cache_usage_perc", "vllm:gpu_cache_usage_perc")
+
+
+def _read_engine_gauges() -> Dict[str, float]:
+    """
+    Read the engine load gauges, which the engine only updates when its stats are enabled.
+    Returns:
+        Dict[str, float]: Gauge values keyed by metric name, summed over label sets; KV cache gauges keep the maximum.
+    """
+    try:
+        from prometheus_client import REGISTRY as ENGINE_REGISTRY
+    except ImportError:
+        return {}
+    names = (ENGINE_RUNNING_METRIC, ENGINE_WAITING_METRIC) + ENGINE_KV_CACHE_METRICS
+    values = {}
+    for family in ENGINE_REGISTRY.restricted_registry(names).collect():
+        for sample in family.samples:
+            if sample.name not in names:
+                continue
+            if sample.name in ENGINE_KV_CACHE_METRICS:
+                values[sample.name] = max(values.get(sample.name, 0.0), sample.value)
+            else:
+                values[sample.name] = values.get(sample.name, 0.0) + sample.value
+    return values
+
+
+class LoadReporter:
+    """Load report of the service for gateways and autoscalers.
+
+    The report is collected by a background task every `interval_in_sec` and kept as an encoded JSON body, so
+    serving it costs no computation however often it is polled. The headroom score is the free share of the
+    tighter of the admission slots and the KV cache, from 0 (saturated) to 1 (idle).
+    """
+
+    def __init__(self, app: ASGIApp, interval_in_sec: float = constants.LOAD_REPORT_INTERVAL_IN_SEC) -> None:
+        """
+        Initialize the reporter.
+        Args:
+            app (ASGIApp): The application whose middlewares and engine are reported.
+            interval_in_sec (float): Interval between two refreshes of the report.
+        """
+        if not isinstance(interval_in_sec, (int, float)) or interval_in_sec <= 0:
+            logger.error(f"interval_in_sec of load report must be positive, got {interval_in_sec}")
+            raise ValueError(f"interval_in_sec of load report must be positive, got {interval_in_sec}")
+        self.app = app
+        self.interval_in_sec = interval_in_sec
+        self.content = b""
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Collect the first report and start refreshing it, must be called from the event loop."""
+        self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop refreshing the report."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def refresh(self) -> None:
+        """Collect the report and encode it."""
+        self.content = json.dumps(self.collect(), separators=(",", ":")).encode("utf-8")
+
+    def collect(self) -> Dict:
+        """
+        Collect the current load of the service.
+        Returns:
+            Dict: The load report, engine values are None while engine stats are disabled.
+        """
+        report = {
+            "in_flight_requests": int(REQUESTS_IN_FLIGHT.labels().value),
+            "queued_requests": 0,
+            "max_concurrent_requests": None,
+            "engine_running_requests": None,
+            "engine_waiting_requests": None,
+            "kv_cache_usage": None,
+            "headroom": None,
+            "updated_at": round(time.time(), 3),
+        }
+        free_shares = []
+        concurrency = find_middleware(self.app, ConcurrencyLimitMiddleware)
+        if concurrency is not None:
+            # Only the generation pools, the requests of the other route classes do not load the engine
+            active = sum(pool.active for pool in concurrency.pools)
+            queued = sum(pool.waiting for pool in concurrency.pools)
+            report["in_flight_requests"] = active
+            report["queued_requests"] = queued
+            report["max_concurrent_requests"] = concurrency.max_concurrent_requests
+            free_shares.append(1 - (active + queued) / concurrency.max_concurrent_requests)
+        if getattr(self.app.state, "log_stats", False):
+            gauges = _read_engine_gauges()
+            if ENGINE_RUNNING_METRIC in gauges:
+                report["engine_running_requests"] = int(gauges[ENGINE_RUNNING_METRIC])
+            if ENGINE_WAITING_METRIC in gauges:
+                report["engine_waiting_requests"] = int(gauges[ENGINE_WAITING_METRIC])
+            kv_cache_usage = next((gauges[name] for name in ENGINE_KV_CACHE_METRICS if name in gauges), None)
+            if kv_cache_usage is not None:
+                report["kv_cache_usage"] = round(kv_cache_usage, 4)
+                free_shares.append(1 - kv_cache_usage)
+        if free_shares:
+            report["headroom"] = round(min(max(min(free_shares), 0.0), 1.0), 4)
+        return report
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_in_sec)
+            try:
+                self.refresh()
+            except Exception as e:
+                # A failed refresh keeps serving the previous report instead of stopping the refreshes
+                logger.warning(f"Failed to refresh the load report: {e}")
+
+
+@router.get("/load")
+async def show_load(raw_request: Request) -> Response:
+    """Serve the cached load report, it bypasses the admission and rate limits."""
+    reporter = getattr(raw_request.app.state, "load_reporter", None)
+    if reporter is None or not reporter.content:
+        return Response(content=b'{"detail":"Load report is not available yet"}',
+                        status_code=HTTPStatus.SERVICE_UNAVAILABLE.value, media_type="application/json")
+    return Response(content=reporter.content, status_code=HTTPStatus.OK.value, media_type="application/json")
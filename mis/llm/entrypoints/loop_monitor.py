@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from mis import constants
+from mis.llm.entrypoints.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+from mis.logger import init_logger, LogType
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+
+
+def format_thread_stack(thread_id: int, depth: int = constants.LOOP_STALL_STACK_DEPTH) -> Optional[str]:
+    """
+    Format the current Python stack of a thread on one line, innermost frame last.
+    Args:
+        thread_id (int): The identifier of the thread.
+        depth (int): The maximum number of innermost frames kept.
+    Returns:
+        Optional[str]: The stack as "file:line in function" entries, None if the thread is not running.
+    """
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return None
+    entries = traceback.extract_stack(frame)[-depth:]
+    return " -> ".join(f"{os.path.basename(entry.filename)}:{entry.lineno} in {entry.name}" for entry in entries)
+
+
+class EventLoopMonitor:
+    """Monitor of the event loop scheduling lag.
+
+    A probe task sleeps for `interval_in_sec` and observes how late it wakes up in the event loop lag histogram.
+    A watchdog thread checks the heartbeat of the probe; once the loop has not run the probe for
+    `threshold_in_sec` it captures the Python stack of the loop thread, i.e. the code blocking the loop, and logs
+    it. At most one stack is logged per `log_interval_in_sec`, further stalls are counted and reported with the next
+    logged stack.
+    """
+
+    def __init__(self, threshold_in_sec: float, interval_in_sec: float = constants.LOOP_MONITOR_INTERVAL_IN_SEC,
+                 log_interval_in_sec: int = constants.LOOP_STALL_LOG_INTERVAL_IN_SEC) -> None:
+        """
+        Initialize the monitor.
+        Args:
+            threshold_in_sec (float): Blocking time after which the loop is considered stalled.
+            interval_in_sec (float): Interval of the probe.
+            log_interval_in_sec (int): Minimum interval between two logged stacks.
+        """
+        if not isinstance(threshold_in_sec, (int, float)) or not isinstance(interval_in_sec, (int, float)):
+            logger.error("threshold_in_sec and interval_in_sec of the event loop monitor must be numbers.")
+            raise TypeError("threshold_in_sec and interval_in_sec of the event loop monitor must be numbers.")
+        if threshold_in_sec <= 0 or interval_in_sec <= 0 or log_interval_in_sec < 0:
+            logger.error("threshold_in_sec and interval_in_sec of the event loop monitor must be positive.")
+            raise ValueError("threshold_in_sec and interval_in_sec of the event loop monitor must be positive.")
+        self.threshold_in_sec = threshold_in_sec
+        self.interval_in_sec = interval_in_sec
+        self.log_interval_in_sec = log_interval_in_sec
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        # Watchdog thread state: heartbeat of the stall already reported, last logged stack, suppressed stalls
+        self._reported_heartbeat = 0.0
+        self._last_logged = -float("inf")
+        self._suppressed = 0
+
+    def start(self) -> None:
+        """Start the probe on the running event loop and the watchdog thread."""
+        if self._probe_task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._probe_task = asyncio.get_running_loop().create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="mis-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event loop monitor started, stall threshold: {self.threshold_in_sec * 1000:.0f}ms")
+
+    async def stop(self) -> None:
+        """Stop the probe and the watchdog thread."""
+        self._stopped.set()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval_in_sec * 2)
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_in_sec
+            await asyncio.sleep(self.interval_in_sec)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(now - expected, 0.0)
+            EVENT_LOOP_LAG.observe(lag)
+            if lag >= self.threshold_in_sec:
+                EVENT_LOOP_STALLS.inc()
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval_in_sec):
+            self.check_stall(time.monotonic())
+
+    def check_stall(self, now: float) -> None:
+        """
+        Capture and log the stack of the loop thread if the loop is stalled, called from the watchdog thread.
+        Args:
+            now (float): The current monotonic time.
+        """
+        heartbeat = self._heartbeat
+        blocked = now - heartbeat - self.interval_in_sec
+        if blocked < self.threshold_in_sec or heartbeat == self._reported_heartbeat:
+            return
+        # Report each stall once, it ends when the probe runs again
+        self._reported_heartbeat = heartbeat
+        if now - self._last_logged < self.log_interval_in_sec:
+            self._suppressed += 1
+            return
+        stack = format_thread_stack(self._loop_thread_id) if self._loop_thread_id is not None else None
+        suppressed = f", {self._suppressed} more stalls since the last report" if self._suppressed else ""
+        logger.warning(f"Event loop blocked for more than {blocked * 1000:.0f}ms{suppressed}, "
+                       f"stack of the loop thread: {stack or 'unavailable'}")
+        self._last_logged = now
+        self._suppressed = 0
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+from http import HTTPStatus
+from typing import Dict
+
+from fastapi import APIRouter, Request
+from starlette.responses import Response
+
+from mis.logger import init_logger, LogType
+from mis.utils.metrics import MetricsRegistry
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter()
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_DURATION = REGISTRY.histogram("mis_request_duration_seconds",
+                                      "Time until the response started, per matched route.", ("route",))
+REQUESTS = REGISTRY.counter("mis_requests", "Handled requests per matched route and status code.",
+                            ("route", "status"))
+REQUESTS_IN_FLIGHT = REGISTRY.gauge("mis_requests_in_flight", "Requests currently being handled.")
+REJECTIONS = REGISTRY.counter("mis_rejections", "Requests rejected by the middlewares per reason and status code.",
+                              ("reason", "status"))
+RATE_LIMIT_HITS = REGISTRY.counter("mis_rate_limit_hits", "Requests over the rate limit per route class.",
+                                   ("route_class",))
+POOL_ACTIVE = REGISTRY.gauge("mis_admission_pool_active_requests", "Requests holding a slot of an admission pool.",
+                             ("pool",))
+POOL_WAITING = REGISTRY.gauge("mis_admission_pool_queued_requests", "Requests queued for a slot of an admission pool.",
+                              ("pool",))
+ADMISSION_WAIT = REGISTRY.histogram("mis_admission_wait_seconds",
+                                    "Time requests waited for a slot of their admission pool.", ("pool",))
+VALIDATION_DURATION = REGISTRY.histogram("mis_validation_duration_seconds",
+                                         "Time from admission until the handler started, spent reading and "
+                                         "validating the request.")
+GENERATION_DURATION = REGISTRY.histogram("mis_generation_duration_seconds",
+                                         "Time from the engine call until the last generated chunk.", ("stream",))
+TIME_TO_FIRST_TOKEN = REGISTRY.histogram("mis_time_to_first_token_seconds",
+                                         "Time from the engine call until the first streamed chunk carrying tokens.")
+INTER_TOKEN_LATENCY = REGISTRY.histogram("mis_inter_token_latency_seconds",
+                                         "Time between consecutive streamed chunks carrying tokens.")
+SERIALIZATION_DURATION = REGISTRY.histogram("mis_serialization_duration_seconds",
+                                            "Time spent serializing non-streaming responses.")
+EVENT_LOOP_LAG = REGISTRY.histogram("mis_event_loop_lag_seconds",
+                                    "Delay of the periodic event loop probe behind its schedule.",
+                                    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                                             10.0))
+EVENT_LOOP_STALLS = REGISTRY.counter("mis_event_loop_stalls", "Event loop probes delayed beyond the stall threshold.")
+STARTUP_DURATION = REGISTRY.gauge("mis_startup_seconds", "Time from process start until the server accepted requests.")
+STARTUP_PHASE_DURATION = REGISTRY.gauge("mis_startup_phase_seconds", "Duration of each startup phase.", ("phase",))
+STREAM_DURATION = REGISTRY.histogram("mis_stream_duration_seconds", "Duration of streaming responses.")
+STREAM_CHUNKS = REGISTRY.counter("mis_stream_chunks",
+                                 "Content chunks emitted by streaming responses, one per decoding step.")
+CIRCUIT_BREAKER_STATE = REGISTRY.gauge("mis_circuit_breaker_state",
+                                       "Engine circuit breaker state, 1 for the current state and 0 for the others.",
+                                       ("state",))
+CIRCUIT_BREAKER_TRANSITIONS = REGISTRY.counter("mis_circuit_breaker_transitions",
+                                               "State transitions of the engine circuit breaker.",
+                                               ("from_state", "to_state"))
+
+
+def format_server_timing(phases: Dict[str, float]) -> str:
+    """
+    Format request phases as a Server-Timing header value.
+    Args:
+        phases (Dict[str, float]): Phase durations in seconds keyed by phase name.
+    Returns:
+        str: The header value, e.g. "admission;dur=0.512, generation;dur=530.118" with durations in milliseconds.
+    """
+    return ", ".join(f"{name};dur={duration * 1000:.3f}" for name, duration in phases.items())
+
+
+def _render_engine_metrics() -> str:
+    """Render the metrics the engine registered in the default prometheus_client registry."""
+    try:
+        from prometheus_client import REGISTRY as ENGINE_REGISTRY, generate_latest
+    except ImportError:
+        logger.warning("prometheus_client is not installed, engine metrics are not exported.")
+        return ""
+    return generate_latest(ENGINE_REGISTRY).decode("utf-8")
+
+
+@router.get("/metrics")
+async def show_metrics(raw_request: Request) -> Response:
+    """Export the serving metrics of MIS, followed by the engine metrics when engine stats are enabled."""
+    content = REGISTRY.render()
+    if getattr(raw_request.app.state, "log_stats", False):
+        content += _render_engine_metrics()
+    return Response(content=content, status_code=HTTPStatus.OK.value, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -18,19 +18,25 @@ See the Mulan PSL v2 for more details.
 -------------------------------------------------------------------------
 """
 import asyncio
+import json
+import logging
 import time
-from collections import defaultdict
-from dataclasses import dataclass
+from collections import defaultdict, deque
+from dataclasses import dataclass, replace
+from enum import Enum
+from functools import lru_cache
 from http import HTTPStatus
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
+from starlette.responses import Response
 from starlette.types import ASGIApp
 
 from mis import constants
+from mis.llm.entrypoints.metrics import ADMISSION_WAIT, POOL_ACTIVE, POOL_WAITING, RATE_LIMIT_HITS, REJECTIONS
 from mis.logger import init_logger, LogType
 from mis.utils.utils import get_client_ip
 
@@ -40,6 +46,7 @@ op_logger = init_logger(__name__ + ".operation", log_type=LogType.OPERATION)
 MINUTE_SECONDS = 60
 CLEANUP_INTERVAL_SECONDS = 300
 MAX_HEADER_COUNT = 200
+MAX_MIDDLEWARE_STACK_DEPTH = 64
 
 
 @dataclass
@@ -49,6 +56,285 @@ class RateLimitConfig:
     cleanup_interval: int = 600  # Cleanup interval in seconds
 
 
+@dataclass
+class AdmissionPoolConfig:
+    """Admission pool configuration of the concurrency limit"""
+    name: str
+    max_prompt_tokens: Optional[int]  # Upper bound of estimated prompt tokens, None for the last pool
+    max_concurrent_requests: int
+    max_queued_requests: int = 0
+
+
+DEFAULT_ADMISSION_POOLS = [
+    AdmissionPoolConfig(name="short",
+                        max_prompt_tokens=constants.ADMISSION_SHORT_PROMPT_MAX_TOKENS,
+                        max_concurrent_requests=constants.ADMISSION_SHORT_POOL_MAX_CONCURRENT,
+                        max_queued_requests=constants.ADMISSION_POOL_MAX_QUEUED),
+    AdmissionPoolConfig(name="long",
+                        max_prompt_tokens=None,
+                        max_concurrent_requests=constants.ADMISSION_LONG_POOL_MAX_CONCURRENT,
+                        max_queued_requests=constants.ADMISSION_POOL_MAX_QUEUED),
+]
+
+
+class RouteClass(Enum):
+    """Route classes with separate admission limits, only generation routes use the engine.
+    Admin routes get a timeout covering a profiling session.
+    Probe routes answer from cached state and bypass the concurrency and rate limits."""
+    GENERATION = "generation"
+    TOKENIZATION = "tokenization"
+    METADATA = "metadata"
+    ADMIN = "admin"
+    PROBE = "probe"
+
+
+@dataclass
+class RouteLimitConfig:
+    """Limits of one route class"""
+    max_concurrent_requests: int
+    requests_per_minute: int
+    request_timeout_in_sec: int
+
+
+# Routes not listed here are generation routes
+ROUTE_CLASS_PATHS = {
+    "/openai/v1/models": RouteClass.METADATA,
+    "/metrics": RouteClass.METADATA,
+    "/admin/limits": RouteClass.ADMIN,
+    "/admin/flight-recorder": RouteClass.ADMIN,
+    "/admin/profile": RouteClass.ADMIN,
+    "/admin/memory": RouteClass.ADMIN,
+    "/admin/memory/tracing": RouteClass.ADMIN,
+    "/admin/memory/baseline": RouteClass.ADMIN,
+    "/tokenize": RouteClass.TOKENIZATION,
+    "/detokenize": RouteClass.TOKENIZATION,
+    "/load": RouteClass.PROBE,
+}
+
+DEFAULT_ROUTE_LIMITS = {
+    RouteClass.METADATA: RouteLimitConfig(max_concurrent_requests=constants.METADATA_ROUTE_MAX_CONCURRENT,
+                                          requests_per_minute=constants.METADATA_ROUTE_RATE_LIMIT_PER_MINUTE,
+                                          request_timeout_in_sec=constants.METADATA_ROUTE_TIMEOUT_IN_SEC),
+    RouteClass.TOKENIZATION: RouteLimitConfig(max_concurrent_requests=constants.TOKENIZATION_ROUTE_MAX_CONCURRENT,
+                                              requests_per_minute=constants.TOKENIZATION_ROUTE_RATE_LIMIT_PER_MINUTE,
+                                              request_timeout_in_sec=constants.TOKENIZATION_ROUTE_TIMEOUT_IN_SEC),
+    RouteClass.ADMIN: RouteLimitConfig(max_concurrent_requests=constants.ADMIN_ROUTE_MAX_CONCURRENT,
+                                       requests_per_minute=constants.ADMIN_ROUTE_RATE_LIMIT_PER_MINUTE,
+                                       request_timeout_in_sec=constants.ADMIN_ROUTE_TIMEOUT_IN_SEC),
+}
+
+
+def classify_route(request: Request) -> RouteClass:
+    """
+    Get the route class of a request from its path.
+    Args:
+        request (Request): The incoming request.
+    Returns:
+        RouteClass: The route class, generation for unknown paths.
+    """
+    return ROUTE_CLASS_PATHS.get(request.url.path, RouteClass.GENERATION)
+
+
+def find_middleware(app: ASGIApp, middleware_class: type) -> Optional[ASGIApp]:
+    """
+    Find the running instance of a middleware class in the built middleware stack of an application.
+    Args:
+        app (ASGIApp): The application, usually `request.app`.
+        middleware_class (type): The middleware class to look for.
+    Returns:
+        Optional[ASGIApp]: The middleware instance, or None if the stack is not built or has no such middleware.
+    """
+    node = getattr(app, "middleware_stack", None)
+    for _ in range(MAX_MIDDLEWARE_STACK_DEPTH):
+        if node is None or isinstance(node, middleware_class):
+            return node
+        node = getattr(node, "app", None)
+    return None
+
+
+def _check_route_limits(route_limits: Optional[Dict[RouteClass, RouteLimitConfig]]) -> Dict:
+    """
+    Check the per route class limits, generation routes keep the limits of the middleware itself.
+    Args:
+        route_limits (Dict[RouteClass, RouteLimitConfig]): Limits keyed by route class. None for no route classes.
+    Returns:
+        Dict[RouteClass, RouteLimitConfig]: The checked route limits.
+    """
+    if route_limits is None:
+        return {}
+    if not isinstance(route_limits, dict):
+        logger.error(f"Invalid route_limits type: {type(route_limits)}, dict needed")
+        raise TypeError(f"Invalid route_limits type: {type(route_limits)}, dict needed")
+    for route_class, limits in route_limits.items():
+        if not isinstance(route_class, RouteClass) or not isinstance(limits, RouteLimitConfig):
+            logger.error("route_limits must map RouteClass to RouteLimitConfig.")
+            raise TypeError("route_limits must map RouteClass to RouteLimitConfig.")
+        if route_class == RouteClass.GENERATION:
+            logger.error("Generation routes use the limits of the middleware, not route_limits.")
+            raise ValueError("Generation routes use the limits of the middleware, not route_limits.")
+        if route_class == RouteClass.PROBE:
+            logger.error("Probe routes are not limited, they cannot have route_limits.")
+            raise ValueError("Probe routes are not limited, they cannot have route_limits.")
+        if min(limits.max_concurrent_requests, limits.requests_per_minute, limits.request_timeout_in_sec) <= 0:
+            logger.error(f"Limits of {route_class.value} routes must be positive.")
+            raise ValueError(f"Limits of {route_class.value} routes must be positive.")
+        if limits.request_timeout_in_sec > constants.REQUEST_TIMEOUT_IN_SEC:
+            logger.error(f"request_timeout_in_sec of {route_class.value} routes cannot exceed "
+                         f"{constants.REQUEST_TIMEOUT_IN_SEC}.")
+            raise ValueError(f"request_timeout_in_sec of {route_class.value} routes cannot exceed "
+                             f"{constants.REQUEST_TIMEOUT_IN_SEC}.")
+    return dict(route_limits)
+
+
+# Distinct client IPs remembered per status in one rejection log interval
+REJECTION_LOG_MAX_TRACKED_IPS = 10000
+
+
+class EncodedRejection:
+    """Status, JSON body and raw headers of a rejection response, encoded once and reused for every request."""
+
+    __slots__ = ("status_code", "body", "raw_headers")
+
+    def __init__(self, status_code: int, content: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        Encode a rejection response the same way JSONResponse renders it.
+        Args:
+            status_code (int): The HTTP status code.
+            content (Dict): The JSON content of the response.
+            headers (Dict[str, str]): Extra response headers. Default is None.
+        """
+        self.status_code = int(status_code)
+        self.body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                               separators=(",", ":")).encode("utf-8")
+        raw_headers = [(key.lower().encode("latin-1"), value.encode("latin-1"))
+                       for key, value in (headers or {}).items()]
+        raw_headers.append((b"content-length", str(len(self.body)).encode("latin-1")))
+        raw_headers.append((b"content-type", b"application/json"))
+        self.raw_headers: Tuple[Tuple[bytes, bytes], ...] = tuple(raw_headers)
+
+
+class PreEncodedResponse(Response):
+    """Response sending an EncodedRejection, skipping JSON rendering and header building on the hot path."""
+
+    media_type = "application/json"
+
+    def __init__(self, rejection: EncodedRejection) -> None:
+        self.status_code = rejection.status_code
+        self.background = None
+        self.body = rejection.body
+        # Starlette appends to raw_headers (e.g. set-cookie), so each response owns its list
+        self.raw_headers = list(rejection.raw_headers)
+
+
+TOO_MANY_HEADERS_REJECTION = EncodedRejection(HTTPStatus.BAD_REQUEST, {"detail": "Too many headers"})
+INVALID_HEADERS_REJECTION = EncodedRejection(HTTPStatus.BAD_REQUEST, {"detail": "Error parsing request headers"})
+REQUEST_TIMEOUT_REJECTION = EncodedRejection(HTTPStatus.REQUEST_TIMEOUT, {"detail": "Request timeout"})
+
+
+@lru_cache(maxsize=MINUTE_SECONDS + 1)
+def _rate_limit_rejection(retry_after: int) -> EncodedRejection:
+    """Rate limit rejections only differ in retry_after, which is bounded by the window length."""
+    return EncodedRejection(HTTPStatus.TOO_MANY_REQUESTS,
+                            {"detail": "Rate limit exceeded", "retry_after": retry_after})
+
+
+class RejectionLogAggregator:
+    """Rate-limited logging of rejected requests.
+
+    Up to `burst` rejections per interval are logged as full operation log lines. Further rejections only bump
+    per-status counters and are collapsed into one summary line per status when the interval ends, e.g.
+    "1200 429s from 37 IPs in the last 10s", so a flood of rejections cannot turn into a flood of log writes.
+    Every rejection is also counted in the rejection metric under the reason of the aggregator.
+    """
+
+    def __init__(self, interval_in_sec: int = constants.REJECTION_LOG_INTERVAL_IN_SEC,
+                 burst: int = constants.REJECTION_LOG_BURST, operation_logger: Optional[logging.Logger] = None,
+                 reason: str = "rejected") -> None:
+        """
+        Initialize the aggregator.
+        Args:
+            interval_in_sec (int): Length of one aggregation interval in seconds.
+            burst (int): Full log lines allowed per interval.
+            operation_logger (logging.Logger): The operation logger to write to. Default is the one of this module.
+            reason (str): The reason label of the counted rejections, e.g. "rate_limit".
+        """
+        if not isinstance(interval_in_sec, int) or not isinstance(burst, int):
+            logger.error("interval_in_sec and burst of rejection log must be integers.")
+            raise TypeError("interval_in_sec and burst of rejection log must be integers.")
+        if interval_in_sec <= 0 or burst < 0:
+            logger.error("interval_in_sec must be positive and burst must be non-negative.")
+            raise ValueError("interval_in_sec must be positive and burst must be non-negative.")
+        self.interval_in_sec = interval_in_sec
+        self.burst = burst
+        self.operation_logger = operation_logger
+        self.reason = reason
+        self._window_start = time.monotonic()
+        self._logged = 0
+        # Suppressed rejections of the current interval: status -> [count, client IPs]
+        self._suppressed: Dict[int, list] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def record(self, level: str, status: HTTPStatus, client_ip: str, message: str, *args) -> None:
+        """
+        Record one rejection, the message is only formatted when a full line is logged.
+        Args:
+            level (str): The operation log level, e.g. "warning" or "error".
+            status (HTTPStatus): The status code of the rejection.
+            client_ip (str): The client IP address.
+            message (str): The %-style log message describing the rejection.
+            *args: Arguments of the log message.
+        """
+        REJECTIONS.labels(self.reason, str(status.value)).inc()
+        now = time.monotonic()
+        if now - self._window_start >= self.interval_in_sec:
+            self.flush(now)
+        if self._logged < self.burst:
+            self._logged += 1
+            text = message % args if args else message
+            getattr(self.operation_logger or op_logger, level)(f"[IP: {client_ip}] {status.value} {text}")
+            return
+        entry = self._suppressed.get(status.value)
+        if entry is None:
+            entry = self._suppressed[status.value] = [0, set()]
+            self._schedule_flush()
+        entry[0] += 1
+        if len(entry[1]) < REJECTION_LOG_MAX_TRACKED_IPS:
+            entry[1].add(client_ip)
+
+    def flush(self, now: Optional[float] = None) -> None:
+        """
+        Log the summary lines of the suppressed rejections and start a new interval.
+        Args:
+            now (float): The current monotonic time. Default is read from the clock.
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = max(int(now - self._window_start), 1)
+        for status, (count, client_ips) in sorted(self._suppressed.items()):
+            (self.operation_logger or op_logger).warning(
+                f"{count} {status}s from {len(client_ips)} IPs in the last {elapsed}s")
+        self._suppressed = {}
+        self._logged = 0
+        self._window_start = now
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _schedule_flush(self) -> None:
+        """Make sure the summary is logged even if no further rejection arrives after this interval."""
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        delay = max(self.interval_in_sec - (time.monotonic() - self._window_start), 0)
+        self._flush_handle = loop.call_later(delay, self._on_flush_timer)
+
+    def _on_flush_timer(self) -> None:
+        self._flush_handle = None
+        self.flush()
+
+
 class RequestHeaderSizeLimitMiddleware(BaseHTTPMiddleware):
     """Middleware for limiting request header size"""
 
@@ -66,6 +352,10 @@ class RequestHeaderSizeLimitMiddleware(BaseHTTPMiddleware):
             raise TypeError(f"Invalid max_header_size type: {type(max_header_size)}, integer needed.")
         super().__init__(app)
         self.max_header_size = max_header_size
+        self.rejection = EncodedRejection(
+            HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+            {"detail": f"Request headers too large. Maximum size: {max_header_size} bytes"})
+        self.rejection_log = RejectionLogAggregator(reason="header_limit")
 
     async def dispatch(self, request: Request, call_next: callable) -> JSONResponse:
         """ Check request header size and reject if it exceeds the limit
@@ -85,25 +375,19 @@ class RequestHeaderSizeLimitMiddleware(BaseHTTPMiddleware):
         header_size = 0
         try:
             if len(request.headers) > MAX_HEADER_COUNT:
-                op_logger.error(f"[IP: {client_ip}] {HTTPStatus.BAD_REQUEST.value} Too many headers")
-                return JSONResponse(status_code=HTTPStatus.BAD_REQUEST, content={"detail": "Too many headers"})
+                self.rejection_log.record("error", HTTPStatus.BAD_REQUEST, client_ip, "Too many headers")
+                return PreEncodedResponse(TOO_MANY_HEADERS_REJECTION)
             for name, value in request.headers.items():
                 header_size += len(name.encode('utf-8')) + len(b": ") + len(value.encode('utf-8'))
         except Exception as e:
-            op_logger.error(
-                f"[IP: {client_ip}] {HTTPStatus.BAD_REQUEST.value} Error parsing request headers: {e}")
-            return JSONResponse(
-                status_code=HTTPStatus.BAD_REQUEST,
-                content={"detail": "Error parsing request headers"}
-            )
+            self.rejection_log.record("error", HTTPStatus.BAD_REQUEST, client_ip,
+                                      "Error parsing request headers: %s", e)
+            return PreEncodedResponse(INVALID_HEADERS_REJECTION)
         if header_size > self.max_header_size:
-            op_logger.warning(
-                f"[IP: {client_ip}] {HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE.value} "
-                f"Request headers too large: {header_size} bytes, limit: {self.max_header_size} bytes")
-            return JSONResponse(
-                status_code=HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
-                content={"detail": f"Request headers too large. Maximum size: {self.max_header_size} bytes"}
-            )
+            self.rejection_log.record("warning", HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, client_ip,
+                                      "Request headers too large: %d bytes, limit: %d bytes",
+                                      header_size, self.max_header_size)
+            return PreEncodedResponse(self.rejection)
 
         response = await call_next(request)
         return response
@@ -133,6 +417,10 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
             raise ValueError(f"max_body_size must be a positive integer, got {max_body_size}.")
         super().__init__(app)
         self.max_body_size = max_body_size
+        self.rejection = EncodedRejection(
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            {"detail": f"Request body too large. Maximum size: {max_body_size} bytes"})
+        self.rejection_log = RejectionLogAggregator(reason="body_size")
 
     async def dispatch(self, request: Request, call_next: callable) -> JSONResponse:
         """
@@ -162,7 +450,7 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         return response
 
-    def _check_content_length(self, request: Request) -> Optional[JSONResponse]:
+    def _check_content_length(self, request: Request) -> Optional[Response]:
         """
         Check the Content-Length header to determine if the request body size is within the limit.
         Args:
@@ -180,14 +468,10 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
         if content_length and not is_chunked:
             content_length = int(content_length)
             if content_length > self.max_body_size:
-                op_logger.warning(f"[IP: {client_ip}] {HTTPStatus.REQUEST_ENTITY_TOO_LARGE.value} "
-                                  f"Request body too large: {content_length} bytes, "
-                                  f"limit: {self.max_body_size} bytes")
-                return JSONResponse(
-                    status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
-                    content={"detail": f"Request body too large. "
-                                       f"Maximum size: {self.max_body_size} bytes"}
-                )
+                self.rejection_log.record("warning", HTTPStatus.REQUEST_ENTITY_TOO_LARGE, client_ip,
+                                          "Request body too large: %d bytes, limit: %d bytes",
+                                          content_length, self.max_body_size)
+                return PreEncodedResponse(self.rejection)
         return None
 
     def _handle_chunked_transfer(self, request: Request) -> None:
@@ -211,9 +495,9 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
             async for chunk in original_stream:
                 total_size += len(chunk)
                 if total_size > self.max_body_size:
-                    op_logger.warning(f"[IP: {client_ip}] {HTTPStatus.REQUEST_ENTITY_TOO_LARGE.value} "
-                                      f"Chunked request body too large: {total_size} bytes, "
-                                      f"limit: {self.max_body_size} bytes")
+                    self.rejection_log.record("warning", HTTPStatus.REQUEST_ENTITY_TOO_LARGE, client_ip,
+                                              "Chunked request body too large: %d bytes, limit: %d bytes",
+                                              total_size, self.max_body_size)
                     raise HTTPException(
                         status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
                         detail=f"The request body is too large. "
@@ -224,15 +508,111 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
                 request.stream = limited_stream
 
 
+class _AdmissionPool:
+    """Runtime state of one admission pool: its slots and the requests queued for them.
+
+    Slots are handed to queued requests in FIFO order. Unlike a semaphore the number of slots can be changed
+    while requests are running; shrinking only takes effect as running requests finish.
+    """
+
+    def __init__(self, config: AdmissionPoolConfig) -> None:
+        self.config = config
+        self.rejection = self._encode_rejection(config)
+        self.active = 0
+        self.waiting = 0
+        self._waiters: deque = deque()
+        self._active_gauge = POOL_ACTIVE.labels(config.name)
+        self._waiting_gauge = POOL_WAITING.labels(config.name)
+        self.wait_histogram = ADMISSION_WAIT.labels(config.name)
+
+    @staticmethod
+    def _encode_rejection(config: AdmissionPoolConfig) -> EncodedRejection:
+        return EncodedRejection(
+            HTTPStatus.TOO_MANY_REQUESTS,
+            {"detail": f"Too many requests. Maximum concurrent requests: {config.max_concurrent_requests}"})
+
+    def is_full(self) -> bool:
+        """Whether every slot is taken and the queue cannot hold another request."""
+        return self.active + self.waiting >= self.config.max_concurrent_requests + self.config.max_queued_requests
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the queue of the pool while all slots are taken."""
+        if self.active < self.config.max_concurrent_requests and not self._waiters:
+            self.active += 1
+            self._active_gauge.inc()
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.waiting += 1
+        self._waiting_gauge.inc()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right before cancellation, pass it on
+                self.release()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                # Not handed a slot, a woken waiter already left the queue in _wake_waiters
+                self._remove_waiter(waiter)
+                self.waiting -= 1
+                self._waiting_gauge.dec()
+
+    def release(self) -> None:
+        """Give back a slot and hand free slots to queued requests."""
+        self.active -= 1
+        self._active_gauge.dec()
+        self._wake_waiters()
+
+    def resize(self, max_concurrent_requests: int) -> None:
+        """
+        Change the number of slots of the pool.
+        Args:
+            max_concurrent_requests (int): The new number of slots.
+        """
+        self.config = replace(self.config, max_concurrent_requests=max_concurrent_requests)
+        self.rejection = self._encode_rejection(self.config)
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.active < self.config.max_concurrent_requests:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The waiter leaves the queue when it takes the slot, not when its task resumes
+                self.waiting -= 1
+                self._waiting_gauge.dec()
+                self.active += 1
+                self._active_gauge.inc()
+                waiter.set_result(None)
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
 class ConcurrencyLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware for limiting concurrent requests (production-grade implementation)"""
+    """Middleware for limiting concurrent requests (production-grade implementation)
+
+    Requests are classified by their estimated prompt tokens into admission pools, each pool owns its own
+    concurrency cap and queue, so short requests never wait behind long-context prefills for a slot.
+    """
 
-    def __init__(self, app: ASGIApp, max_concurrent_requests: int = constants.MAX_CONCURRENT_REQUESTS) -> None:
+    def __init__(self, app: ASGIApp, max_concurrent_requests: int = constants.MAX_CONCURRENT_REQUESTS,
+                 pools: Optional[List[AdmissionPoolConfig]] = None,
+                 route_limits: Optional[Dict[RouteClass, RouteLimitConfig]] = None) -> None:
         """
         Initialize the middleware with the given ASGIApp app and maximum concurrent requests.
         Args:
             app (ASGIApp): The ASGIApp application.
-            max_concurrent_requests (int): The maximum allowed concurrent requests. Default is 512.
+            max_concurrent_requests (int): The maximum allowed concurrent generation requests. Default is 512.
+            pools (List[AdmissionPoolConfig]): Admission pools ordered by prompt size. Default is a single pool
+                                               with `max_concurrent_requests` slots and no queue.
+            route_limits (Dict[RouteClass, RouteLimitConfig]): Limits of non-generation route classes, each class
+                                                                gets its own pool outside of the generation slots.
+                                                                Default is None, all routes are generation routes.
         """
         if app is None:
             logger.error("ASGIApp application instance is required and cannot be None.")
@@ -248,17 +628,136 @@ class ConcurrencyLimitMiddleware(BaseHTTPMiddleware):
         if max_concurrent_requests <= 0:
             logger.error(f"max_concurrent_requests must be a positive integer, got {max_concurrent_requests}.")
             raise ValueError(f"max_concurrent_requests must be a positive integer, got {max_concurrent_requests}.")
+        if pools is None:
+            pools = [AdmissionPoolConfig(name="default", max_prompt_tokens=None,
+                                         max_concurrent_requests=max_concurrent_requests, max_queued_requests=0)]
+        self._check_pools(pools, max_concurrent_requests)
+        route_limits = _check_route_limits(route_limits)
         super().__init__(app)
         self.max_concurrent_requests = max_concurrent_requests
-        # Use semaphore for better concurrency control
-        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self.pools: List[_AdmissionPool] = [_AdmissionPool(config) for config in pools]
+        self.route_pools: Dict[RouteClass, _AdmissionPool] = {
+            route_class: _AdmissionPool(AdmissionPoolConfig(name=route_class.value, max_prompt_tokens=None,
+                                                            max_concurrent_requests=limits.max_concurrent_requests))
+            for route_class, limits in route_limits.items()
+        }
+        self.rejection_log = RejectionLogAggregator(reason="concurrency_limit")
         # Track active request count
         self.active_requests = 0
-        self.lock = asyncio.Lock()
+
+    @staticmethod
+    def _check_pools(pools: List[AdmissionPoolConfig], max_concurrent_requests: int) -> None:
+        """
+        Check the admission pools are valid.
+        Args:
+            pools (List[AdmissionPoolConfig]): Admission pools ordered by prompt size.
+            max_concurrent_requests (int): The maximum allowed concurrent requests of all pools.
+        """
+        if not isinstance(pools, list) or not pools:
+            logger.error("pools must be a non-empty list of AdmissionPoolConfig.")
+            raise TypeError("pools must be a non-empty list of AdmissionPoolConfig.")
+        previous_bound = 0
+        for index, pool in enumerate(pools):
+            if not isinstance(pool, AdmissionPoolConfig):
+                logger.error(f"Invalid pool type: {type(pool)}, AdmissionPoolConfig needed")
+                raise TypeError(f"Invalid pool type: {type(pool)}, AdmissionPoolConfig needed")
+            if pool.max_concurrent_requests <= 0 or pool.max_queued_requests < 0:
+                logger.error(f"Admission pool {pool.name} must have positive slots and a non-negative queue.")
+                raise ValueError(f"Admission pool {pool.name} must have positive slots and a non-negative queue.")
+            is_last = index == len(pools) - 1
+            if is_last != (pool.max_prompt_tokens is None):
+                logger.error("Only the last admission pool must be unbounded in prompt tokens.")
+                raise ValueError("Only the last admission pool must be unbounded in prompt tokens.")
+            if not is_last:
+                if pool.max_prompt_tokens <= previous_bound:
+                    logger.error("Admission pools must be ordered by increasing max_prompt_tokens.")
+                    raise ValueError("Admission pools must be ordered by increasing max_prompt_tokens.")
+                previous_bound = pool.max_prompt_tokens
+        total = sum(pool.max_concurrent_requests for pool in pools)
+        if total > max_concurrent_requests:
+            logger.error(f"Admission pools hold {total} slots, which exceeds {max_concurrent_requests}.")
+            raise ValueError(f"Admission pools hold {total} slots, which exceeds {max_concurrent_requests}.")
+
+    @staticmethod
+    def estimate_prompt_tokens(request: Request) -> Optional[int]:
+        """
+        Estimate the prompt tokens of a request from its body size, without reading the body.
+        Args:
+            request (Request): The incoming request.
+        Returns:
+            Optional[int]: The estimated prompt tokens, or None if the body size is unknown (chunked transfer).
+        """
+        if "chunked" in request.headers.get("transfer-encoding", "").lower():
+            return None
+        try:
+            content_length = int(request.headers.get("content-length", 0))
+        except ValueError:
+            return None
+        return max(content_length, 0) // constants.ADMISSION_BYTES_PER_TOKEN
+
+    def _select_pool(self, request: Request) -> _AdmissionPool:
+        """
+        Select the admission pool for a request. Non-generation routes use the pool of their route class,
+        generation requests of unknown size go to the last (largest) pool.
+        Args:
+            request (Request): The incoming request.
+        Returns:
+            _AdmissionPool: The selected admission pool.
+        """
+        if self.route_pools:
+            route_pool = self.route_pools.get(classify_route(request))
+            if route_pool is not None:
+                return route_pool
+        estimated_tokens = self.estimate_prompt_tokens(request)
+        if estimated_tokens is not None:
+            for pool in self.pools[:-1]:
+                if estimated_tokens <= pool.config.max_prompt_tokens:
+                    return pool
+        return self.pools[-1]
+
+    def set_max_concurrent_requests(self, max_concurrent_requests: int) -> None:
+        """
+        Change the concurrency limit of generation requests at runtime, the slots of the generation admission pools
+        are scaled proportionally and take effect without dropping running or queued requests.
+        Args:
+            max_concurrent_requests (int): The new maximum of concurrent generation requests.
+        """
+        if not isinstance(max_concurrent_requests, int) or isinstance(max_concurrent_requests, bool):
+            logger.error("max_concurrent_requests is not an integer.")
+            raise TypeError(f"max_concurrent_requests must be an integer, got {type(max_concurrent_requests)}.")
+        if not len(self.pools) <= max_concurrent_requests <= constants.MAX_CONCURRENT_REQUESTS:
+            logger.error(f"max_concurrent_requests must be in [{len(self.pools)}, "
+                         f"{constants.MAX_CONCURRENT_REQUESTS}], got {max_concurrent_requests}.")
+            raise ValueError(f"max_concurrent_requests must be in [{len(self.pools)}, "
+                             f"{constants.MAX_CONCURRENT_REQUESTS}], got {max_concurrent_requests}.")
+        total = sum(pool.config.max_concurrent_requests for pool in self.pools)
+        sizes = [max(pool.config.max_concurrent_requests * max_concurrent_requests // total, 1)
+                 for pool in self.pools]
+        sizes[sizes.index(max(sizes))] += max_concurrent_requests - sum(sizes)
+        for pool, size in zip(self.pools, sizes):
+            pool.resize(size)
+        self.max_concurrent_requests = max_concurrent_requests
+        logger.info(f"Concurrency limit changed to {max_concurrent_requests}, pool slots: {sizes}")
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the active and queued requests of every admission pool.
+        Returns:
+            Dict[str, Dict[str, int]]: Pool statistics keyed by pool name.
+        """
+        return {
+            pool.config.name: {
+                "active": pool.active,
+                "waiting": pool.waiting,
+                "max_concurrent_requests": pool.config.max_concurrent_requests,
+                "max_queued_requests": pool.config.max_queued_requests,
+            }
+            for pool in self.pools + list(self.route_pools.values())
+        }
 
     async def dispatch(self, request: Request, call_next: callable) -> JSONResponse:
         """
-        Dispatch the request and check the concurrent request limit.
+        Dispatch the request and check the concurrent request limit of its admission pool.
         Args:
             request (Request): The incoming request.
             call_next (Callable): The next middleware or route handler.
@@ -274,49 +773,56 @@ class ConcurrencyLimitMiddleware(BaseHTTPMiddleware):
                 status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
                 content={"detail": "Internal Server Error."}
             )
-        async with self.lock:
-            if self.active_requests >= self.max_concurrent_requests:
-                op_logger.warning(
-                    f"[IP: {client_ip}] {HTTPStatus.TOO_MANY_REQUESTS.value} Too many concurrent requests: "
-                    f"{self.active_requests}, limit: {self.max_concurrent_requests}")
+        if classify_route(request) == RouteClass.PROBE:
+            return await call_next(request)
+        pool = self._select_pool(request)
+        # Check and reserve happen without awaiting, so they are atomic on the event loop
+        if pool.is_full():
+            self.rejection_log.record("warning", HTTPStatus.TOO_MANY_REQUESTS, client_ip,
+                                      "Too many concurrent requests in pool %s: %d, limit: %d",
+                                      pool.config.name, pool.active, pool.config.max_concurrent_requests)
+            return PreEncodedResponse(pool.rejection)
+        self.active_requests += 1
+        try:
+            wait_start = time.perf_counter()
+            await pool.acquire()
+            # Stored in the request state shared with the handler, which reports them as request phases
+            request.state.admitted_at = time.perf_counter()
+            request.state.admission_wait = request.state.admitted_at - wait_start
+            pool.wait_histogram.observe(request.state.admission_wait)
+            logger.debug("Request started in pool %s, active requests: %d", pool.config.name, self.active_requests)
+            try:
+                response = await call_next(request)
+                return response
+            except Exception as e:
+                op_logger.error(f"[IP: {client_ip}] {HTTPStatus.INTERNAL_SERVER_ERROR.value} "
+                                f"Error processing request: {e}")
                 return JSONResponse(
-                    status_code=HTTPStatus.TOO_MANY_REQUESTS,
-                    content={
-                        "detail": f"Too many requests. "
-                                  f"Maximum concurrent requests: {self.max_concurrent_requests}"}
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                    content={"detail": "Internal Server Error."}
                 )
-            self.active_requests += 1
-            logger.debug(f"Request started, active requests: {self.active_requests}")
-
-        try:
-            # Use semaphore to control concurrency
-            async with self.semaphore:
-                try:
-                    response = await call_next(request)
-                    return response
-                except Exception as e:
-                    op_logger.error(f"[IP: {client_ip}] {HTTPStatus.INTERNAL_SERVER_ERROR.value} "
-                                    f"Error processing request: {e}")
-                    return JSONResponse(
-                        status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
-                        content={"detail": "Internal Server Error."}
-                    )
+            finally:
+                pool.release()
         finally:
-            async with self.lock:
-                self.active_requests -= 1
-                logger.debug(f"Request finished, active requests: {self.active_requests}")
+            self.active_requests -= 1
+            logger.debug("Request finished, active requests: %d", self.active_requests)
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Time-window based rate limiting middleware (production-grade implementation)"""
 
-    def __init__(self, app: ASGIApp, config: RateLimitConfig = None) -> None:
+    def __init__(self, app: ASGIApp, config: RateLimitConfig = None,
+                 route_limits: Optional[Dict[RouteClass, RouteLimitConfig]] = None) -> None:
         """
         Initialize the middleware with the given ASGIApp app and rate limit configuration.
 
         Args:
             app (ASGIApp): The ASGIApp application.
-            config (RateLimitConfig): The rate limit configuration. Default is a default RateLimitConfig instance.
+            config (RateLimitConfig): The rate limit configuration of generation routes.
+                                      Default is a default RateLimitConfig instance.
+            route_limits (Dict[RouteClass, RouteLimitConfig]): Limits of non-generation route classes, each class
+                                                                is counted in its own per-client budget.
+                                                                Default is None, all routes are generation routes.
         """
         if app is None:
             logger.error("ASGIApp application instance is required and cannot be None.")
@@ -325,13 +831,16 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         if config and not isinstance(config, RateLimitConfig):
             logger.error(f"Invalid config type: {type(config)}, RateLimitConfig needed")
             raise TypeError(f"Invalid config type: {type(config)}, RateLimitConfig needed")
+        route_limits = _check_route_limits(route_limits)
         super().__init__(app)
         self.config = config or RateLimitConfig()
+        self.route_limits = route_limits
         # Use sliding window algorithm to store request counts
         self.request_counts: Dict[str, Dict[str, Tuple[int, float]]] = defaultdict(dict)
         # Cleanup task for expired data
         self.cleanup_task = asyncio.create_task(self._cleanup_expired_entries())
         self._counts_lock = asyncio.Lock()
+        self.rejection_log = RejectionLogAggregator(reason="rate_limit")
 
     async def shutdown(self):
         """Cancel the cleanup task when the application is shutting down."""
@@ -361,26 +870,44 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
                 content={"detail": "Internal Server Error."}
             )
-        # Check rate limit
+        route_class = classify_route(request)
+        if route_class == RouteClass.PROBE:
+            return await call_next(request)
+        # Check rate limit, non-generation route classes are counted in their own budget
+        identifier, limit = client_ip, None
+        if route_class in self.route_limits:
+            identifier = f"{client_ip}:{route_class.value}"
+            limit = self.route_limits[route_class].requests_per_minute
+        else:
+            route_class = RouteClass.GENERATION
         async with self._counts_lock:
-            is_allowed, retry_after = self._check_rate_limit(client_ip)
+            is_allowed, retry_after = self._check_rate_limit(identifier, limit)
             if not is_allowed:
-                op_logger.warning(
-                    f"[IP: {client_ip}] {HTTPStatus.TOO_MANY_REQUESTS.value} Rate limit exceeded")
-                return JSONResponse(
-                    status_code=HTTPStatus.TOO_MANY_REQUESTS,
-                    content={
-                        "detail": f"Rate limit exceeded",
-                        "retry_after": retry_after
-                    }
-                )
+                RATE_LIMIT_HITS.labels(route_class.value).inc()
+                self.rejection_log.record("warning", HTTPStatus.TOO_MANY_REQUESTS, client_ip, "Rate limit exceeded")
+                return PreEncodedResponse(_rate_limit_rejection(retry_after))
 
             # Update count
-            self._update_rate_limit(client_ip)
+            self._update_rate_limit(identifier)
 
         response = await call_next(request)
         return response
 
+    def set_requests_per_minute(self, requests_per_minute: int) -> None:
+        """
+        Change the per-client rate limit of generation routes at runtime, counts of the current window are kept.
+        Args:
+            requests_per_minute (int): The new number of requests allowed per client and minute.
+        """
+        if not isinstance(requests_per_minute, int) or isinstance(requests_per_minute, bool):
+            logger.error("requests_per_minute is not an integer.")
+            raise TypeError(f"requests_per_minute must be an integer, got {type(requests_per_minute)}.")
+        if requests_per_minute <= 0:
+            logger.error(f"requests_per_minute must be a positive integer, got {requests_per_minute}.")
+            raise ValueError(f"requests_per_minute must be a positive integer, got {requests_per_minute}.")
+        self.config = replace(self.config, requests_per_minute=requests_per_minute)
+        logger.info(f"Rate limit changed to {requests_per_minute} requests per minute")
+
     async def _cleanup_expired_entries(self) -> None:
         """Regularly clean up expired request count data to prevent memory leaks."""
         while True:
@@ -391,11 +918,12 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             except Exception as e:
                 logger.error(f"An error occurred while clearing the request count: {e}")
 
-    def _check_rate_limit(self, identifier: str) -> Tuple[bool, int]:
+    def _check_rate_limit(self, identifier: str, limit: Optional[int] = None) -> Tuple[bool, int]:
         """
         Check the rate limit for the given identifier.
         Args:
             identifier (str): The client identifier (usually IP address).
+            limit (int): Requests allowed per minute. Default is `requests_per_minute` of the configuration.
         Returns:
             Tuple[bool, int]: A tuple containing whether the request is allowed and the waiting time before retry.
         """
@@ -403,7 +931,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
         # Check per-minute limit
         result = self._update_or_check_window(
-            identifier, 'minute', current_time, 'requests_per_minute', is_check=True
+            identifier, 'minute', current_time, 'requests_per_minute', is_check=True, limit=limit
         )
         if result and not result[0]:
             return result
@@ -420,7 +948,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 expired_keys.append(key)
         async with self._counts_lock:
             for key in expired_keys:
-                logger.debug(f"Deleting expired rate limit entry: {key}")
+                logger.debug("Deleting expired rate limit entry: %s", key)
                 del self.request_counts[key]
 
     def _update_or_check_window(
@@ -429,7 +957,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             window_type: str,  # 'minute'
             current_time: float,
             config_key: str,  # 'requests_per_minute'
-            is_check: bool = False
+            is_check: bool = False,
+            limit: Optional[int] = None
     ) -> Tuple[Optional[bool], int]:
         """
         General method for checking or updating the request count within a specified time window.
@@ -439,12 +968,14 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             current_time (float): Current timestamp.
             config_key (str): Corresponding request limit key in the configuration.
             is_check (bool): Whether it is in check mode (True) or update mode (False).
+            limit (int): Request limit overriding the configuration, e.g. the budget of a route class.
         Returns:
             Tuple[Optional[bool], int]: If in check mode, returns (whether allowed, retry time); otherwise returns None.
         """
         key = f"{identifier}:{window_type}"
         window_seconds = MINUTE_SECONDS
-        limit = getattr(self.config, config_key)
+        if limit is None:
+            limit = getattr(self.config, config_key)
 
         if key in self.request_counts:
             count, timestamp = self.request_counts[key]
@@ -480,13 +1011,17 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 class RequestTimeoutMiddleware(BaseHTTPMiddleware):
     """Middleware for setting a timeout on incoming requests (production-grade implementation)"""
 
-    def __init__(self, app: ASGIApp, request_timeout_in_sec: int = constants.REQUEST_TIMEOUT_IN_SEC):
+    def __init__(self, app: ASGIApp, request_timeout_in_sec: int = constants.REQUEST_TIMEOUT_IN_SEC,
+                 route_limits: Optional[Dict[RouteClass, RouteLimitConfig]] = None):
         """
         Initialize the middleware with the given ASGIApp app and request timeout in seconds.
         Args:
             app (ASGIApp): The ASGIApp application.
-            request_timeout_in_sec (int): The maximum allowed time (in seconds) for a request to be processed.
+            request_timeout_in_sec (int): The maximum allowed time (in seconds) for a generation request.
                                           Default is defined by `constants.REQUEST_TIMEOUT_IN_SEC`.
+            route_limits (Dict[RouteClass, RouteLimitConfig]): Limits of non-generation route classes, providing
+                                                                their shorter timeouts.
+                                                                Default is None, all routes are generation routes.
         """
         if app is None:
             logger.error("ASGIApp application instance is required and cannot be None.")
@@ -500,8 +1035,13 @@ class RequestTimeoutMiddleware(BaseHTTPMiddleware):
                 f"request_timeout_in_sec cannot exceed {constants.REQUEST_TIMEOUT_IN_SEC}, got {request_timeout_in_sec}.")
             raise ValueError(
                 f"request_timeout_in_sec cannot exceed {constants.REQUEST_TIMEOUT_IN_SEC}, got {request_timeout_in_sec}.")
+        route_limits = _check_route_limits(route_limits)
         super().__init__(app)
         self.timeout = request_timeout_in_sec
+        self.route_timeouts: Dict[RouteClass, int] = {
+            route_class: limits.request_timeout_in_sec for route_class, limits in route_limits.items()
+        }
+        self.rejection_log = RejectionLogAggregator(reason="timeout")
 
     async def dispatch(self, request: Request, call_next: callable) -> JSONResponse:
         """
@@ -522,21 +1062,44 @@ class RequestTimeoutMiddleware(BaseHTTPMiddleware):
                 status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
                 content={"detail": "Internal Server Error."}
             )
+        timeout = self.timeout
+        if self.route_timeouts:
+            timeout = self.route_timeouts.get(classify_route(request), self.timeout)
+        # Lets the handler end its engine call before the request times out, e.g. for the circuit breaker
+        request.state.deadline = time.perf_counter() + timeout
         task = asyncio.create_task(call_next(request))
         try:
             # Using asyncio.wait_for to set a Timeout
-            response = await asyncio.wait_for(task, timeout=self.timeout)
+            response = await asyncio.wait_for(task, timeout=timeout)
             return response
         except asyncio.TimeoutError:
-            return await self._handle_timeout(task, client_ip)
+            return await self._handle_timeout(task, client_ip, timeout)
         except Exception as e:
             return await self._handle_exception(task, client_ip, e)
 
+    def set_timeout(self, request_timeout_in_sec: int) -> None:
+        """
+        Change the timeout of generation requests at runtime, it applies to requests started afterwards.
+        Args:
+            request_timeout_in_sec (int): The new request timeout in seconds.
+        """
+        if not isinstance(request_timeout_in_sec, int) or isinstance(request_timeout_in_sec, bool):
+            logger.error("request_timeout_in_sec is not an integer.")
+            raise TypeError(f"request_timeout_in_sec must be an integer, got {type(request_timeout_in_sec)}.")
+        if not 0 < request_timeout_in_sec <= constants.REQUEST_TIMEOUT_IN_SEC:
+            logger.error(f"request_timeout_in_sec must be in [1, {constants.REQUEST_TIMEOUT_IN_SEC}], "
+                         f"got {request_timeout_in_sec}.")
+            raise ValueError(f"request_timeout_in_sec must be in [1, {constants.REQUEST_TIMEOUT_IN_SEC}], "
+                             f"got {request_timeout_in_sec}.")
+        self.timeout = request_timeout_in_sec
+        logger.info(f"Request timeout changed to {request_timeout_in_sec} seconds")
+
     async def _handle_timeout(
             self,
             task: asyncio.Task,
-            client_ip: str
-    ) -> JSONResponse:
+            client_ip: str,
+            timeout: Optional[int] = None
+    ) -> Response:
         """
         Handle timeout scenario by canceling task and returning timeout response.
         """
@@ -548,19 +1111,13 @@ class RequestTimeoutMiddleware(BaseHTTPMiddleware):
         except asyncio.CancelledError:
             pass
         except Exception as e:
-            op_logger.error(f"[IP: {client_ip}] {HTTPStatus.REQUEST_TIMEOUT.value} "
-                            f"Error during task cleanup after timeout: {e}")
-            return JSONResponse(
-                status_code=HTTPStatus.REQUEST_TIMEOUT,
-                content={"detail": "Request timeout"}
-            )
+            self.rejection_log.record("error", HTTPStatus.REQUEST_TIMEOUT, client_ip,
+                                      "Error during task cleanup after timeout: %s", e)
+            return PreEncodedResponse(REQUEST_TIMEOUT_REJECTION)
 
-        op_logger.warning(f"[IP: {client_ip}] {HTTPStatus.REQUEST_TIMEOUT.value} "
-                          f"Request timeout after {self.timeout} seconds")
-        return JSONResponse(
-            status_code=HTTPStatus.REQUEST_TIMEOUT,
-            content={"detail": "Request timeout"}
-        )
+        self.rejection_log.record("warning", HTTPStatus.REQUEST_TIMEOUT, client_ip,
+                                  "Request timeout after %d seconds", timeout or self.timeout)
+        return PreEncodedResponse(REQUEST_TIMEOUT_REJECTION)
 
     async def _handle_exception(
             self,
@@ -154,7 +154,7 @@ class MISChatCompletionRequest(ChatCompletionRequest):
 
     @staticmethod
     def _validate_range(param_name: str, value: Union[int, float], validator: Dict[str, Any]) -> Optional[Any]:
-        logger.debug(f"Validating range for parameter {param_name}.")
+        logger.debug("Validating range for parameter %s.", param_name)
         # Range checking
         min_value = validator.get("min")
         max_value = validator.get("max")
@@ -187,14 +187,14 @@ class MISChatCompletionRequest(ChatCompletionRequest):
                 raise HTTPException(status_code=400,
                                     detail=f"Invalid value for {param_name}: greater than max({max_value})"
                                     )
-        logger.debug(f"Parameter {param_name} validated range successfully.")
+        logger.debug("Parameter %s validated range successfully.", param_name)
         return value
 
     @staticmethod
     def _validate_bool(param_name: str, value: Any) -> Union[bool, str, None]:
-        logger.debug(f"Validating boolean parameter {param_name}.")
+        logger.debug("Validating boolean parameter %s.", param_name)
         if isinstance(value, bool) or (isinstance(value, str) and value.lower() in ['true', 'false']):
-            logger.debug(f"Parameter {param_name} is valid.")
+            logger.debug("Parameter %s is valid.", param_name)
             return value
         logger.error(f"Invalid type for {param_name}: expected bool")
         raise HTTPException(status_code=400,
@@ -203,7 +203,7 @@ class MISChatCompletionRequest(ChatCompletionRequest):
 
     @staticmethod
     def _validate_enum(param_name: str, value: Any, validator: Dict[str, Any]) -> Optional[Any]:
-        logger.debug(f"Validating enum parameter {param_name}.")
+        logger.debug("Validating enum parameter %s.", param_name)
         valid_values = validator.get("valid_values", None)
         if valid_values is not None:
             if ConfigChecker.is_value_in_enum(param_name, value, valid_values):
@@ -229,7 +229,7 @@ class MISChatCompletionRequest(ChatCompletionRequest):
         Returns:
             Validated value, None if validation fails
         """
-        logger.debug(f"Validating single parameter {param_name}.")
+        logger.debug("Validating single parameter %s.", param_name)
         # Type conversion
         expected_type = validator.get("type")
         if expected_type == bool and isinstance(value, expected_type):
@@ -243,7 +243,7 @@ class MISChatCompletionRequest(ChatCompletionRequest):
             raise HTTPException(status_code=400,
                                 detail=f"Unsupported type for {param_name}, expected: {expected_type.__name__}"
                                 )
-        logger.debug(f"Parameter {param_name} validated successfully.")
+        logger.debug("Parameter %s validated successfully.", param_name)
         return value
 
     def _validate_parameters(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
@@ -19,14 +19,17 @@ See the Mulan PSL v2 for more details.
 """
 import asyncio
 import json
+import re
+import time
 from http import HTTPStatus
-from typing import AsyncGenerator, Optional, List
+from typing import AsyncGenerator, Dict, Optional, List
 
 from fastapi import APIRouter, Request
 from packaging import version
 from pydantic import ValidationError
 from starlette.datastructures import State
 from starlette.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
 from vllm.config import ModelConfig
 from vllm.engine.protocol import EngineClient
 from vllm.entrypoints.logger import RequestLogger
@@ -40,11 +43,17 @@ from vllm.entrypoints.openai.serving_models import BaseModelPath, OpenAIServingM
 from vllm.entrypoints.openai.serving_tokenization import OpenAIServingTokenization
 
 from mis.args import GlobalArgs
-from mis.constants import REQUEST_TIMEOUT_IN_SEC
+from mis.constants import ENGINE_CALL_TIMEOUT_MARGIN_IN_SEC, REQUEST_TIMEOUT_IN_SEC
+from mis.llm.entrypoints.circuit_breaker import CallOutcome, CircuitBreaker, EngineCall
+from mis.llm.entrypoints.metrics import (GENERATION_DURATION, INTER_TOKEN_LATENCY, SERIALIZATION_DURATION,
+                                         STREAM_CHUNKS, STREAM_DURATION, TIME_TO_FIRST_TOKEN, VALIDATION_DURATION,
+                                         format_server_timing)
+from mis.llm.entrypoints.middleware import RejectionLogAggregator
 from mis.llm.entrypoints.openai.api_extensions import (
     MISChatCompletionRequest,
     MISOpenAIServingChat
 )
+from mis.llm.entrypoints.tracing import RequestTrace
 from mis.logger import init_logger, LogType
 from mis.utils.utils import get_client_ip, get_vllm_version
 
@@ -59,6 +68,56 @@ MIS_MODEL_REMOVE_FIELDS = [
     "root", "parent", "permission"
 ]
 
+# Final chunk of a stream, it carries no generated content
+STREAM_DONE_CHUNK = "data: [DONE]\n\n"
+# Start of the chunk vLLM sends instead of the rest of a stream that failed in the engine
+STREAM_ERROR_CHUNK_PREFIX = 'data: {"error"'
+# A chunk carrying generated tokens, unlike the role chunk, the finish chunk or the usage chunk with empty deltas
+_TOKEN_CHUNK_PATTERN = re.compile(r'"(?:content|reasoning_content)":"[^"]|"tool_calls":\[\{')
+
+# While the circuit is open every request fails fast, so they are logged rate-limited
+_circuit_open_log = RejectionLogAggregator(operation_logger=op_logger, reason="circuit_open")
+
+
+def _get_circuit_breaker(raw_request: Request) -> Optional[CircuitBreaker]:
+    """Get the engine circuit breaker registered in the app state, if any."""
+    breaker = getattr(raw_request.app.state, "circuit_breaker", None)
+    return breaker if isinstance(breaker, CircuitBreaker) else None
+
+
+def _circuit_open_response(client_ip: str, breaker: CircuitBreaker) -> JSONResponse:
+    """Fast-fail response while the engine circuit breaker is open."""
+    _circuit_open_log.record("error", HTTPStatus.SERVICE_UNAVAILABLE, client_ip, "Engine circuit breaker is open")
+    return JSONResponse(
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE.value,
+        content={"detail": "Service unavailable, the engine is unhealthy"},
+        headers={"Retry-After": str(breaker.retry_after())}
+    )
+
+
+def _engine_call_timeout(raw_request: Request) -> Optional[float]:
+    """
+    Timeout of an engine call, it ends before the request timeout of the route, so that the call itself times out
+    and the circuit breaker sees the timeout.
+    Args:
+        raw_request (Request): The incoming request, the timeout middleware sets its deadline in the request state.
+    Returns:
+        Optional[float]: The timeout in seconds, None for no timeout.
+    """
+    timeout = raw_request.app.state.request_timeout or None
+    deadline = getattr(raw_request.state, "deadline", None)
+    if not isinstance(deadline, float):
+        return timeout
+    remaining = max(deadline - time.perf_counter() - ENGINE_CALL_TIMEOUT_MARGIN_IN_SEC, 0)
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def _is_engine_error(generator: ErrorResponse) -> bool:
+    """Whether an ErrorResponse reports an engine-side (5xx) failure rather than a bad request."""
+    error = getattr(generator, "error", generator)
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code >= HTTPStatus.INTERNAL_SERVER_ERROR
+
 
 @router.get("/openai/v1/models")
 async def show_available_models(raw_request: Request):
@@ -66,30 +125,64 @@ async def show_available_models(raw_request: Request):
     logger.debug("Handling request to show available models.")
     handler = models(raw_request)
 
-    try:
-        if raw_request.app.state.request_timeout:
-            available_models = await asyncio.wait_for(
-                handler.show_available_models(),
-                timeout=raw_request.app.state.request_timeout
+    breaker = _get_circuit_breaker(raw_request)
+    if breaker is not None and not breaker.try_acquire():
+        return _circuit_open_response(client_ip, breaker)
+    with EngineCall(breaker) as engine_call:
+        try:
+            timeout = _engine_call_timeout(raw_request)
+            if timeout is not None:
+                available_models = await asyncio.wait_for(
+                    handler.show_available_models(),
+                    timeout=timeout
+                )
+            else:
+                available_models = await handler.show_available_models()
+        except asyncio.TimeoutError:
+            engine_call.outcome = CallOutcome.TIMEOUT
+            op_logger.error(
+                f"[IP: {client_ip}] {HTTPStatus.REQUEST_TIMEOUT.value} Request timeout")
+            return JSONResponse(
+                status_code=HTTPStatus.REQUEST_TIMEOUT.value,
+                content={"detail": f"[IP: {client_ip}] Request timeout"}
             )
-        else:
-            available_models = await handler.show_available_models()
-    except asyncio.TimeoutError:
-        op_logger.error(
-            f"[IP: {client_ip}] {HTTPStatus.REQUEST_TIMEOUT.value} Request timeout")
-        return JSONResponse(
-            status_code=HTTPStatus.REQUEST_TIMEOUT.value,
-            content={"detail": f"[IP: {client_ip}] Request timeout"}
-        )
+        engine_call.outcome = CallOutcome.SUCCESS
 
     for model_ in available_models.data:
         for field in MIS_MODEL_REMOVE_FIELDS:
             if hasattr(model_, field):
                 delattr(model_, field)
-    op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} OK")
     return JSONResponse(content=available_models.model_dump())
 
 
+class _EngineStreamingResponse(StreamingResponse):
+    """Streaming response of an engine call deferred to the end of the stream and of a trace held by the stream.
+
+    The stream finishes the call when it ends, the response also finishes it without a verdict in case the stream
+    never started, e.g. when the client disconnected before the first chunk. The trace is released by the response
+    once the stream is closed, whether it ended, was interrupted or never started.
+    """
+
+    def __init__(self, content: AsyncGenerator[str, None], engine_call: Optional[EngineCall] = None,
+                 trace: Optional[RequestTrace] = None, **kwargs) -> None:
+        super().__init__(content, **kwargs)
+        self.engine_call = engine_call
+        self.trace = trace
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                # An interrupted stream records its spans and verdict before the trace is released
+                await self.body_iterator.aclose()
+            finally:
+                if self.engine_call is not None:
+                    self.engine_call.finish(CallOutcome.IGNORED)
+                if self.trace is not None:
+                    self.trace.release()
+
+
 def _align_non_streaming_response(generator: ChatCompletionResponse) -> None:
     """
     remove stop_reason in vllm response to ensure consistent behavior
@@ -100,71 +193,171 @@ def _align_non_streaming_response(generator: ChatCompletionResponse) -> None:
     logger.debug("Non-streaming response aligned")
 
 
-async def _align_streaming_response(generator: AsyncGenerator[str, None]) -> AsyncGenerator[str, None]:
+async def _align_streaming_response(generator: AsyncGenerator[str, None],
+                                    engine_start: Optional[float] = None,
+                                    trace: Optional[RequestTrace] = None,
+                                    engine_call: Optional[EngineCall] = None) -> AsyncGenerator[str, None]:
     """
-    remove stop_reason in vllm stream response to ensure consistent behavior
+    remove stop_reason in vllm stream response to ensure consistent behavior,
+    the time to the first chunk carrying tokens and the gaps between such chunks are observed from `engine_start` on,
+    a held trace gets the first token and stream spans when the stream ends,
+    a deferred engine call is finished with the verdict on the stream when it ends
     """
     logger.debug("Aligning streaming response")
-    async for content in generator:
-        if "stop_reason" in content:
-            if not content.startswith("data: "):
-                logger.warning("Content does not start with 'data:'")
-                yield content
-                continue
-
-            try:
-                content_dict = json.loads(content[len("data: "):])
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse JSON content")
-                yield content
-                continue
-
-            if not isinstance(content_dict, dict):
-                logger.warning("Content is not a dictionary")
-                yield content
-                continue
-
-            try:
-                content_obj = ChatCompletionStreamResponse(**content_dict)
-            except ValidationError:
-                logger.warning("Validation error in content object")
+    start = time.perf_counter() if engine_start is None else engine_start
+    first_token_at = last_token_at = last_chunk_at = None
+    chunks = 0
+    # Without a complete stream, e.g. when the client disconnected, there is no verdict on the engine
+    outcome = CallOutcome.IGNORED
+    try:
+        async for content in generator:
+            if content.startswith(STREAM_ERROR_CHUNK_PREFIX):
+                outcome = CallOutcome.FAILURE
+            if content != STREAM_DONE_CHUNK:
+                now = time.perf_counter()
+                if _TOKEN_CHUNK_PATTERN.search(content):
+                    if last_token_at is None:
+                        first_token_at = now
+                        TIME_TO_FIRST_TOKEN.observe(now - start)
+                    else:
+                        INTER_TOKEN_LATENCY.observe(now - last_token_at)
+                    last_token_at = now
+                last_chunk_at = now
+                chunks += 1
+                STREAM_CHUNKS.inc()
+            if "stop_reason" in content:
+                if not content.startswith("data: "):
+                    logger.warning("Content does not start with 'data:'")
+                    yield content
+                    continue
+
+                try:
+                    content_dict = json.loads(content[len("data: "):])
+                except json.JSONDecodeError:
+                    logger.warning("Failed to parse JSON content")
+                    yield content
+                    continue
+
+                if not isinstance(content_dict, dict):
+                    logger.warning("Content is not a dictionary")
+                    yield content
+                    continue
+
+                try:
+                    content_obj = ChatCompletionStreamResponse(**content_dict)
+                except ValidationError:
+                    logger.warning("Validation error in content object")
+                    yield content
+                    continue
+
+                for choice in content_obj.choices:
+                    del choice.stop_reason
+
+                yield f"data: {content_obj.model_dump_json(exclude_unset=True)}\n\n"
+            else:
                 yield content
-                continue
+        if outcome == CallOutcome.IGNORED:
+            outcome = CallOutcome.SUCCESS
+    except asyncio.TimeoutError:
+        outcome = CallOutcome.TIMEOUT
+        raise
+    except Exception:
+        outcome = CallOutcome.FAILURE
+        raise
+    finally:
+        if engine_call is not None:
+            engine_call.finish(outcome)
+        end = time.perf_counter()
+        STREAM_DURATION.observe(end - start)
+        if last_chunk_at is not None:
+            GENERATION_DURATION.labels("true").observe(last_chunk_at - start)
+        if trace is not None:
+            if first_token_at is not None:
+                trace.add_span("first_token", start, first_token_at)
+            trace.add_span("stream", start, end, {"mis.stream.chunks": chunks})
+    logger.debug("Streaming response aligned")
 
-            for choice in content_obj.choices:
-                del choice.stop_reason
 
-            yield f"data: {content_obj.model_dump_json(exclude_unset=True)}\n\n"
-        else:
-            yield content
-    logger.debug("Streaming response aligned")
+def _observe_request_phases(raw_request: Request, handler_start: float) -> Dict[str, float]:
+    """
+    Collect the phases a request went through before its handler started.
+    Args:
+        raw_request (Request): The incoming request, its state carries the timestamps of the middlewares.
+        handler_start (float): The perf_counter time the handler started.
+    Returns:
+        Dict[str, float]: Durations in seconds of the phases known for the request.
+    """
+    phases = {}
+    state = raw_request.state
+    admission_wait = getattr(state, "admission_wait", None)
+    if isinstance(admission_wait, float):
+        phases["admission"] = admission_wait
+    # Without the concurrency limit the request is validated right after it was received
+    entered_at = getattr(state, "admitted_at", None)
+    if not isinstance(entered_at, float):
+        entered_at = getattr(state, "received_at", None)
+    if isinstance(entered_at, float):
+        phases["validation"] = handler_start - entered_at
+        VALIDATION_DURATION.observe(phases["validation"])
+    trace = getattr(state, "trace", None)
+    if isinstance(trace, RequestTrace):
+        if "admission" in phases:
+            admitted_at = state.admitted_at
+            trace.add_span("admission", admitted_at - phases["admission"], admitted_at)
+        if "validation" in phases:
+            trace.add_span("validation", entered_at, handler_start)
+    return phases
+
+
+def _get_request_trace(raw_request: Request) -> Optional[RequestTrace]:
+    """Get the trace of a sampled request, if any."""
+    trace = getattr(raw_request.state, "trace", None)
+    return trace if isinstance(trace, RequestTrace) else None
 
 
 @router.post("/openai/v1/chat/completions")
 async def create_chat_completions(request: MISChatCompletionRequest,
                                   raw_request: Request):
+    engine_start = time.perf_counter()
     client_ip = get_client_ip(raw_request)
     logger.debug("Handling request to create chat completions.")
+    phases = _observe_request_phases(raw_request, engine_start)
     handler = chat(raw_request)
     if handler is None:
         op_logger.error(f"[IP: {client_ip}] {HTTPStatus.BAD_REQUEST} "
                         "The model does not support Chat Completions API")
         return base(raw_request).create_error_response(message="The model does not support Chat Completions API")
-    try:
-        if raw_request.app.state.request_timeout:
-            generator = await asyncio.wait_for(
-                handler.create_chat_completion(request, raw_request),
-                timeout=raw_request.app.state.request_timeout
+    breaker = _get_circuit_breaker(raw_request)
+    if breaker is not None and not breaker.try_acquire():
+        return _circuit_open_response(client_ip, breaker)
+    with EngineCall(breaker) as engine_call:
+        try:
+            timeout = _engine_call_timeout(raw_request)
+            if timeout is not None:
+                generator = await asyncio.wait_for(
+                    handler.create_chat_completion(request, raw_request),
+                    timeout=timeout
+                )
+            else:
+                generator = await handler.create_chat_completion(request, raw_request)
+        except asyncio.TimeoutError:
+            engine_call.outcome = CallOutcome.TIMEOUT
+            op_logger.error(f"[IP: {client_ip}] "
+                            f"{HTTPStatus.REQUEST_TIMEOUT.value} Request timeout")
+            return JSONResponse(
+                status_code=HTTPStatus.REQUEST_TIMEOUT.value,
+                content={"detail": f"Request timeout"}
             )
-        else:
-            generator = await handler.create_chat_completion(request, raw_request)
-    except asyncio.TimeoutError:
-        op_logger.error(f"[IP: {client_ip}] "
-                        f"{HTTPStatus.REQUEST_TIMEOUT.value} Request timeout")
-        return JSONResponse(
-            status_code=HTTPStatus.REQUEST_TIMEOUT.value,
-            content={"detail": f"Request timeout"}
-        )
+        is_engine_error = isinstance(generator, ErrorResponse) and _is_engine_error(generator)
+        engine_call.outcome = CallOutcome.FAILURE if is_engine_error else CallOutcome.SUCCESS
+        if not isinstance(generator, (ErrorResponse, ChatCompletionResponse)):
+            # The verdict on a stream is taken when it ends, a half-open probe keeps its slot until then
+            engine_call.defer()
+
+    trace = _get_request_trace(raw_request)
+    if trace is not None:
+        trace.add_span("engine_submission", engine_start, time.perf_counter(),
+                       {"mis.stream": not isinstance(generator, (ErrorResponse, ChatCompletionResponse))})
 
     if isinstance(generator, ErrorResponse):
         op_logger.error(
@@ -183,13 +376,24 @@ async def create_chat_completions(request: MISChatCompletionRequest,
                                 status_code=generator.code)
 
     elif isinstance(generator, ChatCompletionResponse):
+        phases["generation"] = time.perf_counter() - engine_start
+        GENERATION_DURATION.labels("false").observe(phases["generation"])
+        serialization_start = time.perf_counter()
         _align_non_streaming_response(generator)
-        op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} OK")
-        return JSONResponse(content=generator.model_dump())
-
-    generator = _align_streaming_response(generator)
-    op_logger.info(f"[IP: {client_ip}] {HTTPStatus.OK.value} OK")
-    return StreamingResponse(content=generator, media_type="text/event-stream")
+        response = JSONResponse(content=generator.model_dump())
+        phases["serialization"] = time.perf_counter() - serialization_start
+        SERIALIZATION_DURATION.observe(phases["serialization"])
+        if trace is not None:
+            trace.add_span("serialization", serialization_start, serialization_start + phases["serialization"])
+        response.headers["Server-Timing"] = format_server_timing(phases)
+        return response
+
+    if trace is not None:
+        # Released by the response, so the root span covers the whole streamed body
+        trace.hold()
+    generator = _align_streaming_response(generator, engine_start, trace, engine_call)
+    return _EngineStreamingResponse(content=generator, engine_call=engine_call, trace=trace,
+                                    media_type="text/event-stream")
 
 
 async def init_openai_app_state(
@@ -230,6 +434,7 @@ async def init_openai_app_state(
 
     state.task = model_config.task
     state.request_timeout = REQUEST_TIMEOUT_IN_SEC
+    state.circuit_breaker = CircuitBreaker()
     logger.info("OpenAI app state initialized")
 
 
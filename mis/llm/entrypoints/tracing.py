@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from mis import constants
+from mis.logger import (flush_logs, init_logger, LogType, MIS_ARCHIVE_SIZE, MIS_LOG_PATH, MIS_LOG_PREFIX,
+                        MIS_MAX_ARCHIVE_COUNT, RotatingFileWithArchiveHandler)
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+
+TRACEPARENT_HEADER = "traceparent"
+# W3C trace context: version-trace_id-parent_id-flags
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+_SAMPLED_FLAG = 0x01
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+_STATUS_CODE_ERROR = 2
+
+AttributeValue = Union[str, int, float, bool]
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C traceparent header.
+    Args:
+        value (str): The header value.
+    Returns:
+        Optional[Tuple[str, str, bool]]: The trace ID, parent span ID and sampled flag, None if the header is
+                                         missing or invalid.
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT_PATTERN.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & _SAMPLED_FLAG)
+
+
+def _encode_attributes(attributes: Dict[str, AttributeValue]) -> List[Dict]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            encoded.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            encoded.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            encoded.append({"key": key, "value": {"stringValue": str(value)}})
+    return encoded
+
+
+class RequestTrace:
+    """Spans of one sampled request.
+
+    The root span covers the request from the outermost middleware until its response, including the body of
+    streaming responses. Components of the request path add child spans from the perf_counter timestamps they
+    already take, and the trace is exported when the last holder releases it.
+    """
+
+    def __init__(self, tracer: "Tracer", trace_id: str, parent_span_id: Optional[str]) -> None:
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.parent_span_id = parent_span_id
+        self.span_id = os.urandom(8).hex()
+        self.start = time.perf_counter()
+        self.attributes: Dict[str, AttributeValue] = {}
+        self.is_error = False
+        # Child spans: (name, start, end, attributes)
+        self.spans: List[Tuple[str, float, float, Optional[Dict[str, AttributeValue]]]] = []
+        # Offset between perf_counter and the epoch, span times are taken with perf_counter
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+        self._holds = 0
+
+    def traceparent(self) -> str:
+        """The traceparent header identifying the root span of this request."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def add_span(self, name: str, start: float, end: float,
+                 attributes: Optional[Dict[str, AttributeValue]] = None) -> None:
+        """
+        Add a child span of the root span.
+        Args:
+            name (str): The name of the span.
+            start (float): The perf_counter time the span started.
+            end (float): The perf_counter time the span ended.
+            attributes (Dict[str, AttributeValue]): Attributes of the span.
+        """
+        self.spans.append((name, start, end, attributes))
+
+    def hold(self) -> None:
+        """Keep the trace open, e.g. until a streaming response has been sent."""
+        self._holds += 1
+
+    def release(self) -> None:
+        """Release a hold, the trace ends and is exported when no hold is left."""
+        self._holds -= 1
+        if self._holds == 0:
+            self.tracer.export(self, time.perf_counter())
+
+    def to_otlp_spans(self, end: float) -> List[Dict]:
+        """
+        Encode the spans in the OTLP JSON encoding.
+        Args:
+            end (float): The perf_counter time the root span ended.
+        Returns:
+            List[Dict]: The root span followed by its child spans.
+        """
+        root = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.attributes.get("http.route", "request"),
+            "kind": SPAN_KIND_SERVER,
+            "startTimeUnixNano": str(self._to_unix_nano(self.start)),
+            "endTimeUnixNano": str(self._to_unix_nano(end)),
+            "attributes": _encode_attributes(self.attributes),
+            "status": {"code": _STATUS_CODE_ERROR} if self.is_error else {},
+        }
+        if self.parent_span_id:
+            root["parentSpanId"] = self.parent_span_id
+        spans = [root]
+        for name, start, span_end, attributes in self.spans:
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": os.urandom(8).hex(),
+                "parentSpanId": self.span_id,
+                "name": name,
+                "kind": SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": str(self._to_unix_nano(start)),
+                "endTimeUnixNano": str(self._to_unix_nano(span_end)),
+                "attributes": _encode_attributes(attributes or {}),
+            })
+        return spans
+
+    def _to_unix_nano(self, perf_time: float) -> int:
+        return int(perf_time * 1_000_000_000) + self._epoch_offset_ns
+
+
+def _resource_spans(spans: List[Dict]) -> Dict:
+    """Wrap spans into an OTLP ExportTraceServiceRequest."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _encode_attributes({"service.name": "mis"})},
+            "scopeSpans": [{"scope": {"name": "mis"}, "spans": spans}],
+        }]
+    }
+
+
+class FileSpanExporter:
+    """Exporter writing one OTLP JSON ExportTraceServiceRequest per trace and line to a local trace log file.
+
+    The file is written by the asynchronous log writer and is rotated, compressed and cleaned up like the other
+    log files of MIS.
+    """
+
+    def __init__(self, log_dir: str = MIS_LOG_PATH) -> None:
+        """
+        Initialize the exporter.
+        Args:
+            log_dir (str): The directory of the trace log file.
+        """
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        self.filepath = os.path.join(log_dir, f"{MIS_LOG_PREFIX}trace_{timestamp}.log")
+        self.handler = RotatingFileWithArchiveHandler(self.filepath, max_bytes=MIS_ARCHIVE_SIZE,
+                                                      backup_count=MIS_MAX_ARCHIVE_COUNT, log_dir=log_dir)
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def export(self, spans: List[Dict]) -> None:
+        # The record is handed to the handler directly, a logger would walk the stack to find the caller
+        self.handler.handle(logging.makeLogRecord({"msg": json.dumps(_resource_spans(spans), separators=(",", ":")),
+                                                   "levelno": logging.INFO, "levelname": "INFO"}))
+
+    def shutdown(self) -> None:
+        # Queued traces are written by the log writer thread before the file is closed
+        flush_logs()
+        self.handler.close()
+
+
+class OTLPHttpSpanExporter:
+    """Exporter posting spans in the OTLP/HTTP JSON encoding to a collector.
+
+    Spans are queued and sent in batches from a background thread, so the event loop never waits for the
+    collector. Spans are dropped when the queue is full, e.g. while the collector is unreachable.
+    """
+
+    def __init__(self, endpoint: str, batch_size: int = constants.TRACE_EXPORT_BATCH_SIZE,
+                 interval_in_sec: float = constants.TRACE_EXPORT_INTERVAL_IN_SEC,
+                 queue_size: int = constants.TRACE_EXPORT_QUEUE_SIZE) -> None:
+        """
+        Initialize the exporter.
+        Args:
+            endpoint (str): The OTLP/HTTP traces URL of the collector, e.g. http://127.0.0.1:4318/v1/traces.
+            batch_size (int): Maximum spans per request to the collector.
+            interval_in_sec (float): Maximum time spans wait before they are sent.
+            queue_size (int): Maximum queued spans.
+        """
+        if urlparse(endpoint).scheme not in ("http", "https"):
+            logger.error("The OTLP endpoint must be an http or https URL.")
+            raise ValueError("The OTLP endpoint must be an http or https URL.")
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.interval_in_sec = interval_in_sec
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+        self._failing = False
+        self._thread = threading.Thread(target=self._run, name="mis-trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: List[Dict]) -> None:
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                self.dropped += 1
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=constants.TRACE_EXPORT_TIMEOUT_IN_SEC)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._post(batch)
+            elif self._stopped.is_set():
+                return
+
+    def _next_batch(self) -> List[Dict]:
+        batch = []
+        deadline = time.monotonic() + self.interval_in_sec
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or (self._stopped.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _post(self, spans: List[Dict]) -> None:
+        body = json.dumps(_resource_spans(spans), separators=(",", ":")).encode("utf-8")
+        request = urllib.request.Request(self.endpoint, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=constants.TRACE_EXPORT_TIMEOUT_IN_SEC):
+                pass
+        except Exception as e:
+            # Only the first failure of a streak is logged
+            if not self._failing:
+                logger.warning(f"Failed to export spans to the OTLP endpoint: {e}")
+            self._failing = True
+            return
+        if self._failing:
+            logger.info("Exporting spans to the OTLP endpoint recovered")
+        self._failing = False
+
+
+class Tracer:
+    """Head based sampler and exporter of request traces.
+
+    The sampling decision is taken once when a request arrives with `sample_rate`, a sampled request continues the
+    trace of its traceparent, if any. The sampled flag of a traceparent is only followed when the parent is trusted,
+    e.g. a gateway in front of every client, otherwise any client could have every one of its requests traced.
+    Unsampled requests get no trace object at all, so their only cost is the decision itself.
+    """
+
+    def __init__(self, sample_rate: float, exporter, trust_parent: bool = False) -> None:
+        """
+        Initialize the tracer.
+        Args:
+            sample_rate (float): Fraction of requests that are traced, between 0 and 1.
+            exporter: The span exporter, a FileSpanExporter or OTLPHttpSpanExporter.
+            trust_parent (bool): Whether the sampled flag of a traceparent decides instead of `sample_rate`.
+                                 Default is False.
+        """
+        if not isinstance(sample_rate, (int, float)) or not 0 <= sample_rate <= 1:
+            logger.error(f"sample_rate of tracer must be between 0 and 1, got {sample_rate}.")
+            raise ValueError(f"sample_rate of tracer must be between 0 and 1, got {sample_rate}.")
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.trust_parent = trust_parent
+
+    def start_trace(self, traceparent: Optional[str]) -> Optional[RequestTrace]:
+        """
+        Take the sampling decision of a request and start its trace.
+        Args:
+            traceparent (str): The traceparent header of the request, if any.
+        Returns:
+            Optional[RequestTrace]: The trace of a sampled request, None otherwise.
+        """
+        parent = parse_traceparent(traceparent)
+        if parent is not None and self.trust_parent:
+            sampled = parent[2]
+        else:
+            sampled = bool(self.sample_rate) and random.random() < self.sample_rate
+        if not sampled:
+            return None
+        if parent is not None:
+            return RequestTrace(self, parent[0], parent[1])
+        return RequestTrace(self, os.urandom(16).hex(), None)
+
+    def export(self, trace: RequestTrace, end: float) -> None:
+        """
+        Export an ended trace.
+        Args:
+            trace (RequestTrace): The ended trace.
+            end (float): The perf_counter time the trace ended.
+        """
+        try:
+            self.exporter.export(trace.to_otlp_spans(end))
+        except Exception as e:
+            logger.warning(f"Failed to export trace {trace.trace_id}: {e}")
+
+
+def build_tracer(sample_rate: float, exporter_type: str, otlp_endpoint: str,
+                 trust_parent: bool = False) -> Optional[Tracer]:
+    """
+    Build the tracer of the service from its configuration.
+    Args:
+        sample_rate (float): Fraction of requests that are traced, 0 disables tracing.
+        exporter_type (str): "file" for the local trace log file or "otlp" for an OTLP/HTTP endpoint.
+        otlp_endpoint (str): The OTLP/HTTP traces URL used by the "otlp" exporter.
+        trust_parent (bool): Whether the sampled flag of a traceparent decides instead of `sample_rate`.
+    Returns:
+        Optional[Tracer]: The tracer, None if tracing is disabled.
+    """
+    if not sample_rate:
+        return None
+    if exporter_type not in constants.MIS_TRACE_EXPORTERS:
+        logger.error(f"Trace exporter must be one of {constants.MIS_TRACE_EXPORTERS}, got {exporter_type}")
+        raise ValueError(f"Trace exporter must be one of {constants.MIS_TRACE_EXPORTERS}, got {exporter_type}")
+    exporter = OTLPHttpSpanExporter(otlp_endpoint) if exporter_type == "otlp" else FileSpanExporter()
+    logger.info(f"Request tracing is enabled, sample rate: {sample_rate}, exporter: {exporter_type}, "
+                f"trust parent: {trust_parent}")
+    return Tracer(sample_rate, exporter, trust_parent)
@@ -17,31 +17,50 @@ MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
 See the Mulan PSL v2 for more details.
 -------------------------------------------------------------------------
 """
+import atexit
+import copy
 import getpass
-import inspect
+import gzip
+import io
+import itertools
 import logging
 import os
 import pwd
+import queue
 import re
+import shutil
 import stat
+import sys
+import threading
 import time
+import traceback
+from collections.abc import Mapping
 from enum import Enum
 from logging import Logger
 from logging.config import dictConfig
 from logging.handlers import RotatingFileHandler
-from typing import Optional, Callable
+from types import FrameType
+from typing import Callable, Dict, List, Optional, Tuple
 
 from mis import envs
-from mis.constants import DIRECTORY_PERMISSIONS, FILE_PERMISSIONS, ARCHIVED_FILE_PERMISSIONS
+from mis.constants import (DIRECTORY_PERMISSIONS, FILE_PERMISSIONS, ARCHIVED_FILE_PERMISSIONS, MIS_LOG_LEVELS,
+                           MIS_LOG_OVERFLOW_POLICIES)
 from mis.utils.general_checker import GeneralChecker
 
 MIS_LOG_LEVEL = envs.MIS_LOG_LEVEL
+MIS_LOG_QUEUE_SIZE = envs.MIS_LOG_QUEUE_SIZE
+MIS_LOG_OVERFLOW_POLICY = envs.MIS_LOG_OVERFLOW_POLICY
+MIS_LOG_FLUSH_TIMEOUT = 5
+MIS_FLIGHT_RECORDER_SIZE = envs.MIS_FLIGHT_RECORDER_SIZE
 MIS_LOG_PREFIX = "log_mis_disk_"
 MIS_LOG_PATH = os.path.join(os.path.expanduser('~'), "log", "mis")
 DEFAULT_UMASK = 0o027
 MIS_CALLER_INSPECT_DEPTH = 20
 MIS_MAX_ARCHIVE_COUNT = 5
 MIS_MAX_LOG_STORED = 36
+MIS_MAX_LOG_STORED_SIZE = 1024 * 1024 * 1024
+MIS_LOG_COMPRESS_LEVEL = 6
+MIS_LOG_COPY_BUFFER_SIZE = 1024 * 1024
 MIS_ARCHIVE_SIZE = 50 * 1024 * 1024
 
 
@@ -82,8 +101,355 @@ class LogType(Enum):
     SERVICE = 2
 
 
-class RotatingFileWithArchiveHandler(RotatingFileHandler):
+# Loggers whose level follows MIS_LOG_LEVEL, operation loggers always log at DEBUG
+_LEVEL_MANAGED_LOGGERS: Dict[str, Logger] = {}
+
+
+def get_log_level() -> str:
+    """Get the current level of the non-operation MIS loggers"""
+    return MIS_LOG_LEVEL
+
+
+def set_log_level(level: str) -> None:
+    """Change the level of all non-operation MIS loggers and their handlers at runtime
+    Args:
+        level (str): The new log level, one of MIS_LOG_LEVELS.
+    """
+    global MIS_LOG_LEVEL
+    if level not in MIS_LOG_LEVELS:
+        raise ValueError(f"Log level must be one of {MIS_LOG_LEVELS}, got {level}")
+    MIS_LOG_LEVEL = level
+    for managed_logger in list(_LEVEL_MANAGED_LOGGERS.values()):
+        # With the flight recorder enabled loggers pass DEBUG records on, the handlers apply the level
+        managed_logger.setLevel(logging.DEBUG if _FLIGHT_RECORDER is not None else level)
+        for handler in managed_logger.handlers:
+            if handler is not _FLIGHT_RECORDER:
+                handler.setLevel(level)
+
+
+class AsyncLogWriter:
+    """Background thread writing the log records of the MIS handlers.
+
+    Handlers run their filters on the calling thread and hand the prepared record to a bounded queue, the writer
+    thread does the formatting, disk I/O and rollover. When the queue is full a record is either dropped (counted
+    and reported by the writer) or the caller blocks until there is room, depending on the overflow policy.
+    Operation records are the audit trail, they are never dropped and the drop reports go to the operation log too.
+    """
+
+    def __init__(self, queue_size: int, overflow_policy: str) -> None:
+        """Initialize the writer, the thread is started by the first record
+        Args:
+            queue_size (int): Maximum number of records waiting to be written
+            overflow_policy (str): "drop" or "block", what to do with a record when the queue is full
+        """
+        if not isinstance(queue_size, int) or queue_size <= 0:
+            raise ValueError(f"queue_size must be a positive integer, got {queue_size}")
+        if overflow_policy not in MIS_LOG_OVERFLOW_POLICIES:
+            raise ValueError(f"overflow_policy must be one of {MIS_LOG_OVERFLOW_POLICIES}, got {overflow_policy}")
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, handler: logging.Handler, record: logging.LogRecord) -> None:
+        """Queue a record to be written by a handler
+        Args:
+            handler (logging.Handler): The handler writing the record
+            record (logging.LogRecord): The prepared log record
+        """
+        if self._thread is None:
+            self._start()
+        if self.overflow_policy == "block" or getattr(handler, "log_type", None) == LogType.OPERATION:
+            self._queue.put((handler, record))
+            return
+        try:
+            self._queue.put_nowait((handler, record))
+        except queue.Full:
+            # Records are submitted from any thread
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def is_writer_thread(self) -> bool:
+        """Whether the current thread is the writer thread"""
+        return self._thread is threading.current_thread()
+
+    def flush(self, timeout: float = MIS_LOG_FLUSH_TIMEOUT) -> bool:
+        """Wait until every queued record has been written
+        Args:
+            timeout (float): Maximum seconds to wait
+        Returns:
+            bool: True if the queue was drained in time
+        """
+        if self._thread is None or self.is_writer_thread():
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline or not self._thread.is_alive():
+                return False
+            time.sleep(0.005)
+        return True
+
+    def stop(self, timeout: float = MIS_LOG_FLUSH_TIMEOUT) -> None:
+        """Write the queued records and stop the writer thread
+        Args:
+            timeout (float): Maximum seconds to wait for the queued records
+        """
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        try:
+            self._queue.put((None, None), timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+    def reset_after_fork(self) -> None:
+        """The writer thread does not survive fork, the child starts its own on its first record"""
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._dropped_lock = threading.Lock()
+        self.dropped = 0
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            thread = threading.Thread(target=self._run, name="mis-log-writer", daemon=True)
+            thread.start()
+            self._thread = thread
+
+    def _run(self) -> None:
+        while True:
+            handler, record = self._queue.get()
+            try:
+                if handler is None:
+                    return
+                handler.write_record(record)
+                if self.dropped:
+                    self._report_dropped(handler, record)
+            except Exception:
+                handler.handleError(record)
+            finally:
+                self._queue.task_done()
+
+    def _report_dropped(self, handler: logging.Handler, record: logging.LogRecord) -> None:
+        """Report the dropped records to the handler of the current record and to every operation log file"""
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        report = logging.makeLogRecord({
+            "name": record.name, "levelno": logging.WARNING, "levelname": logging.getLevelName(logging.WARNING),
+            "pathname": __file__, "filename": os.path.basename(__file__), "lineno": 0, "funcName": "log_writer",
+            "msg": f"{dropped} log records were dropped because the log queue is full",
+        })
+        report_handlers = [handler]
+        for operation_handler in _LOG_HANDLER_REGISTRY.file_handlers(LogType.OPERATION):
+            if operation_handler is not handler:
+                report_handlers.append(operation_handler)
+        for report_handler in report_handlers:
+            report_handler.write_record(report)
+
+
+_ASYNC_LOG_WRITER: Optional[AsyncLogWriter] = None
+_ASYNC_LOG_WRITER_LOCK = threading.Lock()
+
+
+def _get_async_log_writer() -> Optional[AsyncLogWriter]:
+    """Get the process-wide log writer, None if MIS_LOG_QUEUE_SIZE is 0 and records are written synchronously"""
+    global _ASYNC_LOG_WRITER
+    if _ASYNC_LOG_WRITER is None and MIS_LOG_QUEUE_SIZE > 0:
+        with _ASYNC_LOG_WRITER_LOCK:
+            if _ASYNC_LOG_WRITER is None:
+                writer = AsyncLogWriter(MIS_LOG_QUEUE_SIZE, MIS_LOG_OVERFLOW_POLICY)
+                atexit.register(writer.stop)
+                os.register_at_fork(after_in_child=writer.reset_after_fork)
+                _ASYNC_LOG_WRITER = writer
+    return _ASYNC_LOG_WRITER
+
+
+def flush_logs(timeout: float = MIS_LOG_FLUSH_TIMEOUT) -> bool:
+    """Wait until every queued log record has been written
+    Args:
+        timeout (float): Maximum seconds to wait
+    Returns:
+        bool: True if all records were written in time
+    """
+    writer = _ASYNC_LOG_WRITER
+    return writer.flush(timeout) if writer is not None else True
+
+
+# Rotated log files are named xxx.log.N, compressed ones xxx.log.N.gz
+_UNCOMPRESSED_ARCHIVE_PATTERN = re.compile(r"\.log\.\d+$")
+
+
+def _compress_log_file(filepath: str) -> Optional[str]:
+    """Compress a rotated log file to a read-only gzip archive next to it and remove the original
+    Args:
+        filepath (str): Path of the rotated log file
+    Returns:
+        Optional[str]: Path of the compressed archive, None if the file could not be compressed
+    """
+    if not os.path.exists(filepath):  # Already removed by the retention limits
+        return None
+    compressed = filepath + ".gz"
+    partial = compressed + ".partial"
+    original_umask = os.umask(DEFAULT_UMASK)
+    try:
+        source_stat = os.stat(filepath)
+        with open(filepath, "rb") as source, gzip.open(partial, "wb", compresslevel=MIS_LOG_COMPRESS_LEVEL) as target:
+            shutil.copyfileobj(source, target, MIS_LOG_COPY_BUFFER_SIZE)
+        # Keep the modification time, retention removes the oldest files first
+        os.utime(partial, (source_stat.st_atime, source_stat.st_mtime))
+        # Archived logs: read-only permissions (440)
+        os.chmod(partial, ARCHIVED_FILE_PERMISSIONS)
+        os.replace(partial, compressed)
+        os.remove(filepath)
+    except OSError as e:
+        logging.getLogger("mis").error(f"Error occurred while compressing log file: {e}")
+        if os.path.exists(partial):
+            os.remove(partial)
+        return None
+    finally:
+        os.umask(original_umask)
+    return compressed
+
+
+def _archive_index(suffix: str) -> int:
+    """Get the number of an archive from its name suffix, e.g. 3 for "3.gz", 0 if it has none"""
+    index = suffix.split(".", 1)[0]
+    return int(index) if index.isdigit() else 0
+
+
+class LogArchiver:
+    """Background thread compressing rotated log files and applying the retention limits, so a rollover on the
+    log writer thread only renames the file."""
+
+    def __init__(self) -> None:
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, job: Callable[[str], object], filepath: str) -> None:
+        """Queue a job for a rotated log file
+        Args:
+            job (Callable): The job, called with the file path on the archiver thread
+            filepath (str): Path of the rotated log file
+        """
+        if self._thread is None:
+            self._start()
+        self._queue.put((job, filepath))
+
+    def join(self, timeout: float = MIS_LOG_FLUSH_TIMEOUT) -> bool:
+        """Wait until every queued job is done
+        Args:
+            timeout (float): Maximum seconds to wait
+        Returns:
+            bool: True if all jobs were done in time
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def reset_after_fork(self) -> None:
+        """The archiver thread does not survive fork, the child starts its own on its first job"""
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            thread = threading.Thread(target=self._run, name="mis-log-archiver", daemon=True)
+            thread.start()
+            self._thread = thread
+
+    def _run(self) -> None:
+        while True:
+            job, filepath = self._queue.get()
+            try:
+                job(filepath)
+            except Exception as e:
+                logging.getLogger("mis").error(f"Error occurred while archiving log file: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_LOG_ARCHIVER: Optional[LogArchiver] = None
+
+
+def _get_log_archiver() -> LogArchiver:
+    """Get the process-wide log archiver"""
+    global _LOG_ARCHIVER
+    if _LOG_ARCHIVER is None:
+        with _ASYNC_LOG_WRITER_LOCK:
+            if _LOG_ARCHIVER is None:
+                archiver = LogArchiver()
+                os.register_at_fork(after_in_child=archiver.reset_after_fork)
+                _LOG_ARCHIVER = archiver
+    return _LOG_ARCHIVER
+
+
+class AsyncWriteHandlerMixin:
+    """Handler mixin moving formatting and I/O of records to the AsyncLogWriter thread"""
+
+    # Set by LogManager, records of operation handlers are never dropped
+    log_type: Optional[LogType] = None
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter the record on the calling thread and queue it for the writer thread
+        Args:
+            record (logging.LogRecord): Log record
+        Returns:
+            bool: Whether the record passed the filters
+        """
+        writer = _get_async_log_writer()
+        if writer is None or writer.is_writer_thread():
+            return super().handle(record)
+        passed = self.filter(record)
+        if passed:
+            writer.submit(self, self._prepare(record))
+        return passed
+
+    def write_record(self, record: logging.LogRecord) -> None:
+        """Write a record on the current thread, holding the handler lock like `Handler.handle`
+        Args:
+            record (logging.LogRecord): Log record
+        """
+        self.acquire()
+        try:
+            self.emit(record)
+        finally:
+            self.release()
+
+    @staticmethod
+    def _prepare(record: logging.LogRecord) -> logging.LogRecord:
+        """Freeze the message and exception of a record before it leaves the calling thread"""
+        prepared = copy.copy(record)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
+
+
+class AsyncStreamHandler(AsyncWriteHandlerMixin, logging.StreamHandler):
+    """Console handler writing through the AsyncLogWriter thread"""
+
+
+class RotatingFileWithArchiveHandler(AsyncWriteHandlerMixin, RotatingFileHandler):
     """Custom RotatingFileHandler that supports log rotation and limits the number of rotated files"""
+    _cleaned_log_dirs: set = set()
+    # Log files currently written by a handler of this process
+    _active_log_files: set = set()
 
     def __init__(self, filepath: str, mode: str = 'a', max_bytes: int = 0, backup_count: int = 0,
                  encoding: str = None, delay: bool = False, log_dir: str = MIS_LOG_PATH) -> None:
@@ -124,8 +490,16 @@ class RotatingFileWithArchiveHandler(RotatingFileHandler):
             os.umask(original_umask)
         # Set permissions for current log file (read-write 640)
         self._set_file_permissions(filepath, is_archive=False)
+        self._active_log_files.add(self.baseFilename)
 
-        self._cleanup_old_log_files()
+        # Old files of a directory only pile up across restarts, scanning once per process is enough
+        if self.log_dir not in self._cleaned_log_dirs:
+            self._cleaned_log_dirs.add(self.log_dir)
+            self._cleanup_old_log_files()
+            # Archives left uncompressed by a previous process
+            for f in os.listdir(self.log_dir):
+                if f.startswith(MIS_LOG_PREFIX) and _UNCOMPRESSED_ARCHIVE_PATTERN.search(f):
+                    _get_log_archiver().submit(_compress_log_file, os.path.join(self.log_dir, f))
 
     @staticmethod
     def _get_current_uid():
@@ -177,6 +551,30 @@ class RotatingFileWithArchiveHandler(RotatingFileHandler):
                     logger = logging.getLogger("mis")
                     logger.error(f"Error occurred while cleaning up old log files: {e}")
 
+    @staticmethod
+    def _remove_oversized_files(log_files, max_size):
+        """Remove the oldest log files until the total size does not exceed the maximum size.
+        Args:
+            log_files (list): List of tuples containing file paths and modification times, oldest first
+            max_size (int): Maximum total size of the log files in bytes
+        """
+        sizes = []
+        for filepath, _ in log_files:
+            try:
+                sizes.append(os.path.getsize(filepath))
+            except OSError:
+                sizes.append(0)
+        total_size = sum(sizes)
+        for (filepath, _), size in zip(log_files, sizes):
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(filepath)
+                total_size -= size
+            except OSError as e:
+                logger = logging.getLogger("mis")
+                logger.error(f"Error occurred while cleaning up old log files: {e}")
+
     @staticmethod
     def _set_file_permissions(filepath: str, is_archive: bool = False) -> None:
         """Set file permissions based on whether it's a current log or archived log.
@@ -196,72 +594,227 @@ class RotatingFileWithArchiveHandler(RotatingFileHandler):
             raise PermissionError(f"Error setting permissions for log file: {e}") from e
 
     def doRollover(self) -> None:
-        """Perform log rotation and remove excess rotated log files"""
-        try:
-            super().doRollover()
-            self._set_file_permissions(self.baseFilename, is_archive=False)
-        except PermissionError:
-            rotated_files = []
-            for i in range(1, self.backup_count + 1):
-                rotated_filename = f"{self.baseFilename}.{i}"
-                if os.path.exists(rotated_filename):
-                    rotated_files.append(rotated_filename)
-            for rotated_file in rotated_files:
-                self._set_file_permissions(rotated_file, is_archive=True)
-
-            super().doRollover()
-        finally:
-            self._set_file_permissions(self.baseFilename, is_archive=False)
+        """Move the current log file to a new read-only archive and queue it for compression and retention.
+
+        Archives are numbered upwards instead of being shifted, so the LogArchiver thread can compress them while
+        the handler keeps writing.
+        """
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            archive = self._next_archive_filename()
+            os.rename(self.baseFilename, archive)
+            # Set read-only permissions (440) for the rotated log file
+            self._set_file_permissions(archive, is_archive=True)
+            _get_log_archiver().submit(self._archive, archive)
+        if not self.delay:
+            self.stream = self._open()
+        self._set_file_permissions(self.baseFilename, is_archive=False)
 
-        # Set permissions for rotated log files (read-only 440)
-        self._set_rotated_files_permissions()
+    def close(self) -> None:
+        """Close the log file, it is no longer protected from retention"""
+        self._active_log_files.discard(self.baseFilename)
+        super().close()
 
-        self._cleanup_old_log_files()
+    def _next_archive_filename(self) -> str:
+        """Get the archive name following the newest archive of the current log file, e.g. xxx.log.3"""
+        prefix = self.base_filename + "."
+        newest = max((_archive_index(f[len(prefix):]) for f in os.listdir(self.log_dir) if f.startswith(prefix)),
+                     default=0)
+        return f"{self.baseFilename}.{newest + 1}"
 
-    def _set_rotated_files_permissions(self) -> None:
-        """Set read-only permissions for rotated log files"""
-        try:
-            for f in os.listdir(self.log_dir):
-                # Check if file is a rotated log file (e.g., xxx.log.1, xxx.log.2, etc.)
-                if (f.startswith(self.base_filename) and
-                        f != os.path.basename(self.baseFilename) and  # Exclude current log file
-                        len(f) > len(os.path.basename(self.baseFilename))):  # Check if it's a rotated file
-                    filepath = os.path.join(self.log_dir, f)
-                    # Set read-only permissions (440) for rotated log files
-                    os.chmod(filepath, ARCHIVED_FILE_PERMISSIONS)  # 440
-        except OSError as e:
-            raise OSError(f"Error setting permissions for rotated log files: {e}") from e
+    def _archive(self, archive: str) -> None:
+        """Compress a rotated log file and apply the retention limits, runs on the LogArchiver thread"""
+        _compress_log_file(archive)
+        self._cleanup_old_log_files()
 
     def _cleanup_old_log_files(self):
-        """Clean up old log files when count exceeds max_archive_count.
-        Only delete files with the same owner as the current process.
+        """Clean up old log files when their count exceeds MIS_MAX_LOG_STORED or their total size exceeds
+        MIS_MAX_LOG_STORED_SIZE, and archives of the current log file beyond backup_count.
+        Only delete files with the same owner as the current process, log files still being written are kept.
         """
         try:
             current_uid = self._get_current_uid()
-            log_files = self._collect_log_files(self.log_dir, current_uid)
+            log_dir = os.path.abspath(self.log_dir)
+            log_files = [(filepath, mtime) for filepath, mtime in self._collect_log_files(log_dir, current_uid)
+                         if filepath not in self._active_log_files]
             log_files.sort(key=lambda x: x[1])  # Sort by modification time (oldest first)
-            self._remove_excess_files(log_files, MIS_MAX_LOG_STORED)
+            archive_prefix = self.baseFilename + "."
+            # Archives of the current log file are numbered upwards, oldest first
+            archives = sorted((log_file for log_file in log_files if log_file[0].startswith(archive_prefix)),
+                              key=lambda x: _archive_index(x[0][len(archive_prefix):]))
+            self._remove_excess_files(archives, self.backup_count)
+            log_files = [log_file for log_file in log_files if os.path.exists(log_file[0])]
+            active_count = sum(1 for f in self._active_log_files if os.path.dirname(f) == log_dir)
+            max_count = max(MIS_MAX_LOG_STORED - active_count, 0)
+            self._remove_excess_files(log_files, max_count)
+            self._remove_oversized_files(log_files[max(len(log_files) - max_count, 0):], MIS_MAX_LOG_STORED_SIZE)
         except OSError as e:
             logger = logging.getLogger("mis")
             logger.error(f"Error occurred while cleaning up old log files: {e}")
 
 
-class CallStackFilter(logging.Filter):
-    """Custom filter to add call stack information to log records."""
-    def filter(self, record: logging.LogRecord) -> bool:
-        """ Filter method to add call stack information to log records.
+class FlightRecorderHandler(logging.Handler):
+    """Preallocated ring buffer keeping the last records of every level in memory.
+
+    Storing a record is one slot assignment without locking or formatting, the records are only formatted when the
+    buffer is dumped to a file, e.g. after an internal error.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the ring buffer
+        Args:
+            capacity (int): Number of records kept
+        """
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError(f"capacity must be a positive integer, got {capacity}")
+        super().__init__(logging.DEBUG)
+        self.capacity = capacity
+        self.setFormatter(logging.Formatter(_FORMAT, _DATE_FORMAT))
+        self._records: List[Optional[logging.LogRecord]] = [None] * capacity
+        self._counter = itertools.count()  # next() is atomic, concurrent records never share a slot
+        self._dump_lock = threading.Lock()
+        self._last_dump = 0.0
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Store a record, overwriting the oldest one
         Args:
             record (logging.LogRecord): Log record
+        Returns:
+            bool: Always True
         """
-        if not isinstance(record, logging.LogRecord):
-            raise TypeError(f"Invalid record type: {type(record)}, logging.LogRecord needed")
-        # Get real caller info
-        filename, lineno, function_name = _find_caller_info()
-        record.filename = filename
-        record.lineno = lineno
-        record.funcName = function_name
+        self._records[next(self._counter) % self.capacity] = record
         return True
 
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
+
+    def snapshot(self) -> List[logging.LogRecord]:
+        """Get the stored records, oldest first"""
+        records = [record for record in list(self._records) if record is not None]
+        records.sort(key=lambda record: record.created)
+        return records
+
+    def dump(self, log_dir: str, reason: str, min_interval_in_sec: float = 0) -> Optional[str]:
+        """Write the stored records to a new read-only file in the log directory
+        Args:
+            log_dir (str): Directory of the dump file
+            reason (str): Why the buffer is dumped, written as the first line
+            min_interval_in_sec (float): Skip the dump if the previous one is more recent, for automatic dumps
+        Returns:
+            Optional[str]: Path of the dump file, None if it was skipped
+        """
+        with self._dump_lock:
+            now = time.monotonic()
+            if self._last_dump and now - self._last_dump < min_interval_in_sec:
+                return None
+            self._last_dump = now
+            records = self.snapshot()
+            now_in_ms = int(time.time() * 1000)
+            timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(now_in_ms // 1000))
+            filename = os.path.join(log_dir, f"{MIS_LOG_PREFIX}flight_{timestamp}_{now_in_ms % 1000:03d}.log")
+            original_umask = os.umask(DEFAULT_UMASK)
+            try:
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(f"Flight recorder dump of {len(records)} records: {_filter_invalid_chars(reason)}\n")
+                    for record in records:
+                        f.write(self.format(record) + "\n")
+            finally:
+                os.umask(original_umask)
+            # A dump is never written again, read-only like archived logs (440)
+            os.chmod(filename, ARCHIVED_FILE_PERMISSIONS)
+            return filename
+
+
+_FLIGHT_RECORDER: Optional[FlightRecorderHandler] = (
+    FlightRecorderHandler(MIS_FLIGHT_RECORDER_SIZE) if MIS_FLIGHT_RECORDER_SIZE > 0 else None)
+
+
+def is_flight_recorder_enabled() -> bool:
+    """Whether MIS_FLIGHT_RECORDER_SIZE enables the flight recorder"""
+    return _FLIGHT_RECORDER is not None
+
+
+def dump_flight_recorder(reason: str, min_interval_in_sec: float = 0, log_dir: str = MIS_LOG_PATH) -> Optional[str]:
+    """Dump the flight recorder to a file in the log directory
+    Args:
+        reason (str): Why the buffer is dumped
+        min_interval_in_sec (float): Skip the dump if the previous one is more recent
+        log_dir (str): Directory of the dump file
+    Returns:
+        Optional[str]: Path of the dump file, None if the flight recorder is disabled or the dump was skipped
+    """
+    if _FLIGHT_RECORDER is None:
+        return None
+    try:
+        return _FLIGHT_RECORDER.dump(log_dir, reason, min_interval_in_sec)
+    except OSError as e:
+        logging.getLogger("mis").error(f"Error occurred while dumping the flight recorder: {e}")
+        return None
+
+
+class LogHandlerRegistry:
+    """Process-wide registry sharing one console and one file handler per log directory and LogType.
+
+    Every named MIS logger of a type writes to the same log file. A file handler whose file has been removed is
+    replaced for all loggers sharing it the next time a logger of its type is set up.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._handlers: Dict[Tuple[str, LogType], List[logging.Handler]] = {}
+        self._loggers: Dict[Tuple[str, LogType], Dict[str, Logger]] = {}
+
+    def attach(self, target: Logger, log_dir: str, log_type: LogType,
+               create_console_handler: Callable[[], logging.Handler],
+               create_file_handler: Callable[[], logging.FileHandler]) -> None:
+        """Attach the shared handlers of a log directory and type to a logger, creating them if needed
+        Args:
+            target (Logger): The logger to attach the handlers to, its existing handlers are removed
+            log_dir (str): Directory of the log file
+            log_type (LogType): Type of the log file
+            create_console_handler (Callable): Creates the console handler
+            create_file_handler (Callable): Creates the file handler
+        """
+        key = (log_dir, log_type)
+        with self._lock:
+            handlers = self._handlers.get(key)
+            if handlers is None:
+                handlers = [create_console_handler(), create_file_handler()]
+                self._handlers[key] = handlers
+                self._loggers[key] = {}
+            elif not os.access(handlers[1].baseFilename, os.F_OK):
+                self._replace_file_handler(key, create_file_handler())
+            target.handlers.clear()
+            for handler in handlers:
+                target.addHandler(handler)
+            self._loggers[key][target.name] = target
+
+    def file_handlers(self, log_type: LogType) -> List[logging.Handler]:
+        """Get the file handlers of a log type, one per log directory
+        Args:
+            log_type (LogType): Type of the log files
+        Returns:
+            List[logging.Handler]: The file handlers
+        """
+        with self._lock:
+            return [handlers[1] for (_, handler_log_type), handlers in self._handlers.items()
+                    if handler_log_type == log_type]
+
+    def _replace_file_handler(self, key: Tuple[str, LogType], file_handler: logging.FileHandler) -> None:
+        old_handler = self._handlers[key][1]
+        self._handlers[key][1] = file_handler
+        for shared_logger in self._loggers[key].values():
+            shared_logger.removeHandler(old_handler)
+            shared_logger.addHandler(file_handler)
+        # Queued records of the old handler are written before its stream is closed
+        flush_logs()
+        old_handler.close()
+
+
+_LOG_HANDLER_REGISTRY = LogHandlerRegistry()
+
 
 class LogManager:
     def __init__(self, log_dir: str = MIS_LOG_PATH, max_archive_count: int = MIS_MAX_ARCHIVE_COUNT,
@@ -309,20 +862,33 @@ class LogManager:
         """
         if not isinstance(name, str):
             raise TypeError(f"Name must be a string, got {type(name)}")
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.DEBUG if self.log_type == LogType.OPERATION else MIS_LOG_LEVEL)
+        self.logger = _get_mis_logger(name)
+        self.logger.setLevel(logging.DEBUG if self.log_type == LogType.OPERATION or _FLIGHT_RECORDER is not None
+                             else MIS_LOG_LEVEL)
+
+        _LOG_HANDLER_REGISTRY.attach(self.logger, self.log_dir, self.log_type,
+                                     self._create_console_handler, self._create_file_handler)
+        if _FLIGHT_RECORDER is not None:
+            self.logger.addHandler(_FLIGHT_RECORDER)
+
+        # Prevent log propagation to parent loggers
+        self.logger.propagate = False
+        if self.log_type != LogType.OPERATION:
+            _LEVEL_MANAGED_LOGGERS[name] = self.logger
 
-        # Clear existing handlers
-        self.logger.handlers.clear()
+        return self.logger
 
-        # Create console handler
-        console_handler = logging.StreamHandler()
+    def _create_console_handler(self) -> logging.Handler:
+        """Create the console handler shared by the loggers of this log type"""
+        console_handler = AsyncStreamHandler()
         console_formatter = logging.Formatter(_FORMAT, _DATE_FORMAT)
         console_handler.setFormatter(console_formatter)
         console_handler.setLevel(logging.DEBUG if self.log_type == LogType.OPERATION else MIS_LOG_LEVEL)
-        self.logger.addHandler(console_handler)
+        console_handler.log_type = self.log_type
+        return console_handler
 
-        # Create file handler
+    def _create_file_handler(self) -> logging.FileHandler:
+        """Create a new timestamped log file and its handler, shared by the loggers of this log type"""
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         if self.log_type == LogType.DEFAULT:
             log_filename = os.path.join(self.log_dir, f"{MIS_LOG_PREFIX}{timestamp}.log")
@@ -356,39 +922,96 @@ class LogManager:
         file_formatter = logging.Formatter(_FORMAT, _DATE_FORMAT)
         file_handler.setFormatter(file_formatter)
         file_handler.setLevel(logging.DEBUG if self.log_type == LogType.OPERATION else MIS_LOG_LEVEL)
-        self.logger.addHandler(file_handler)
+        file_handler.log_type = self.log_type
+        return file_handler
 
-        # Add call stack filter
-        callstack_filter = CallStackFilter()
-        console_handler.addFilter(callstack_filter)
-        file_handler.addFilter(callstack_filter)
 
-        # Prevent log propagation to parent loggers
-        self.logger.propagate = False
+# Substrings of the file names of logging internals, which are skipped when looking for the caller
+_IGNORED_CALLER_FILES = ("logger", "logging", "logging/__init__", __file__)
+# Whether a code file is logging internal, the decision only depends on the file name of the code object
+_LOGGING_INTERNAL_FILES: Dict[str, bool] = {}
 
-        return self.logger
+
+def _is_logging_internal(filename: str) -> bool:
+    """Check whether a code file belongs to the logging system, cached per file name"""
+    internal = _LOGGING_INTERNAL_FILES.get(filename)
+    if internal is None:
+        internal = any(ignore_name in filename for ignore_name in _IGNORED_CALLER_FILES)
+        _LOGGING_INTERNAL_FILES[filename] = internal
+    return internal
+
+
+def _find_caller_frame(stacklevel: int = 1) -> Optional[FrameType]:
+    """Find the frame of the first caller outside of the logging system
+    Args:
+        stacklevel (int): Skip stacklevel - 1 further non-logging frames, like `Logger.findCaller`
+    Returns:
+        Optional[FrameType]: The caller frame, None if it is deeper than MIS_CALLER_INSPECT_DEPTH
+    """
+    frame = sys._getframe(1)
+    depth = 1
+    while frame is not None and depth < MIS_CALLER_INSPECT_DEPTH:  # Avoid infinite loop
+        if not _is_logging_internal(frame.f_code.co_filename):
+            stacklevel -= 1
+            if stacklevel <= 0:
+                return frame
+        frame = frame.f_back
+        depth += 1
+    return None
 
 
 def _find_caller_info() -> tuple:
     """Find Real caller info"""
-    frame = inspect.currentframe()
-    result = ("unknown", 0, "unknown")
-    # Find first non-logging module caller
-    depth = 1
-    try:
-        while frame and depth < MIS_CALLER_INSPECT_DEPTH:  # Avoid infinite loop
-            filename = frame.f_code.co_filename
-            function_name = frame.f_code.co_name
-            # Ignore logging system internal files
-            ignore_files = ["logger", "logging", "logging/__init__", __file__]
-            if not any(ignore_name in filename for ignore_name in ignore_files):
-                result = (os.path.basename(filename), frame.f_lineno, function_name)
-                break
-            frame = frame.f_back
-            depth += 1
-    finally:
-        del frame  # Avoid circular reference
-    return result
+    frame = _find_caller_frame()
+    if frame is None:
+        return "unknown", 0, "unknown"
+    return os.path.basename(frame.f_code.co_filename), frame.f_lineno, frame.f_code.co_name
+
+
+class MISLogger(Logger):
+    """Logger resolving the real caller of a record once, when the record is created"""
+
+    def findCaller(self, stack_info: bool = False, stacklevel: int = 1) -> tuple:
+        """Find the first caller outside of the logging system
+        Args:
+            stack_info (bool): Whether to include stack information.
+            stacklevel (int): Skip stacklevel - 1 further non-logging frames.
+        Returns:
+            tuple: Caller's path name, line number, function name and stack information.
+        """
+        frame = _find_caller_frame(stacklevel)
+        if frame is None:
+            return "unknown", 0, "unknown", None
+        stack = None
+        if stack_info:
+            with io.StringIO() as sio:
+                sio.write("Stack (most recent call last):\n")
+                traceback.print_stack(frame, file=sio)
+                stack = sio.getvalue().rstrip("\n")
+        return frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name, stack
+
+
+def _get_mis_logger(name: str) -> MISLogger:
+    """Get the MIS logger of a name from the standard logging manager, so `logging.getLogger(name)` returns it too.
+    The logger class is only set while the logger is created, other libraries keep getting standard loggers.
+    Args:
+        name (str): Name of the logger
+    Returns:
+        MISLogger: The logger
+    """
+    manager = logging.Logger.manager
+    # The lock of the logging module is reentrant and held by getLogger, no other logger is created meanwhile
+    with logging._lock:
+        logger_class = manager.loggerClass
+        manager.setLoggerClass(MISLogger)
+        try:
+            logger = manager.getLogger(name)
+        finally:
+            manager.loggerClass = logger_class
+        if not isinstance(logger, MISLogger):
+            # Created by `logging.getLogger` before, MISLogger only overrides methods
+            logger.__class__ = MISLogger
+    return logger
 
 
 class EnhancedLogger:
@@ -400,94 +1023,83 @@ class EnhancedLogger:
         if not isinstance(logger, Logger):
             raise TypeError(f"Invalid logger type: {type(logger)}, Logger needed")
         self.logger: Logger = logger
-        self._caller_filename = None
-        self._caller_lineno = None
-        self._caller_func_name = None
 
-    def debug(self, message: str) -> None:
+    def debug(self, message: str, *args) -> None:
         """Log debug message to both console and disk
         Args:
-            message (str): Message to log
+            message (str): Message to log, %-style formatted with args
+            *args: Arguments of the message, only formatted if the level is enabled
         """
-        original_find_caller = self._find_caller_backup(message)
-        self.logger.debug(_filter_invalid_chars(message))
-        self.logger.findCaller = original_find_caller
+        self._log(logging.DEBUG, message, args)
 
-    def info(self, message: str) -> None:
+    def info(self, message: str, *args) -> None:
         """Log info message to both console and disk
         Args:
-            message (str): Message to log
+            message (str): Message to log, %-style formatted with args
+            *args: Arguments of the message, only formatted if the level is enabled
         """
-        original_find_caller = self._find_caller_backup(message)
-        self.logger.info(_filter_invalid_chars(message))
-        self.logger.findCaller = original_find_caller
+        self._log(logging.INFO, message, args)
 
-    def warning(self, message: str) -> None:
+    def warning(self, message: str, *args) -> None:
         """Log warning message to both console and disk
         Args:
-            message (str): Message to log
+            message (str): Message to log, %-style formatted with args
+            *args: Arguments of the message, only formatted if the level is enabled
         """
-        original_find_caller = self._find_caller_backup(message)
-        self.logger.warning(_filter_invalid_chars(message))
-        self.logger.findCaller = original_find_caller
+        self._log(logging.WARNING, message, args)
 
-    def error(self, message: str) -> None:
+    def error(self, message: str, *args) -> None:
         """Log error message to both console and disk
         Args:
-            message (str): Message to log
+            message (str): Message to log, %-style formatted with args
+            *args: Arguments of the message, only formatted if the level is enabled
         """
-        original_find_caller = self._find_caller_backup(message)
-        self.logger.error(_filter_invalid_chars(message))
-        self.logger.findCaller = original_find_caller
+        self._log(logging.ERROR, message, args)
 
-    def critical(self, message: str) -> None:
+    def critical(self, message: str, *args) -> None:
         """Log Critical message to both console and disk
         Args:
-            message (str): Message to log
+            message (str): Message to log, %-style formatted with args
+            *args: Arguments of the message, only formatted if the level is enabled
         """
-        original_find_caller = self._find_caller_backup(message)
-        self.logger.critical(_filter_invalid_chars(message))
-        self.logger.findCaller = original_find_caller
+        self._log(logging.CRITICAL, message, args)
 
-    def _custom_find_caller(self, stack_info: bool, stack_level: int) -> tuple:
-        """Custom findCaller implementation that returns predetermined caller info.
-        Args:
-            stack_info (bool): Whether to include stack information.
-            stack_level (int): The stack level to determine the caller's depth.
+    def _log(self, level: int, message: str, args: tuple) -> None:
+        _check_message(message)
+        if not self.logger.isEnabledFor(level):
+            return
+        # Arguments are formatted before sanitizing, so they cannot inject invalid chars either
+        if args:
+            if len(args) == 1 and isinstance(args[0], Mapping) and args[0]:
+                args = args[0]
+            message = message % args
+        self.logger.log(level, _filter_invalid_chars(message))
 
-        Returns:
-            tuple: Caller's file name, line number, function name, and additional information (None).
-        """
-        return (self._caller_filename, self._caller_lineno, self._caller_func_name, None)
 
-    def _find_caller_backup(self, message: str) -> Callable:
-        """Log a message at the specified level
-        Args:
-            level (str): The log level ("debug", "info", "warning", or "error").
-            message (str): The message to log.
-        """
-        if not isinstance(message, str):
-            raise TypeError("Log message must be a string")
-        self._caller_filename, self._caller_lineno, self._caller_func_name = _find_caller_info()
-        original_find_caller = self.logger.findCaller
-        self.logger.findCaller = self._custom_find_caller
-        return original_find_caller
+def _check_message(message: str) -> None:
+    if not isinstance(message, str):
+        raise TypeError("Log message must be a string")
+
+
+_INVALID_CHARS = '\n\f\r\b\t\v\u000D\u000A\u000C\u000B\u0009\u0008\u0007'
+# Maps every invalid char to "\n", so a run of invalid chars becomes a run of a single char
+_INVALID_CHARS_TABLE = str.maketrans(dict.fromkeys(_INVALID_CHARS, '\n'))
+_INVALID_CHARS_RUN_PATTERN = re.compile('\n+')
 
 
 def _filter_invalid_chars(s: str) -> str:
-    """Filter invalid chars in original str
+    """Filter invalid chars in original str, each run of invalid chars is replaced by one space
     Args:
         s (str): original log message
     Returns:
         str: filtered log message
     """
-    invalid_chars = [
-        '\n', '\f', '\r', '\b', '\t', '\v',
-        '\u000D', '\u000A', '\u000C', '\u000B',
-        '\u0009', '\u0008', '\u0007'
-    ]
-    pattern = '[' + re.escape(''.join(invalid_chars)) + ']+'
-    return re.sub(pattern, ' ', s)
+    if s.isprintable():  # All invalid chars are control chars, which are not printable
+        return s
+    translated = s.translate(_INVALID_CHARS_TABLE)
+    if '\n' not in translated:
+        return translated
+    return _INVALID_CHARS_RUN_PATTERN.sub(' ', translated)
 
 
 def _configure_mis_root_logger() -> None:
@@ -499,7 +1111,8 @@ _configure_mis_root_logger()
 
 def init_logger(name: str, log_dir: Optional[str] = None,
                 log_type: LogType = LogType.DEFAULT) -> EnhancedLogger:
-    """Initialize an enhanced logger that logs to both console and disk
+    """Initialize an enhanced logger that logs to both console and disk.
+    The logger is not registered in the `logging` module, `logging.getLogger(name)` returns a different logger.
     Args:
         name (str): Name of the logger
         log_dir (str): Directory to store log files
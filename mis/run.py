@@ -21,6 +21,8 @@ import signal
 import subprocess
 import sys
 
+import psutil
+
 from mis.logger import init_logger, LogType
 
 logger = init_logger(__name__, log_type=LogType.SERVICE)
@@ -43,11 +45,12 @@ def main() -> None:
         command = [
             sys.executable, "-c",
             ("import sys; sys.path.insert(0, sys.argv[1]);"
+             "from mis.utils.startup_timing import STARTUP_TIMER; STARTUP_TIMER.anchor(float(sys.argv[2]));"
              "from mis.llm.entrypoints.launcher import _run_server,"
              "environment_preparation, ARGS;"
-             "import uvloop; args = environment_preparation(ARGS);"
+             "import uvloop; STARTUP_TIMER.lap('import'); args = environment_preparation(ARGS);"
              "uvloop.run(_run_server(args))"),
-            sys.argv[0]
+            sys.argv[0], str(psutil.Process().create_time())
         ]
         process = subprocess.Popen(command, shell=False)
         logger.info("mis_launcher started successfully")
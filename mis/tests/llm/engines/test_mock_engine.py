@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+from vllm.sampling_params import RequestOutputKind, SamplingParams
+
+from mis.args import GlobalArgs
+from mis.llm.engine_factory import AutoEngine
+from mis.llm.engines.mock_engine import MockEngineClient
+from mis.llm.entrypoints.openai.api_server import init_openai_app_state, router
+
+WORDS = "hello world mock token engine serving layer benchmark".split()
+
+
+def create_tiny_model(model_dir: str) -> None:
+    """Write the configuration and tokenizer of a tiny model, the mock engine needs no weights."""
+    vocab = {"<unk>": 0, "<s>": 1, "</s>": 2}
+    vocab.update({word: index + 3 for index, word in enumerate(WORDS)})
+    tokenizer = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    fast_tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="<unk>", bos_token="<s>",
+                                             eos_token="</s>")
+    fast_tokenizer.chat_template = "{% for message in messages %}{{ message['content'] }} {% endfor %}"
+    fast_tokenizer.save_pretrained(model_dir)
+    with open(os.path.join(model_dir, "config.json"), "w") as config:
+        json.dump({"architectures": ["LlamaForCausalLM"], "model_type": "llama", "hidden_size": 16,
+                   "intermediate_size": 32, "num_attention_heads": 2, "num_hidden_layers": 1,
+                   "num_key_value_heads": 2, "vocab_size": len(vocab), "max_position_embeddings": 2048,
+                   "torch_dtype": "bfloat16", "bos_token_id": 1, "eos_token_id": 2}, config)
+
+
+class TestMockEngine(unittest.TestCase):
+    """Test the mock engine backend"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model_dir = tempfile.TemporaryDirectory()
+        create_tiny_model(cls.model_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.model_dir.cleanup()
+
+    def _create_engine(self, **config) -> MockEngineClient:
+        args = GlobalArgs(engine_type="mock", model=self.model_dir.name, served_model_name="Qwen3-8B",
+                          engine_optimization_config=config)
+        return AutoEngine.from_config(args)
+
+    @staticmethod
+    async def _collect(engine: MockEngineClient, request_id: str, **params):
+        outputs = []
+        async for output in engine.generate({"prompt_token_ids": [3, 4, 5]}, SamplingParams(**params), request_id):
+            outputs.append(output)
+        return outputs
+
+    def test_outputs_are_deterministic(self):
+        engine = self._create_engine(prefill_latency_ms=0.0, decode_latency_ms=0.0)
+        first = asyncio.run(self._collect(engine, "a", max_tokens=8, output_kind=RequestOutputKind.DELTA))
+        second = asyncio.run(self._collect(engine, "b", max_tokens=8, output_kind=RequestOutputKind.FINAL_ONLY))
+        self.assertEqual(len(first), 8)
+        self.assertEqual(len(second), 1)
+        self.assertEqual([output.outputs[0].token_ids[0] for output in first], second[0].outputs[0].token_ids)
+        self.assertEqual("".join(output.outputs[0].text for output in first), second[0].outputs[0].text)
+        self.assertTrue(second[0].finished)
+        self.assertEqual(second[0].outputs[0].finish_reason, "length")
+
+    def test_batch_capacity_queues_requests(self):
+        engine = self._create_engine(max_num_seqs=1, prefill_latency_ms=50.0, decode_latency_ms=0.0)
+
+        async def run():
+            first = asyncio.create_task(self._collect(engine, "a", max_tokens=2))
+            second = asyncio.create_task(self._collect(engine, "b", max_tokens=2))
+            await asyncio.sleep(0.01)
+            self.assertEqual((engine.scheduler.running, engine.scheduler.waiting), (1, 1))
+            await asyncio.gather(first, second)
+            self.assertEqual((engine.scheduler.running, engine.scheduler.kv_used), (0, 0))
+
+        asyncio.run(run())
+
+    def test_abort(self):
+        engine = self._create_engine(prefill_latency_ms=0.0, decode_latency_ms=10.0)
+
+        async def run():
+            task = asyncio.create_task(self._collect(engine, "a", max_tokens=50))
+            await asyncio.sleep(0.05)
+            await engine.abort("a")
+            outputs = await task
+            self.assertLess(len(outputs), 50)
+            self.assertFalse(outputs[-1].finished)
+            # Aborts of finished requests are not kept
+            await engine.abort("a")
+            await engine.abort("unknown")
+            self.assertEqual(engine._aborted, set())
+
+        asyncio.run(run())
+
+    def test_invalid_config(self):
+        with self.assertRaises(ValueError):
+            self._create_engine(latency_distribution="pareto")
+        with self.assertRaises(TypeError):
+            MockEngineClient(None, None, config={"max_num_seqs": 1})
+
+    def test_serves_chat_completions(self):
+        engine = self._create_engine(prefill_latency_ms=0.0, decode_latency_ms=0.0)
+        app = FastAPI()
+        app.include_router(router)
+        args = GlobalArgs(model=self.model_dir.name, served_model_name="Qwen3-8B")
+        asyncio.run(init_openai_app_state(engine, engine.model_config, app.state, args))
+        client = TestClient(app)
+        body = {"model": "Qwen3-8B", "messages": [{"role": "user", "content": "hello world"}], "max_tokens": 4}
+
+        response = client.post("/openai/v1/chat/completions", json=body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["usage"]["completion_tokens"], 4)
+
+        response = client.post("/openai/v1/chat/completions", json={**body, "stream": True})
+        self.assertEqual(response.status_code, 200)
+        chunks = [line for line in response.text.splitlines() if line.startswith("data: ")]
+        self.assertEqual(chunks[-1], "data: [DONE]")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import unittest
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.responses import StreamingResponse
+
+from mis.llm.entrypoints.access_log import AccessLogMiddleware, AccessRecorder, UNMATCHED_ROUTE
+from mis.llm.entrypoints.metrics import REQUESTS_IN_FLIGHT
+
+
+class TestAccessRecorder(unittest.TestCase):
+    """Test the aggregation of the access recorder"""
+
+    def setUp(self):
+        self.operation_logger = MagicMock()
+
+    def test_summary_line_per_interval(self):
+        recorder = AccessRecorder(interval_in_sec=60, operation_logger=self.operation_logger)
+        for latency in (0.01, 0.03):
+            recorder.record("10.0.0.1", "/openai/v1/models", 200, latency)
+        recorder.record("10.0.0.2", "/openai/v1/models", 429, 0.001)
+        self.operation_logger.info.assert_not_called()
+
+        recorder.flush()
+        self.operation_logger.info.assert_called_once_with(
+            "Access summary of the last 1s: 3 requests, 1 errors; "
+            "[IP: 10.0.0.1] /openai/v1/models 200 x2 avg 20.0ms max 30.0ms; "
+            "[IP: 10.0.0.2] /openai/v1/models 429 x1 avg 1.0ms max 1.0ms")
+        # An empty interval is not logged
+        recorder.flush()
+        self.operation_logger.info.assert_called_once()
+
+    def test_sampled_full_lines(self):
+        recorder = AccessRecorder(sample_rate=1.0, operation_logger=self.operation_logger)
+        recorder.record("10.0.0.1", "/openai/v1/models", 200, 0.5)
+        recorder.record("10.0.0.1", "/openai/v1/models", 500, 0.5)
+        self.operation_logger.info.assert_called_once_with(
+            "[IP: %s] %d %s %.1fms", "10.0.0.1", 200, "/openai/v1/models", 500.0)
+
+    def test_untracked_clients_are_counted_as_other(self):
+        recorder = AccessRecorder(operation_logger=self.operation_logger, max_tracked_keys=1)
+        for client_ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+            recorder.record(client_ip, "/openai/v1/models", 200, 0.01)
+        recorder.flush()
+        summary = self.operation_logger.info.call_args[0][0]
+        self.assertIn("[IP: 10.0.0.1] /openai/v1/models 200 x1", summary)
+        self.assertIn("[IP: other] /openai/v1/models 200 x2", summary)
+
+    def test_invalid_config(self):
+        with self.assertRaises(TypeError):
+            AccessRecorder(interval_in_sec="60")
+        with self.assertRaises(ValueError):
+            AccessRecorder(interval_in_sec=0)
+        with self.assertRaises(ValueError):
+            AccessRecorder(sample_rate=1.5)
+
+
+class TestAccessLogMiddleware(unittest.TestCase):
+    """Test the access log middleware"""
+
+    def test_records_route_status_and_latency(self):
+        recorder = MagicMock(spec=AccessRecorder)
+        app = FastAPI()
+        app.add_middleware(AccessLogMiddleware, recorder=recorder)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"item_id": item_id}
+
+        client = TestClient(app, client=("10.0.0.1", 50000))
+        self.assertEqual(client.get("/items/1").status_code, 200)
+        self.assertEqual(client.get("/missing").status_code, 404)
+
+        (first_ip, first_route, first_status, first_latency), _ = recorder.record.call_args_list[0]
+        self.assertEqual((first_ip, first_route, first_status), ("10.0.0.1", "/items/{item_id}", 200))
+        self.assertGreaterEqual(first_latency, 0)
+        self.assertEqual(recorder.record.call_args_list[1][0][1:3], (UNMATCHED_ROUTE, 404))
+
+    def test_streamed_request_is_in_flight_until_its_body_is_sent(self):
+        app = FastAPI()
+        app.add_middleware(AccessLogMiddleware)
+        observed = []
+
+        @app.get("/stream")
+        async def stream():
+            async def chunks():
+                yield "first"
+                # The response has started, the body is still being sent
+                observed.append(REQUESTS_IN_FLIGHT.labels().value)
+                yield "last"
+
+            return StreamingResponse(chunks())
+
+        in_flight = REQUESTS_IN_FLIGHT.labels().value
+        self.assertEqual(TestClient(app).get("/stream").text, "firstlast")
+        self.assertEqual(observed, [in_flight + 1])
+        self.assertEqual(REQUESTS_IN_FLIGHT.labels().value, in_flight)
+
+    def test_invalid_recorder(self):
+        with self.assertRaises(TypeError):
+            AccessLogMiddleware(FastAPI(), recorder="recorder")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mis.llm.entrypoints.admin import router
+from mis.llm.entrypoints.middleware import (
+    ConcurrencyLimitMiddleware,
+    RateLimitConfig,
+    RateLimitMiddleware,
+    RequestTimeoutMiddleware
+)
+from mis.logger import get_log_level, set_log_level
+
+
+class TestAdminLimits(unittest.TestCase):
+    """Test the runtime limits of the admin API"""
+
+    def setUp(self):
+        """Set up test environment before each test method"""
+        self.log_level = get_log_level()
+        self.app = FastAPI()
+        self.app.add_middleware(ConcurrencyLimitMiddleware, max_concurrent_requests=8)
+        self.app.add_middleware(RateLimitMiddleware, config=RateLimitConfig(requests_per_minute=100))
+        self.app.add_middleware(RequestTimeoutMiddleware, request_timeout_in_sec=60)
+        self.app.include_router(router)
+
+        @self.app.get("/ping")
+        async def ping():
+            return {"message": "pong"}
+
+        self.local_client = TestClient(self.app, client=("127.0.0.1", 50000))
+
+    def tearDown(self):
+        set_log_level(self.log_level)
+
+    def test_remote_requests_are_forbidden(self):
+        remote_client = TestClient(self.app, client=("192.168.1.10", 50000))
+        self.assertEqual(remote_client.get("/admin/limits").status_code, 403)
+        self.assertEqual(remote_client.put("/admin/limits", json={"log_level": "DEBUG"}).status_code, 403)
+
+    def test_update_limits(self):
+        response = self.local_client.put("/admin/limits", json={
+            "max_concurrent_requests": 4,
+            "rate_limit_per_minute": 2,
+            "request_timeout_in_sec": 30,
+            "log_level": "WARNING",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "max_concurrent_requests": 4,
+            "rate_limit_per_minute": 2,
+            "request_timeout_in_sec": 30,
+            "log_level": "WARNING",
+        })
+        self.assertEqual(get_log_level(), "WARNING")
+        # The admin request counts against the new rate limit of 2 requests per minute
+        self.assertEqual(self.local_client.get("/ping").status_code, 200)
+        self.assertEqual(self.local_client.get("/ping").status_code, 429)
+
+    def test_invalid_update_changes_nothing(self):
+        before = self.local_client.get("/admin/limits").json()
+        response = self.local_client.put("/admin/limits", json={
+            "max_concurrent_requests": 4,
+            "request_timeout_in_sec": 0,
+            "log_level": "TRACE",
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.json()["detail"]), 2)
+        self.assertEqual(self.local_client.get("/admin/limits").json(), before)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.local_client.put("/admin/limits", json={"max_concurrent_requests": "4"})
+        self.assertEqual(response.status_code, 422)
+        response = self.local_client.put("/admin/limits", json={"max_body_size": 1})
+        self.assertEqual(response.status_code, 422)
+
+    def test_dump_flight_recorder(self):
+        with patch("mis.llm.entrypoints.admin.is_flight_recorder_enabled", return_value=False):
+            self.assertEqual(self.local_client.post("/admin/flight-recorder").status_code, 400)
+        with patch("mis.llm.entrypoints.admin.is_flight_recorder_enabled", return_value=True), \
+                patch("mis.llm.entrypoints.admin.dump_flight_recorder", return_value="/tmp/flight.log") as dump:
+            response = self.local_client.post("/admin/flight-recorder")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {"path": "/tmp/flight.log"})
+            dump.assert_called_once()
+            remote_client = TestClient(self.app, client=("192.168.1.10", 50000))
+            self.assertEqual(remote_client.post("/admin/flight-recorder").status_code, 403)
+
+    def test_profile_server(self):
+        response = self.local_client.post("/admin/profile", json={"duration_in_sec": 1, "all_threads": True})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        # Collapsed stacks: "frame;frame count" per line
+        for line in response.text.splitlines():
+            self.assertRegex(line, r"^\S.* \d+$")
+        self.assertEqual(self.local_client.post("/admin/profile", json={"duration_in_sec": 0}).status_code, 400)
+        remote_client = TestClient(self.app, client=("192.168.1.10", 50000))
+        self.assertEqual(remote_client.post("/admin/profile").status_code, 403)
+
+    def test_one_profiling_session_at_a_time(self):
+        with patch("mis.llm.entrypoints.admin._PROFILE_LOCK") as lock:
+            lock.locked.return_value = True
+            self.assertEqual(self.local_client.post("/admin/profile").status_code, 409)
+
+
+    def test_memory_diagnostics(self):
+        self.local_client.get("/ping")
+        report = self.local_client.get("/admin/memory").json()
+        self.assertEqual(report["tracemalloc"], {"tracing": False})
+        self.assertGreater(report["gc_objects"], 0)
+        rate_limit_sizes = report["structures"]["middlewares"]["RateLimitMiddleware"]
+        self.assertIn("request_counts", rate_limit_sizes)
+        # The (count, timestamp) records of the rate limit are no collections
+        self.assertNotIn("request_counts[*]", rate_limit_sizes)
+
+        self.assertEqual(self.local_client.post("/admin/memory/baseline").status_code, 409)
+        try:
+            response = self.local_client.post("/admin/memory/tracing", json={"enabled": True, "frames": 2})
+            self.assertEqual(response.json(), {"tracing": True, "frames": 2})
+            self.assertEqual(self.local_client.post("/admin/memory/tracing", json={"enabled": True}).status_code, 409)
+            retained = [bytearray(1024) for _ in range(100)]
+            report = self.local_client.get("/admin/memory", params={"limit": 5}).json()["tracemalloc"]
+            self.assertEqual(report["frames"], 2)
+            self.assertLessEqual(len(report["top"]), 5)
+            # The retained buffers are the growth of this test since the baseline
+            self.assertTrue(any("test_admin.py" in site for entry in report["growth"] for site in entry["site"]))
+            self.assertEqual(self.local_client.post("/admin/memory/baseline").status_code, 200)
+            del retained
+        finally:
+            self.assertEqual(self.local_client.post("/admin/memory/tracing", json={"enabled": False}).json(),
+                             {"tracing": False})
+        self.assertEqual(self.local_client.get("/admin/memory", params={"limit": 0}).status_code, 400)
+        self.assertEqual(self.local_client.get("/admin/memory", params={"group_by": "size"}).status_code, 400)
+        remote_client = TestClient(self.app, client=("192.168.1.10", 50000))
+        self.assertEqual(remote_client.get("/admin/memory").status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
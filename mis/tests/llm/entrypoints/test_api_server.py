@@ -308,6 +308,142 @@ class TestApiServer(unittest.TestCase):
         mock_chat.assert_called_once_with(mock_raw_request)
         mock_handler.create_chat_completion.assert_awaited_once()
 
+    @patch('mis.llm.entrypoints.openai.api_server.chat')
+    @patch('os.stat')
+    def test_create_chat_completions_with_open_circuit(self, mock_stat, mock_chat):
+        """Test create_chat_completions fails fast while the engine circuit breaker is open."""
+        from mis.llm.entrypoints.circuit_breaker import CircuitBreaker, CircuitState
+        mock_stat.return_value = MagicMock(st_uid=1000, st_gid=1000, st_mode=0o600)
+        mock_handler = AsyncMock()
+        mock_chat.return_value = mock_handler
+        breaker = CircuitBreaker()
+        breaker._transition(CircuitState.OPEN)
+
+        mock_request = create_autospec(Request)
+        mock_raw_request = create_autospec(Request)
+        mock_raw_request.app = create_autospec(object)
+        mock_raw_request.app.state = State()
+        mock_raw_request.app.state.request_timeout = 10
+        mock_raw_request.app.state.circuit_breaker = breaker
+
+        response = self.run_async(create_chat_completions(mock_request, mock_raw_request))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("retry-after", response.headers)
+        mock_handler.create_chat_completion.assert_not_awaited()
+
+    @patch('mis.llm.entrypoints.openai.api_server.chat')
+    @patch('os.stat')
+    def test_create_chat_completions_server_timing(self, mock_stat, mock_chat):
+        """Test non-streaming responses report their phases in the Server-Timing header."""
+        import time
+        from vllm.entrypoints.openai.protocol import ChatCompletionResponse
+        mock_stat.return_value = MagicMock(st_uid=1000, st_gid=1000, st_mode=0o600)
+        mock_handler = AsyncMock()
+        mock_handler.create_chat_completion = AsyncMock(return_value=ChatCompletionResponse(
+            id="test_id", choices=[], created=123456, model="test_model", object="chat.completion", usage={}))
+        mock_chat.return_value = mock_handler
+
+        mock_request = create_autospec(Request)
+        mock_raw_request = create_autospec(Request)
+        mock_raw_request.app = create_autospec(object)
+        mock_raw_request.app.state = State()
+        mock_raw_request.app.state.request_timeout = 10
+        mock_raw_request.state = State()
+        mock_raw_request.state.admission_wait = 0.002
+        mock_raw_request.state.admitted_at = time.perf_counter()
+
+        response = self.run_async(create_chat_completions(mock_request, mock_raw_request))
+
+        phases = [phase.split(";")[0] for phase in response.headers["server-timing"].split(", ")]
+        self.assertEqual(phases, ["admission", "validation", "generation", "serialization"])
+        self.assertIn("admission;dur=2.000", response.headers["server-timing"])
+
+    def test_align_streaming_response_observes_chunk_timing(self):
+        """Test the streaming alignment observes the first chunk carrying tokens and the gaps between them."""
+        from mis.llm.entrypoints.metrics import INTER_TOKEN_LATENCY, TIME_TO_FIRST_TOKEN
+        from mis.llm.entrypoints.openai.api_server import _align_streaming_response
+
+        async def chunks():
+            for delta in ('{"role":"assistant","content":""}', '{"content":" the"}', '{"content":"\\"model"}',
+                          '{"content":""}'):
+                yield f'data: {{"choices":[{{"index":0,"delta":{delta}}}]}}\n\n'
+            yield "data: [DONE]\n\n"
+
+        async def consume():
+            return [content async for content in _align_streaming_response(chunks())]
+
+        first_count = TIME_TO_FIRST_TOKEN.labels().count
+        gap_count = INTER_TOKEN_LATENCY.labels().count
+        self.assertEqual(len(self.run_async(consume())), 5)
+        self.assertEqual(TIME_TO_FIRST_TOKEN.labels().count, first_count + 1)
+        self.assertEqual(INTER_TOKEN_LATENCY.labels().count, gap_count + 1)
+
+    @patch('mis.llm.entrypoints.openai.api_server.chat')
+    def test_route_timeout_is_an_engine_timeout(self, mock_chat):
+        """Test a chat completion cancelled by the route timeout of the middleware stack is counted as a timeout."""
+        import httpx
+        from fastapi import FastAPI
+        from mis.constants import REQUEST_TIMEOUT_IN_SEC
+        from mis.llm.entrypoints import launcher
+        from mis.llm.entrypoints.circuit_breaker import CircuitBreaker
+        from mis.llm.entrypoints.middleware import RequestTimeoutMiddleware, find_middleware
+        from mis.llm.entrypoints.openai.api_server import router
+
+        async def hang(*_):
+            await asyncio.sleep(60)
+
+        mock_chat.return_value.create_chat_completion = hang
+        app = FastAPI()
+        app.include_router(router)
+        # The handler keeps its own timeout of generation requests, like the service
+        app.state.request_timeout = REQUEST_TIMEOUT_IN_SEC
+        app.state.circuit_breaker = breaker = CircuitBreaker()
+
+        async def post():
+            # The rate limit middleware starts its cleanup task when it is created
+            launcher._add_middlewares(self.test_args, app)
+            app.middleware_stack = app.build_middleware_stack()
+            find_middleware(app, RequestTimeoutMiddleware).set_timeout(1)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                return await client.post("/openai/v1/chat/completions", json={
+                    "model": "Qwen3-8B", "messages": [{"role": "user", "content": "Hello"}]})
+
+        response = self.run_async(post())
+
+        self.assertEqual(response.status_code, 408)
+        self.assertEqual(breaker.stats()["window_timeouts"], 1)
+
+    def test_stream_verdict_is_taken_when_the_stream_ends(self):
+        """Test a streamed engine call is recorded when its stream ends, holding its half-open probe slot until then."""
+        from mis.llm.entrypoints.circuit_breaker import (CallOutcome, CircuitBreaker, CircuitBreakerConfig,
+                                                         CircuitState, EngineCall)
+        from mis.llm.entrypoints.openai.api_server import _align_streaming_response
+
+        async def chunks(*contents):
+            for content in contents:
+                yield content
+
+        async def stream(breaker, *contents):
+            self.assertTrue(breaker.try_acquire())
+            with EngineCall(breaker) as engine_call:
+                engine_call.outcome = CallOutcome.SUCCESS
+                engine_call.defer()
+            generator = _align_streaming_response(chunks(*contents), engine_call=engine_call)
+            await generator.__anext__()
+            # The probe is still streaming
+            self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+            self.assertFalse(breaker.try_acquire())
+            return [content async for content in generator]
+
+        for contents, state in (
+                (("data: {}\n\n", "data: [DONE]\n\n"), CircuitState.CLOSED),
+                (("data: {}\n\n", 'data: {"error": {"code": 400}}\n\n', "data: [DONE]\n\n"), CircuitState.OPEN)):
+            breaker = CircuitBreaker(CircuitBreakerConfig(half_open_max_requests=1))
+            breaker._transition(CircuitState.HALF_OPEN)
+            self.run_async(stream(breaker, *contents))
+            self.assertEqual(breaker.state, state)
+
     @patch('os.stat')
     def test_init_openai_app_state_with_served_model_name(self, mock_stat):
         """Test init_openai_app_state with served_model_name provided."""
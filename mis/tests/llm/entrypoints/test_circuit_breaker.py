@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import unittest
+from unittest.mock import patch
+
+from mis.llm.entrypoints.circuit_breaker import (
+    CallOutcome,
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitState,
+    EngineCall,
+)
+from mis.llm.entrypoints.metrics import CIRCUIT_BREAKER_STATE, CIRCUIT_BREAKER_TRANSITIONS
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test the circuit breaker around the engine client"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch("mis.llm.entrypoints.circuit_breaker.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(CircuitBreakerConfig(
+            window_in_sec=10, min_requests=4, error_rate_threshold=0.5, timeout_rate_threshold=0.5,
+            open_in_sec=5, half_open_max_requests=2))
+
+    def _call(self, outcome):
+        self.assertTrue(self.breaker.try_acquire())
+        with EngineCall(self.breaker) as engine_call:
+            engine_call.outcome = outcome
+
+    def _trip(self):
+        for _ in range(2):
+            self._call(CallOutcome.SUCCESS)
+        for _ in range(2):
+            self._call(CallOutcome.FAILURE)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+    def test_stays_closed_below_min_requests(self):
+        for _ in range(3):
+            self._call(CallOutcome.FAILURE)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+    def test_trips_on_error_rate_and_fails_fast(self):
+        self._trip()
+        self.assertFalse(self.breaker.try_acquire())
+        self.assertEqual(self.breaker.retry_after(), 6)
+        self.assertEqual(self.breaker.stats()["transitions"], {"closed->open": 1})
+
+    def test_trips_on_timeout_rate(self):
+        for outcome in (CallOutcome.SUCCESS, CallOutcome.SUCCESS, CallOutcome.TIMEOUT, CallOutcome.TIMEOUT):
+            self._call(outcome)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+    def test_old_outcomes_leave_the_window(self):
+        for _ in range(3):
+            self._call(CallOutcome.FAILURE)
+        self.now += 20
+        self._call(CallOutcome.FAILURE)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+    def test_half_open_probes_close_the_circuit(self):
+        self._trip()
+        self.now += 5
+        self.assertTrue(self.breaker.try_acquire())
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+        self.assertTrue(self.breaker.try_acquire())
+        # Only a limited number of probes are let through
+        self.assertFalse(self.breaker.try_acquire())
+        self.breaker.release(CallOutcome.SUCCESS, CircuitState.HALF_OPEN)
+        self.breaker.release(CallOutcome.SUCCESS, CircuitState.HALF_OPEN)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+    def test_half_open_failure_reopens_the_circuit(self):
+        self._trip()
+        self.now += 5
+        self._call(CallOutcome.FAILURE)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+        self.assertEqual(self.breaker.stats()["transitions"]["half_open->open"], 1)
+
+    def test_call_admitted_while_closed_is_no_probe(self):
+        self.assertTrue(self.breaker.try_acquire())
+        closed_call = EngineCall(self.breaker)
+        self._trip()
+        self.now += 5
+        self.assertTrue(self.breaker.try_acquire())
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+        # The call admitted before the circuit tripped finishes during the probe
+        with closed_call:
+            closed_call.outcome = CallOutcome.SUCCESS
+        self.breaker.release(CallOutcome.SUCCESS, CircuitState.HALF_OPEN)
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+        self.assertTrue(self.breaker.try_acquire())
+        self.breaker.release(CallOutcome.SUCCESS, CircuitState.HALF_OPEN)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+    def test_state_and_transitions_are_exported(self):
+        transitions = CIRCUIT_BREAKER_TRANSITIONS.labels("closed", "open").value
+        self._trip()
+        self.assertEqual(CIRCUIT_BREAKER_TRANSITIONS.labels("closed", "open").value, transitions + 1)
+        self.assertEqual(CIRCUIT_BREAKER_STATE.labels("open").value, 1)
+        self.assertEqual(CIRCUIT_BREAKER_STATE.labels("closed").value, 0)
+
+    def test_exception_is_recorded_as_failure(self):
+        self._trip()
+        self.now += 5
+        with self.assertRaises(RuntimeError):
+            self.assertTrue(self.breaker.try_acquire())
+            with EngineCall(self.breaker):
+                raise RuntimeError("engine dead")
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+    def test_deferred_probe_keeps_its_slot_until_finished(self):
+        self._trip()
+        self.now += 5
+        for _ in range(2):
+            self.assertTrue(self.breaker.try_acquire())
+            with EngineCall(self.breaker) as engine_call:
+                engine_call.outcome = CallOutcome.SUCCESS
+                engine_call.defer()
+        self.assertFalse(self.breaker.try_acquire())
+        engine_call.finish(CallOutcome.FAILURE)
+        # Only the first outcome of a call counts
+        engine_call.finish(CallOutcome.SUCCESS)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+        self.assertEqual(self.breaker.stats()["window_failures"], 3)
+
+    def test_invalid_config(self):
+        with self.assertRaises(TypeError):
+            CircuitBreaker(config="invalid")
+        with self.assertRaises(ValueError):
+            CircuitBreaker(CircuitBreakerConfig(window_in_sec=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mis.llm.entrypoints.load import LoadReporter, router
+from mis.llm.entrypoints.middleware import (
+    ConcurrencyLimitMiddleware,
+    RateLimitConfig,
+    RateLimitMiddleware,
+    RouteClass,
+    RouteLimitConfig,
+    find_middleware
+)
+
+
+class TestLoadReport(unittest.TestCase):
+    """Test the load report endpoint"""
+
+    def setUp(self):
+        self.app = FastAPI()
+        self.app.add_middleware(ConcurrencyLimitMiddleware, max_concurrent_requests=4)
+        self.app.add_middleware(RateLimitMiddleware, config=RateLimitConfig(requests_per_minute=1))
+        self.app.include_router(router)
+        self.reporter = self.app.state.load_reporter = LoadReporter(self.app)
+        self.client = TestClient(self.app)
+
+    def test_report_is_served_from_cache(self):
+        self.assertEqual(self.client.get("/load").status_code, 503)
+        self.reporter.refresh()
+        report = self.client.get("/load").json()
+        self.assertEqual(report["in_flight_requests"], 0)
+        self.assertEqual(report["queued_requests"], 0)
+        self.assertEqual(report["max_concurrent_requests"], 4)
+        self.assertIsNone(report["kv_cache_usage"])
+        self.assertEqual(report["headroom"], 1.0)
+
+    def test_probe_bypasses_the_limits(self):
+        self.reporter.refresh()
+        # The rate limit of 1 request per minute does not apply to the probe route
+        for _ in range(5):
+            self.assertEqual(self.client.get("/load").status_code, 200)
+        with self.assertRaises(ValueError):
+            RateLimitMiddleware(self.app, route_limits={RouteClass.PROBE: RouteLimitConfig(1, 1, 1)})
+
+    def test_headroom_follows_the_tighter_resource(self):
+        self.client.get("/load")
+        self.app.state.log_stats = True
+        concurrency = find_middleware(self.app, ConcurrencyLimitMiddleware)
+        concurrency.pools[0].active = 1
+        gauges = {"vllm:num_requests_running": 3.0, "vllm:num_requests_waiting": 1.0,
+                  "vllm:kv_cache_usage_perc": 0.9}
+        with patch("mis.llm.entrypoints.load._read_engine_gauges", return_value=gauges):
+            report = self.reporter.collect()
+        concurrency.pools[0].active = 0
+        self.assertEqual(report["in_flight_requests"], 1)
+        self.assertEqual((report["engine_running_requests"], report["engine_waiting_requests"]), (3, 1))
+        self.assertEqual(report["kv_cache_usage"], 0.9)
+        self.assertEqual(report["headroom"], 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
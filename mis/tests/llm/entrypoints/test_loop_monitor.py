@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from mis.llm.entrypoints.loop_monitor import EventLoopMonitor
+from mis.llm.entrypoints.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+
+class TestEventLoopMonitor(unittest.TestCase):
+    """Test the event loop lag monitor"""
+
+    def test_probe_observes_lag_of_blocked_loop(self):
+        monitor = EventLoopMonitor(threshold_in_sec=0.05, interval_in_sec=0.01)
+        observed = EVENT_LOOP_LAG.labels().count
+        stalls = EVENT_LOOP_STALLS.labels().value
+
+        async def block_loop():
+            monitor.start()
+            await asyncio.sleep(0.03)
+            time.sleep(0.1)
+            await asyncio.sleep(0.03)
+            await monitor.stop()
+
+        with patch("mis.llm.entrypoints.loop_monitor.logger"):
+            asyncio.run(block_loop())
+        self.assertGreater(EVENT_LOOP_LAG.labels().count, observed)
+        self.assertGreaterEqual(EVENT_LOOP_STALLS.labels().value, stalls + 1)
+
+    def test_stall_logs_stack_of_loop_thread_with_rate_limit(self):
+        monitor = EventLoopMonitor(threshold_in_sec=0.5, interval_in_sec=0.1, log_interval_in_sec=60)
+        monitor._loop_thread_id = threading.get_ident()
+        now = time.monotonic()
+        with patch("mis.llm.entrypoints.loop_monitor.logger") as mock_logger:
+            monitor._heartbeat = now - 1
+            monitor.check_stall(now)
+            # The same stall is reported once
+            monitor.check_stall(now + 1)
+            message = mock_logger.warning.call_args[0][0]
+            self.assertIn("test_stall_logs_stack_of_loop_thread_with_rate_limit", message)
+            mock_logger.warning.assert_called_once()
+
+            # Another stall within the log interval is only counted
+            monitor._heartbeat = now + 2
+            monitor.check_stall(now + 3)
+            mock_logger.warning.assert_called_once()
+            monitor._heartbeat = now + 70
+            monitor.check_stall(now + 71)
+            self.assertIn("1 more stalls since the last report", mock_logger.warning.call_args[0][0])
+
+    def test_loop_not_stalled(self):
+        monitor = EventLoopMonitor(threshold_in_sec=0.5, interval_in_sec=0.1)
+        monitor._heartbeat = time.monotonic()
+        with patch("mis.llm.entrypoints.loop_monitor.logger") as mock_logger:
+            monitor.check_stall(time.monotonic())
+        mock_logger.warning.assert_not_called()
+
+    def test_invalid_config(self):
+        with self.assertRaises(TypeError):
+            EventLoopMonitor(threshold_in_sec="0.5")
+        with self.assertRaises(ValueError):
+            EventLoopMonitor(threshold_in_sec=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import unittest
+from http import HTTPStatus
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mis.llm.entrypoints.access_log import AccessLogMiddleware
+from mis.llm.entrypoints.metrics import REQUESTS, router
+from mis.llm.entrypoints.middleware import RejectionLogAggregator
+from mis.utils.metrics import Metric, MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test the metric primitives and the text exposition format"""
+
+    def test_render_counter_gauge_and_histogram(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_requests", "Requests.", ("route",))
+        gauge = registry.gauge("test_in_flight", "In flight.")
+        histogram = registry.histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        counter.labels('/a"b').inc()
+        counter.labels('/a"b').inc(2)
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE test_requests counter", lines)
+        self.assertIn('test_requests_total{route="/a\\"b"} 3.0', lines)
+        self.assertIn("test_in_flight 1.0", lines)
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 2.0', lines)
+        self.assertIn('test_latency_seconds_bucket{le="1.0"} 3.0', lines)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 4.0', lines)
+        self.assertIn("test_latency_seconds_sum 5.65", lines)
+        self.assertIn("test_latency_seconds_count 4.0", lines)
+
+    def test_invalid_metrics(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_requests", "Requests.", ("route",))
+        with self.assertRaises(ValueError):
+            registry.counter("test_requests", "Requests.")
+        with self.assertRaises(ValueError):
+            counter.labels("/a", "200")
+        with self.assertRaises(ValueError):
+            registry.histogram("test_latency_seconds", "Latency.", buckets=(1.0, 0.1))
+        with self.assertRaises(TypeError):
+            Metric("test_untyped", "Untyped.")
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Test the /metrics endpoint"""
+
+    def setUp(self):
+        app = FastAPI()
+        app.add_middleware(AccessLogMiddleware)
+        app.include_router(router)
+
+        @app.get("/ping")
+        async def ping():
+            return {"status": "ok"}
+
+        self.app = app
+        self.client = TestClient(app)
+
+    def test_exports_request_and_rejection_metrics(self):
+        before = REQUESTS.labels("/ping", "200").value
+        self.client.get("/ping")
+        RejectionLogAggregator(burst=0, reason="test_reason").record("warning", HTTPStatus.TOO_MANY_REQUESTS, "10.0.0.1",
+                                                                          "Rejected")
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertEqual(REQUESTS.labels("/ping", "200").value, before + 1)
+        self.assertIn('mis_requests_total{route="/ping",status="200"}', response.text)
+        self.assertIn('mis_request_duration_seconds_bucket{route="/ping",le="+Inf"}', response.text)
+        self.assertIn('mis_rejections_total{reason="test_reason",status="429"} 1.0', response.text)
+        self.assertNotIn("engine_metric", response.text)
+
+    def test_reexports_engine_metrics_with_log_stats(self):
+        self.app.state.log_stats = True
+        with patch("mis.llm.entrypoints.metrics._render_engine_metrics", return_value="engine_metric 1.0\n"):
+            response = self.client.get("/metrics")
+        self.assertTrue(response.text.endswith("engine_metric 1.0\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
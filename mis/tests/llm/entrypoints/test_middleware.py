@@ -19,6 +19,7 @@ See the Mulan PSL v2 for more details.
 """
 import asyncio
 import unittest
+from http import HTTPStatus
 from unittest.mock import Mock, AsyncMock, patch
 
 import json
@@ -27,13 +28,22 @@ from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
 from starlette.status import HTTP_431_REQUEST_HEADER_FIELDS_TOO_LARGE, HTTP_200_OK
 
+from mis import constants
 from mis.llm.entrypoints.middleware import (
+    DEFAULT_ROUTE_LIMITS,
+    AdmissionPoolConfig,
+    EncodedRejection,
+    PreEncodedResponse,
+    RejectionLogAggregator,
     RequestTimeoutMiddleware,
     RequestHeaderSizeLimitMiddleware,
     RequestSizeLimitMiddleware,
     ConcurrencyLimitMiddleware,
     RateLimitMiddleware,
-    RateLimitConfig
+    RateLimitConfig,
+    RouteClass,
+    RouteLimitConfig,
+    classify_route
 )
 
 
@@ -198,6 +208,190 @@ class TestConcurrencyLimitMiddleware(unittest.IsolatedAsyncioTestCase):
         asyncio.run(test_dispatch())
 
 
+class TestConcurrencyLimitAdmissionPools(unittest.IsolatedAsyncioTestCase):
+    """Test admission pools of the concurrency limit middleware"""
+
+    def setUp(self):
+        """Set up test environment before each test method"""
+        self.pools = [
+            AdmissionPoolConfig(name="short", max_prompt_tokens=16, max_concurrent_requests=1, max_queued_requests=1),
+            AdmissionPoolConfig(name="long", max_prompt_tokens=None, max_concurrent_requests=1, max_queued_requests=0),
+        ]
+        self.middleware = ConcurrencyLimitMiddleware(FastAPI(), max_concurrent_requests=2, pools=self.pools)
+
+    @staticmethod
+    def _mock_request(headers):
+        mock_request = Mock(spec=Request)
+        mock_request.client = Mock()
+        mock_request.client.host = "127.0.0.1"
+        mock_request.headers = headers
+        return mock_request
+
+    def test_select_pool_by_estimated_prompt_tokens(self):
+        short_request = self._mock_request({"content-length": "64"})
+        long_request = self._mock_request({"content-length": "65536"})
+        chunked_request = self._mock_request({"transfer-encoding": "chunked"})
+        self.assertEqual(self.middleware._select_pool(short_request).config.name, "short")
+        self.assertEqual(self.middleware._select_pool(long_request).config.name, "long")
+        self.assertEqual(self.middleware._select_pool(chunked_request).config.name, "long")
+
+    async def test_short_requests_not_blocked_by_long_requests(self):
+        release = asyncio.Event()
+
+        async def slow_call_next(request):
+            await release.wait()
+            return JSONResponse(content={"message": "OK"})
+
+        long_task = asyncio.create_task(
+            self.middleware.dispatch(self._mock_request({"content-length": "65536"}), slow_call_next))
+        await asyncio.sleep(0)
+        # The long pool is full and has no queue
+        rejected = await self.middleware.dispatch(self._mock_request({"content-length": "65536"}), slow_call_next)
+        self.assertEqual(rejected.status_code, 429)
+        # The short pool still admits requests
+        short_task = asyncio.create_task(
+            self.middleware.dispatch(self._mock_request({"content-length": "64"}), slow_call_next))
+        queued_task = asyncio.create_task(
+            self.middleware.dispatch(self._mock_request({"content-length": "64"}), slow_call_next))
+        await asyncio.sleep(0)
+        self.assertEqual(self.middleware.pool_stats()["short"], {
+            "active": 1, "waiting": 1, "max_concurrent_requests": 1, "max_queued_requests": 1})
+        release.set()
+        responses = await asyncio.gather(long_task, short_task, queued_task)
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200])
+        self.assertEqual(self.middleware.active_requests, 0)
+
+    async def test_resize_wakes_queued_requests(self):
+        release = asyncio.Event()
+
+        async def slow_call_next(request):
+            await release.wait()
+            return JSONResponse(content={"message": "OK"})
+
+        tasks = [asyncio.create_task(
+            self.middleware.dispatch(self._mock_request({"content-length": "64"}), slow_call_next)) for _ in range(2)]
+        await asyncio.sleep(0)
+        self.assertEqual(self.middleware.pool_stats()["short"]["waiting"], 1)
+        self.middleware.set_max_concurrent_requests(3)
+        await asyncio.sleep(0)
+        self.assertEqual(self.middleware.pool_stats()["short"]["active"], 2)
+        self.assertEqual(self.middleware.pool_stats()["short"]["max_concurrent_requests"], 2)
+        self.assertEqual(self.middleware.pool_stats()["long"]["max_concurrent_requests"], 1)
+        with self.assertRaises(ValueError):
+            self.middleware.set_max_concurrent_requests(1)
+        release.set()
+        responses = await asyncio.gather(*tasks)
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+
+    async def test_woken_waiter_leaves_the_queue_at_once(self):
+        pool = self.middleware.pools[0]
+        await pool.acquire()
+        queued = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        self.assertTrue(pool.is_full())
+        pool.release()
+        # The slot is handed over before the queued task resumes, it counts only as active
+        self.assertEqual((pool.active, pool.waiting), (1, 0))
+        self.assertFalse(pool.is_full())
+        await queued
+        self.assertEqual((pool.active, pool.waiting), (1, 0))
+        pool.release()
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        pool = self.middleware.pools[0]
+        await pool.acquire()
+        queued = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        queued.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await queued
+        self.assertEqual((pool.active, pool.waiting), (1, 0))
+        pool.release()
+        self.assertEqual(pool.active, 0)
+
+    def test_invalid_pools(self):
+        with self.assertRaises(ValueError):
+            ConcurrencyLimitMiddleware(FastAPI(), max_concurrent_requests=1, pools=self.pools)
+        with self.assertRaises(ValueError):
+            ConcurrencyLimitMiddleware(FastAPI(), max_concurrent_requests=2, pools=self.pools[:1])
+        with self.assertRaises(TypeError):
+            ConcurrencyLimitMiddleware(FastAPI(), max_concurrent_requests=2, pools=[])
+
+
+class TestRouteClassLimits(unittest.TestCase):
+    """Test per route class limits of the admission middlewares"""
+
+    def setUp(self):
+        """Set up test environment before each test method"""
+        self.route_limits = {
+            RouteClass.METADATA: RouteLimitConfig(max_concurrent_requests=1, requests_per_minute=3,
+                                                  request_timeout_in_sec=1),
+        }
+        self.app = FastAPI()
+        self.app.add_middleware(ConcurrencyLimitMiddleware, max_concurrent_requests=1,
+                                route_limits=self.route_limits)
+        self.app.add_middleware(RateLimitMiddleware, config=RateLimitConfig(requests_per_minute=1),
+                                route_limits=self.route_limits)
+        self.app.add_middleware(RequestTimeoutMiddleware, request_timeout_in_sec=5,
+                                route_limits=self.route_limits)
+
+        @self.app.get("/openai/v1/models")
+        async def models(delay: float = 0):
+            await asyncio.sleep(delay)
+            return {"data": []}
+
+        @self.app.post("/openai/v1/chat/completions")
+        async def chat_completions(delay: float = 0):
+            await asyncio.sleep(delay)
+            return {"choices": []}
+
+        self.test_client = TestClient(self.app)
+
+    def test_metadata_routes_have_own_rate_budget(self):
+        self.assertEqual(self.test_client.post("/openai/v1/chat/completions").status_code, 200)
+        self.assertEqual(self.test_client.post("/openai/v1/chat/completions").status_code, 429)
+        for _ in range(3):
+            self.assertEqual(self.test_client.get("/openai/v1/models").status_code, 200)
+        self.assertEqual(self.test_client.get("/openai/v1/models").status_code, 429)
+
+    def test_metadata_routes_have_short_timeout(self):
+        self.assertEqual(self.test_client.get("/openai/v1/models", params={"delay": 1.5}).status_code, 408)
+        response = self.test_client.post("/openai/v1/chat/completions", params={"delay": 1.5})
+        self.assertEqual(response.status_code, 200)
+
+    def test_metadata_routes_do_not_take_generation_slots(self):
+        middleware = ConcurrencyLimitMiddleware(FastAPI(), max_concurrent_requests=1, route_limits=self.route_limits)
+        request = Mock(spec=Request)
+        request.headers = {}
+        request.url = Mock()
+        request.url.path = "/openai/v1/models"
+        self.assertEqual(classify_route(request), RouteClass.METADATA)
+        self.assertEqual(middleware._select_pool(request).config.name, "metadata")
+        request.url.path = "/openai/v1/chat/completions"
+        self.assertEqual(middleware._select_pool(request).config.name, "default")
+
+    def test_admin_routes_have_their_own_class(self):
+        request = Mock(spec=Request)
+        request.url = Mock()
+        for path in ("/admin/limits", "/admin/profile", "/admin/memory", "/admin/memory/baseline"):
+            request.url.path = path
+            self.assertEqual(classify_route(request), RouteClass.ADMIN)
+        # A profiling session runs longer than the timeout of metadata routes
+        self.assertGreater(DEFAULT_ROUTE_LIMITS[RouteClass.ADMIN].request_timeout_in_sec,
+                           constants.PROFILE_MAX_DURATION_IN_SEC)
+
+    def test_invalid_route_limits(self):
+        with self.assertRaises(TypeError):
+            RequestTimeoutMiddleware(FastAPI(), route_limits={"metadata": self.route_limits[RouteClass.METADATA]})
+        with self.assertRaises(ValueError):
+            RequestTimeoutMiddleware(FastAPI(), route_limits={
+                RouteClass.GENERATION: self.route_limits[RouteClass.METADATA]})
+        with self.assertRaises(ValueError):
+            RequestTimeoutMiddleware(FastAPI(), route_limits={
+                RouteClass.METADATA: RouteLimitConfig(max_concurrent_requests=1, requests_per_minute=0,
+                                                      request_timeout_in_sec=1)})
+
+
 class TestRateLimitMiddleware(unittest.IsolatedAsyncioTestCase):
     """Test middleware for rate limiting"""
 
@@ -498,5 +692,46 @@ class TestRequestHeaderSizeLimitMiddleware(unittest.TestCase):
             RequestHeaderSizeLimitMiddleware(FastAPI(), max_header_size="invalid")
 
 
+class TestRejectionResponses(unittest.TestCase):
+    """Test pre-encoded rejection responses and the rejection log aggregator"""
+
+    def test_pre_encoded_response_matches_json_response(self):
+        content = {"detail": "Rate limit exceeded", "retry_after": 3}
+        expected = JSONResponse(status_code=429, content=content)
+        response = PreEncodedResponse(EncodedRejection(429, content))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.body, expected.body)
+        self.assertEqual(response.raw_headers, expected.raw_headers)
+
+    def test_pre_encoded_response_owns_its_headers(self):
+        rejection = EncodedRejection(408, {"detail": "Request timeout"}, headers={"Retry-After": "1"})
+        response = PreEncodedResponse(rejection)
+        response.headers["x-extra"] = "1"
+        self.assertIn((b"retry-after", b"1"), response.raw_headers)
+        self.assertEqual(len(PreEncodedResponse(rejection).raw_headers), 3)
+
+    @patch("mis.llm.entrypoints.middleware.time.monotonic")
+    def test_rejections_beyond_burst_are_summarized(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        mock_logger = Mock()
+        aggregator = RejectionLogAggregator(interval_in_sec=10, burst=2, operation_logger=mock_logger)
+        for index in range(12):
+            aggregator.record("warning", HTTPStatus.TOO_MANY_REQUESTS, f"10.0.0.{index % 3}",
+                              "Rate limit exceeded: %d", index)
+        self.assertEqual(mock_logger.warning.call_count, 2)
+        mock_logger.warning.assert_called_with("[IP: 10.0.0.1] 429 Rate limit exceeded: 1")
+
+        mock_monotonic.return_value = 111.0
+        aggregator.record("error", HTTPStatus.BAD_REQUEST, "10.0.0.9", "Too many headers")
+        mock_logger.warning.assert_called_with("10 429s from 3 IPs in the last 11s")
+        mock_logger.error.assert_called_once_with("[IP: 10.0.0.9] 400 Too many headers")
+
+    def test_invalid_aggregator_config(self):
+        with self.assertRaises(TypeError):
+            RejectionLogAggregator(interval_in_sec="10")
+        with self.assertRaises(ValueError):
+            RejectionLogAggregator(interval_in_sec=0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from mis.llm.entrypoints.access_log import AccessLogMiddleware
+from mis.llm.entrypoints.openai.api_server import _align_streaming_response, _EngineStreamingResponse
+from mis.llm.entrypoints.tracing import FileSpanExporter, Tracer, parse_traceparent
+from mis.logger import flush_logs
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN_ID = "00f067aa0ba902b7"
+
+
+class TestTracer(unittest.TestCase):
+    """Test the sampling decision of the tracer"""
+
+    def test_parse_traceparent(self):
+        self.assertEqual(parse_traceparent(f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"), (TRACE_ID, PARENT_SPAN_ID, True))
+        self.assertEqual(parse_traceparent(f"00-{TRACE_ID}-{PARENT_SPAN_ID}-00"), (TRACE_ID, PARENT_SPAN_ID, False))
+        self.assertIsNone(parse_traceparent(None))
+        self.assertIsNone(parse_traceparent(f"00-{'0' * 32}-{PARENT_SPAN_ID}-01"))
+        self.assertIsNone(parse_traceparent("00-invalid-01"))
+
+    def test_head_sampling_follows_trusted_parent(self):
+        tracer = Tracer(0.0001, MagicMock(), trust_parent=True)
+        trace = tracer.start_trace(f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01")
+        self.assertEqual((trace.trace_id, trace.parent_span_id), (TRACE_ID, PARENT_SPAN_ID))
+        trusting = Tracer(1.0, MagicMock(), trust_parent=True)
+        self.assertIsNone(trusting.start_trace(f"00-{TRACE_ID}-{PARENT_SPAN_ID}-00"))
+        self.assertIsNotNone(Tracer(1.0, MagicMock()).start_trace(None))
+        with self.assertRaises(ValueError):
+            Tracer(2.0, MagicMock())
+
+    def test_untrusted_parent_is_sampled_with_the_local_rate(self):
+        self.assertIsNone(Tracer(0.0, MagicMock()).start_trace(f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"))
+        trace = Tracer(1.0, MagicMock()).start_trace(f"00-{TRACE_ID}-{PARENT_SPAN_ID}-00")
+        self.assertEqual((trace.trace_id, trace.parent_span_id), (TRACE_ID, PARENT_SPAN_ID))
+
+
+class TestRequestTracing(unittest.TestCase):
+    """Test the spans of traced requests"""
+
+    def setUp(self):
+        self.exporter = MagicMock()
+        app = FastAPI()
+        app.add_middleware(AccessLogMiddleware, tracer=Tracer(1.0, self.exporter))
+
+        @app.get("/stream")
+        async def stream(raw_request: Request):
+            async def chunks():
+                for content in ('data: {"choices":[{"index":0,"delta":{"content":" the"}}]}\n\n',
+                                'data: {"choices":[{"index":0,"delta":{"content":" model"}}]}\n\n',
+                                "data: [DONE]\n\n"):
+                    yield content
+
+            trace = raw_request.state.trace
+            trace.hold()
+            return _EngineStreamingResponse(_align_streaming_response(chunks(), trace=trace), trace=trace,
+                                            media_type="text/event-stream")
+
+        self.client = TestClient(app)
+
+    def test_stream_is_covered_by_the_root_span(self):
+        response = self.client.get("/stream", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["traceparent"].startswith(f"00-{TRACE_ID}-"))
+
+        self.exporter.export.assert_called_once()
+        root, *children = self.exporter.export.call_args[0][0]
+        self.assertEqual(root["name"], "/stream")
+        self.assertEqual(root["parentSpanId"], PARENT_SPAN_ID)
+        self.assertEqual([span["name"] for span in children], ["first_token", "stream"])
+        self.assertTrue(all(span["parentSpanId"] == root["spanId"] for span in children))
+        self.assertGreaterEqual(int(root["endTimeUnixNano"]), int(children[-1]["endTimeUnixNano"]))
+
+    def test_trace_is_released_when_the_stream_never_starts(self):
+        async def chunks():
+            yield "data: [DONE]\n\n"
+
+        async def send(message):
+            raise OSError("client disconnected")
+
+        trace = Tracer(1.0, self.exporter).start_trace(None)
+        trace.hold()
+        response = _EngineStreamingResponse(_align_streaming_response(chunks(), trace=trace), trace=trace,
+                                            media_type="text/event-stream")
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        with self.assertRaises(ClientDisconnect):
+            asyncio.run(response(scope, None, send))
+        self.exporter.export.assert_called_once()
+
+
+class TestFileSpanExporter(unittest.TestCase):
+    """Test the local trace log file"""
+
+    def test_writes_one_otlp_json_line_per_trace(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            exporter = FileSpanExporter(log_dir)
+            trace = Tracer(1.0, exporter).start_trace(None)
+            trace.hold()
+            trace.release()
+            flush_logs()
+            exporter.shutdown()
+            with open(exporter.filepath) as f:
+                lines = f.read().splitlines()
+            self.assertTrue(os.path.basename(exporter.filepath).startswith("log_mis_disk_trace_"))
+        self.assertEqual(len(lines), 1)
+        spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual(spans[0]["traceId"], trace.trace_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
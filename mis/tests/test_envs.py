@@ -53,6 +53,17 @@ class TestEnvs(unittest.TestCase):
             envs._get_int_from_env("TEST_INT_OUT_OF_RANGE", 0, 100, 200)
         self.assertEqual(envs._get_int_from_env("TEST_INT_NOT_EXIST", 456), 456)
 
+    def test_get_float_from_env(self):
+        os.environ["TEST_FLOAT_VALID"] = "0.25"
+        os.environ["TEST_FLOAT_INVALID"] = "nan"
+        os.environ["TEST_FLOAT_OUT_OF_RANGE"] = "1.5"
+        self.assertEqual(envs._get_float_from_env("TEST_FLOAT_VALID", 0.0, 0.0, 1.0), 0.25)
+        with self.assertRaises(ValueError):
+            envs._get_float_from_env("TEST_FLOAT_INVALID", 0.0)
+        with self.assertRaises(ValueError):
+            envs._get_float_from_env("TEST_FLOAT_OUT_OF_RANGE", 0.0, 0.0, 1.0)
+        self.assertEqual(envs._get_float_from_env("TEST_FLOAT_NOT_EXIST", 0.5), 0.5)
+
     def test_get_str_from_env(self):
         os.environ["TEST_STR_VALID"] = "valid_value"
         os.environ["TEST_STR_INVALID"] = "invalid_value"
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from mis.benchmarks.load_generator import (RequestResult, load_requests, percentile, poisson_offsets, summarize,
+                                           trace_offsets)
+
+
+class TestLoadGenerator(unittest.TestCase):
+    """Test the request loading and the statistics of the load generator"""
+
+    def test_load_requests(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "chat.jsonl")
+            with open(path, "w") as file:
+                file.write(json.dumps({"prompt": "hello", "timestamp": 2.0}) + "\n\n")
+                file.write(json.dumps({"messages": [{"role": "user", "content": "hi"}], "max_tokens": 8,
+                                       "timestamp": 2.5}) + "\n")
+            bodies = load_requests(path, "Qwen3-8B", 64)
+        self.assertEqual(bodies[0]["messages"], [{"role": "user", "content": "hello"}])
+        self.assertEqual((bodies[0]["model"], bodies[0]["max_tokens"], bodies[1]["max_tokens"]), ("Qwen3-8B", 64, 8))
+        self.assertEqual(trace_offsets(bodies, 2.0), [0.0, 0.25])
+
+    def test_poisson_offsets(self):
+        offsets = poisson_offsets(10000, 100.0, random.Random(0))
+        self.assertEqual(offsets[0], 0.0)
+        self.assertAlmostEqual(offsets[-1] / len(offsets), 0.01, delta=0.001)
+
+    def test_summarize(self):
+        self.assertEqual(percentile([4.0, 1.0, 3.0, 2.0], 50), 2.5)
+        self.assertIsNone(percentile([], 99))
+        results = [RequestResult(200, 1.0, ttft=0.1, inter_token_latencies=[0.02, 0.04], output_tokens=3),
+                   RequestResult(200, 2.0, ttft=0.3, inter_token_latencies=[0.03], output_tokens=2),
+                   RequestResult(429, 0.01),
+                   RequestResult(200, 0.5, error="stream_error")]
+        summary = summarize(results, 2.0)
+        self.assertEqual((summary["succeeded"], summary["failure_rate"]), (2, 0.5))
+        self.assertEqual(summary["failures"], {"429": 1, "200:stream_error": 1})
+        self.assertEqual((summary["request_throughput"], summary["output_token_throughput"]), (1.0, 2.5))
+        self.assertAlmostEqual(summary["ttft_ms"]["p50"], 200.0)
+        self.assertAlmostEqual(summary["itl_ms"]["mean"], 30.0)
+        self.assertAlmostEqual(summary["e2e_ms"]["p90"], 1900.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,11 +17,16 @@ MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
 See the Mulan PSL v2 for more details.
 -------------------------------------------------------------------------
 """
+import gzip
 import logging
 import os
+import stat
+import threading
 import time
 import unittest
-from mis.logger import init_logger, _filter_invalid_chars, LogManager, LogType
+from mis.logger import init_logger, _filter_invalid_chars, flush_logs, AsyncLogWriter, LogManager, LogType, \
+    EnhancedLogger, MISLogger, RotatingFileWithArchiveHandler, _get_log_archiver, FlightRecorderHandler, \
+    _get_mis_logger
 from unittest.mock import patch, MagicMock
 
 MIS_LOG_PATH = "/log/mis"
@@ -294,13 +299,15 @@ class TestLogger(unittest.TestCase):
     @patch('os.path.isfile', return_value=True)
     @patch('os.path.isdir', return_value=True)
     @patch('os.stat')
-    def test_call_stack_filter(self, mock_stat, mock_isdir, mock_isfile, mock_getsize, mock_getgrgid, mock_getgid,
-                               mock_getuid):
+    def test_records_carry_the_caller(self, mock_stat, mock_isdir, mock_isfile, mock_getsize, mock_getgrgid,
+                                      mock_getgid, mock_getuid):
         mock_stat.return_value = MagicMock(st_uid=1000, st_gid=1000, st_mode=0o600)
         mock_getgrgid.return_value = MagicMock(gr_name='test_group')
         from mis.logger import init_logger
         logger = init_logger('test_call_stack', log_dir=self.temp_log_dir)
         logger.info('This is a info message to check call stack filter')
+        # Records are written by the background log writer
+        self.assertTrue(flush_logs())
         # Check if the log message contains the correct file and line number
         with open(os.path.join(self.temp_log_dir, os.listdir(self.temp_log_dir)[-1])) as f:
             log_content = f.read()
@@ -309,6 +316,191 @@ class TestLogger(unittest.TestCase):
             self.assertIn('test_log.py', log_content)
             self.assertIn('This is a info message to check call stack filter', log_content)
 
+    @patch('os.getuid', return_value=1000)
+    @patch('os.getgid', return_value=1000)
+    @patch('grp.getgrgid', return_value=1000)
+    @patch('os.path.getsize', return_value=1024 * 1024)
+    @patch('os.path.isfile', return_value=True)
+    @patch('os.path.isdir', return_value=True)
+    @patch('os.stat')
+    def test_loggers_share_handlers_per_log_type(self, mock_stat, mock_isdir, mock_isfile, mock_getsize,
+                                                 mock_getgrgid, mock_getgid, mock_getuid):
+        mock_stat.return_value = MagicMock(st_uid=1000, st_gid=1000, st_mode=0o600)
+        mock_getgrgid.return_value = MagicMock(gr_name='test_group')
+        first = init_logger('test_shared_first', log_dir=self.temp_log_dir, log_type=LogType.SERVICE)
+        second = init_logger('test_shared_second', log_dir=self.temp_log_dir, log_type=LogType.SERVICE)
+        operation = init_logger('test_shared_operation', log_dir=self.temp_log_dir, log_type=LogType.OPERATION)
+        self.assertEqual(first.logger.handlers, second.logger.handlers)
+        self.assertNotEqual(first.logger.handlers[1], operation.logger.handlers[1])
+        self.assertEqual(len(os.listdir(self.temp_log_dir)), 2)
+
+        # A removed log file is recreated for every logger sharing it
+        os.remove(first.logger.handlers[1].baseFilename)
+        third = init_logger('test_shared_third', log_dir=self.temp_log_dir, log_type=LogType.SERVICE)
+        self.assertEqual(first.logger.handlers, third.logger.handlers)
+        self.assertTrue(os.access(third.logger.handlers[1].baseFilename, os.F_OK))
+
+    def test_rollover_compresses_archives_in_background(self):
+        handler = RotatingFileWithArchiveHandler(os.path.join(self.temp_log_dir, "log_mis_disk_rollover.log"),
+                                                 max_bytes=100, backup_count=2, log_dir=self.temp_log_dir)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        try:
+            for i in range(8):
+                handler.write_record(logging.makeLogRecord({"msg": f"record {i} " + "x" * 60}))
+            self.assertTrue(_get_log_archiver().join())
+        finally:
+            handler.close()
+        archives = sorted(f for f in os.listdir(self.temp_log_dir) if f.endswith(".gz"))
+        # Only the newest backup_count archives are kept, compressed and read-only
+        self.assertEqual(archives, ["log_mis_disk_rollover.log.6.gz", "log_mis_disk_rollover.log.7.gz"])
+        for archive in archives:
+            archive_path = os.path.join(self.temp_log_dir, archive)
+            self.assertEqual(stat.S_IMODE(os.stat(archive_path).st_mode), 0o440)
+        with gzip.open(os.path.join(self.temp_log_dir, archives[-1])) as f:
+            self.assertEqual(f.read().decode(), "record 6 " + "x" * 60 + "\n")
+
+    def test_retention_by_total_size(self):
+        handler = RotatingFileWithArchiveHandler(os.path.join(self.temp_log_dir, "log_mis_disk_size.log"),
+                                                 log_dir=self.temp_log_dir)
+        try:
+            now = time.time()
+            for i in range(3):
+                old_file = os.path.join(self.temp_log_dir, f"log_mis_disk_old_{i}.log")
+                with open(old_file, "w") as f:
+                    f.write("x" * 100)
+                os.utime(old_file, (now - 10 + i, now - 10 + i))
+            with patch("mis.logger.MIS_MAX_LOG_STORED_SIZE", 250):
+                handler._cleanup_old_log_files()
+        finally:
+            handler.close()
+        # The oldest file is removed, the file being written is kept
+        self.assertEqual(sorted(os.listdir(self.temp_log_dir)),
+                         ["log_mis_disk_old_1.log", "log_mis_disk_old_2.log", "log_mis_disk_size.log"])
+
+    def test_flight_recorder_keeps_last_records(self):
+        recorder = FlightRecorderHandler(capacity=3)
+        mis_logger = MISLogger('test_flight_recorder', logging.DEBUG)
+        mis_logger.addHandler(recorder)
+        for i in range(5):
+            mis_logger.debug('debug record %d', i)
+        self.assertEqual([record.getMessage() for record in recorder.snapshot()],
+                         ['debug record 2', 'debug record 3', 'debug record 4'])
+
+        path = recorder.dump(self.temp_log_dir, 'test dump')
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o440)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], 'Flight recorder dump of 3 records: test dump')
+        self.assertTrue(lines[-1].endswith('test_flight_recorder_keeps_last_records: debug record 4'))
+        # Automatic dumps are skipped within the minimum interval
+        self.assertIsNone(recorder.dump(self.temp_log_dir, 'too soon', min_interval_in_sec=60))
+        with self.assertRaises(ValueError):
+            FlightRecorderHandler(capacity=0)
+
+    def test_mis_logger_resolves_caller(self):
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        mis_logger = MISLogger('test_mis_logger', logging.INFO)
+        mis_logger.addHandler(handler)
+        EnhancedLogger(mis_logger).info('resolve caller')
+        mis_logger.info('resolve caller with stacklevel', stacklevel=1)
+        self.assertEqual(len(records), 2)
+        for record in records:
+            self.assertEqual(record.filename, 'test_log.py')
+            self.assertEqual(record.funcName, 'test_mis_logger_resolves_caller')
+
+    def test_mis_logger_is_a_standard_logger(self):
+        standard_logger = logging.getLogger('test_standard_logger')
+        self.assertNotIsInstance(standard_logger, MISLogger)
+        # A logger created by logging.getLogger before becomes the MIS logger
+        self.assertIs(_get_mis_logger('test_standard_logger'), standard_logger)
+        self.assertIsInstance(standard_logger, MISLogger)
+        mis_logger = _get_mis_logger('test_logging_disable')
+        self.assertIs(logging.getLogger('test_logging_disable'), mis_logger)
+        self.assertNotIsInstance(logging.getLogger('test_other_library'), MISLogger)
+        mis_logger.setLevel(logging.DEBUG)
+        logging.disable(logging.INFO)
+        try:
+            self.assertFalse(mis_logger.isEnabledFor(logging.INFO))
+            self.assertTrue(mis_logger.isEnabledFor(logging.WARNING))
+        finally:
+            logging.disable(logging.NOTSET)
+        self.assertTrue(mis_logger.isEnabledFor(logging.INFO))
+
+    def test_enhanced_logger_lazy_args(self):
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        mis_logger = MISLogger('test_lazy_args', logging.INFO)
+        mis_logger.addHandler(handler)
+        formatted = MagicMock()
+        formatted.__str__.return_value = 'formatted'
+        enhanced_logger = EnhancedLogger(mis_logger)
+        enhanced_logger.debug('not enabled: %s', formatted)
+        formatted.__str__.assert_not_called()
+        enhanced_logger.info('param %s: %d', 'top_k\n\rinjected', 3)
+        self.assertEqual([record.getMessage() for record in records], ['param top_k injected: 3'])
+        with self.assertRaises(TypeError):
+            enhanced_logger.debug(None)
+
+    def test_async_log_writer_drop_policy(self):
+        release = threading.Event()
+        written = []
+        handler = MagicMock()
+        handler.write_record.side_effect = lambda record: (release.wait(5), written.append(record.msg))
+        operation_handler = MagicMock()
+        writer = AsyncLogWriter(queue_size=1, overflow_policy="drop")
+        with patch('mis.logger._LOG_HANDLER_REGISTRY.file_handlers', return_value=[operation_handler]):
+            for index in range(5):
+                writer.submit(handler, logging.makeLogRecord({"msg": f"record {index}"}))
+                time.sleep(0.05)
+            release.set()
+            self.assertTrue(writer.flush())
+            writer.stop()
+        # One record is being written, one is queued and the rest are dropped and reported
+        self.assertEqual(written, ["record 0", "3 log records were dropped because the log queue is full",
+                                   "record 1"])
+        # The drops are also reported in the operation log
+        self.assertEqual([call.args[0].msg for call in operation_handler.write_record.call_args_list],
+                         ["3 log records were dropped because the log queue is full"])
+
+    def test_async_log_writer_never_drops_operation_records(self):
+        release = threading.Event()
+        written = []
+        handler = MagicMock()
+        handler.log_type = LogType.OPERATION
+        handler.write_record.side_effect = lambda record: (release.wait(5), written.append(record.msg))
+        writer = AsyncLogWriter(queue_size=1, overflow_policy="drop")
+        # The queue is full after two records, further operation records wait for room
+        submitter = threading.Thread(target=lambda: [
+            writer.submit(handler, logging.makeLogRecord({"msg": f"record {index}"})) for index in range(5)])
+        submitter.start()
+        time.sleep(0.1)
+        self.assertTrue(submitter.is_alive())
+        release.set()
+        submitter.join(5)
+        writer.stop()
+        self.assertEqual(written, [f"record {index}" for index in range(5)])
+        self.assertEqual(writer.dropped, 0)
+
+    def test_async_log_writer_block_policy(self):
+        written = []
+        handler = MagicMock()
+        handler.write_record.side_effect = lambda record: written.append(record.msg)
+        writer = AsyncLogWriter(queue_size=1, overflow_policy="block")
+        for index in range(20):
+            writer.submit(handler, logging.makeLogRecord({"msg": f"record {index}"}))
+        writer.stop()
+        self.assertEqual(written, [f"record {index}" for index in range(20)])
+        self.assertEqual(writer.dropped, 0)
+
+    def test_async_log_writer_invalid_config(self):
+        with self.assertRaises(ValueError):
+            AsyncLogWriter(queue_size=0, overflow_policy="drop")
+        with self.assertRaises(ValueError):
+            AsyncLogWriter(queue_size=1, overflow_policy="wait")
+
     def test_filter_invalid_chars_no_invalid_chars(self):
         # Test case for no invalid characters
         message = "This is a test message."
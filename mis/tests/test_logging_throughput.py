@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import os
+import tempfile
+import unittest
+
+from mis.benchmarks.logging_throughput import LEVELS, bench_rotating_file_handler, run
+
+
+class TestLoggingThroughput(unittest.TestCase):
+    """Test the logging benchmark"""
+
+    def test_rotating_file_handler_rolls_over(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = bench_rotating_file_handler(os.path.join(directory, "log"), 200, 1, max_bytes=4096)
+        self.assertEqual(results["no_rollover"]["rollovers"], 0)
+        self.assertGreater(results["rollover"]["rollovers"], 0)
+
+    def test_run_reports_levels_over_budget(self):
+        results = run(records=200, rounds=1, max_disabled_ns=0.0)
+        self.assertEqual(set(results["results"]["enabled"]), set(LEVELS))
+        self.assertEqual(sorted(results["over_budget"]), sorted(LEVELS))
+        self.assertEqual(run(records=200, rounds=1)["over_budget"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import unittest
+
+from mis.benchmarks.middleware_overhead import build_body, run
+
+
+class TestMiddlewareOverhead(unittest.TestCase):
+    """Test the in-process middleware benchmark"""
+
+    def test_build_body(self):
+        body = build_body(4, 16)
+        self.assertEqual([message["role"] for message in body["messages"]], ["assistant", "user"] * 2)
+        self.assertEqual(body["messages"][-1]["content"], "x" * 16)
+
+    def test_run(self):
+        results = run(requests=2, rounds=1, cases=["restrict_host", "rate_limit"])
+        self.assertEqual(list(results["middleware"]), ["baseline", "restrict_host", "rate_limit"])
+        for case_results in results["middleware"].values():
+            self.assertEqual(set(case_results), {"small", "medium", "large"})
+            self.assertEqual(set(case_results["small"]),
+                             {"us_per_request", "overhead_us", "peak_bytes", "retained_bytes"})
+        self.assertEqual(results["middleware"]["baseline"]["large"]["overhead_us"], 0.0)
+        self.assertGreater(results["validation"]["large"]["us_per_request"], 0)
+        with self.assertRaises(ValueError):
+            run(requests=2, rounds=1, cases=["unknown"])
+
+
+if __name__ == '__main__':
+    unittest.main()
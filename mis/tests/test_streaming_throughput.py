@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import asyncio
+import json
+import unittest
+
+from mis.benchmarks.streaming_throughput import build_app, build_chunks, consume_stream, run
+
+
+class TestStreamingThroughput(unittest.TestCase):
+    """Test the streaming path benchmark"""
+
+    def test_build_chunks(self):
+        chunks = build_chunks(4, stop_reason="final")
+        self.assertEqual(len(chunks), 7)
+        self.assertEqual(chunks[-1], "data: [DONE]\n\n")
+        self.assertEqual(["stop_reason" in chunk for chunk in chunks[:-1]], [False] * 5 + [True])
+        self.assertTrue(all("stop_reason" in chunk for chunk in build_chunks(4)[:-1]))
+        with self.assertRaises(ValueError):
+            build_chunks(4, stop_reason="none")
+
+    def test_align_mode_removes_stop_reason(self):
+        body = []
+        status, received = asyncio.run(consume_stream(build_app(build_chunks(3), "align"), body))
+        self.assertEqual((status, received), (200, 6))
+        content = json.loads(body[1].decode()[len("data: "):])
+        self.assertNotIn("stop_reason", content["choices"][0])
+
+    def test_run(self):
+        results = run([1, 3], tokens=2, rounds=1)
+        self.assertEqual(set(results["results"]), {"align", "passthrough"})
+        self.assertEqual(set(results["results"]["align"]), {"1", "3"})
+        self.assertGreater(results["results"]["passthrough"]["3"]["chunks_per_sec"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,11 +17,17 @@ MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
 See the Mulan PSL v2 for more details.
 -------------------------------------------------------------------------
 """
+import logging
 import os
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from fastapi import Request
+from mis.utils.logger_utils import NewLineFormatter
+from mis.utils.profiler import SamplingProfiler
+from mis.utils.startup_timing import StartupTimer
 from mis.utils.utils import get_client_ip, ConfigChecker
 
 
@@ -104,3 +110,72 @@ class TestGetClientIP(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+class TestNewLineFormatter(unittest.TestCase):
+
+    def test_format(self):
+        formatter = NewLineFormatter("%(levelname)s: %(message)s")
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "single line", None, None)
+        self.assertEqual(formatter.format(record), "INFO: single line")
+        # Continuation lines are prefixed like the first one
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "first\nsecond", None, None)
+        self.assertEqual(formatter.format(record), "INFO: first\r\nINFO: second")
+
+
+class TestSamplingProfiler(unittest.TestCase):
+
+    def test_collapsed_stacks_of_profiled_thread(self):
+        stop = threading.Event()
+
+        def busy_worker():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=busy_worker)
+        worker.start()
+        try:
+            profiler = SamplingProfiler(0.001, [worker.ident])
+            profiler.run(0.2)
+        finally:
+            stop.set()
+            worker.join()
+        self.assertGreater(profiler.samples, 0)
+        stacks = dict(line.rsplit(" ", 1) for line in profiler.collapsed().splitlines())
+        worker_label = f"busy_worker (test_utils.py:{busy_worker.__code__.co_firstlineno})"
+        self.assertTrue(any(stack.endswith(worker_label) for stack in stacks))
+        self.assertTrue(all(int(count) > 0 for count in stacks.values()))
+        # Only the profiled thread is sampled
+        self.assertNotIn("test_collapsed_stacks_of_profiled_thread", profiler.collapsed())
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            SamplingProfiler(0)
+
+class TestStartupTimer(unittest.TestCase):
+
+    def test_report_phases_once(self):
+        timer = StartupTimer()
+        with timer.phase("prepare.step"):
+            time.sleep(0.01)
+        timer.lap("prepare")
+        time.sleep(0.03)
+        timer.lap("engine_build")
+        with patch("mis.utils.startup_timing.logger") as mock_logger:
+            report = timer.report()
+            self.assertIsNone(timer.report())
+        mock_logger.info.assert_called_once()
+        self.assertTrue(mock_logger.info.call_args[0][0].startswith('Startup report: {"total_in_sec": '))
+        self.assertEqual(list(report["phases"]), ["prepare.step", "prepare", "engine_build"])
+        self.assertEqual(report["slowest_phase"], "engine_build")
+        self.assertGreaterEqual(report["total_in_sec"], report["phases"]["prepare"] + report["phases"]["engine_build"])
+
+    def test_anchor_covers_the_process_start(self):
+        timer = StartupTimer()
+        timer.lap("import")
+        timer.anchor(time.time() - 2)
+        with patch("mis.utils.startup_timing.logger"):
+            report = timer.report()
+        self.assertEqual(list(report["phases"]), ["process_start", "import"])
+        self.assertAlmostEqual(report["phases"]["process_start"], 2, delta=0.1)
+        self.assertGreaterEqual(report["total_in_sec"], 2)
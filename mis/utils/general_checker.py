@@ -17,6 +17,7 @@ MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
 See the Mulan PSL v2 for more details.
 -------------------------------------------------------------------------
 """
+import math
 import os
 import re
 import stat
@@ -88,6 +89,26 @@ class GeneralChecker:
         if valid_values is not None and all([num != valid_value for valid_value in valid_values]):
             raise ValueError(f"ENV {name} not in {valid_values}")
 
+    @staticmethod
+    def check_float(name: str, num: float, min_value: float = None, max_value: float = None) -> None:
+        """Check the range of a float value.
+        Args:
+            name (str): The name of the environment variable.
+            num (float): The float value to check.
+            min_value (float, optional): The minimum allowed value. Defaults to None.
+            max_value (float, optional): The maximum allowed value. Defaults to None.
+        Raises:
+            ValueError: If the value is NaN.
+            ValueError: If the value is less than the minimum allowed value.
+            ValueError: If the value is greater than the maximum allowed value.
+        """
+        if math.isnan(num):
+            raise ValueError(f"ENV {name} is NaN")
+        if min_value is not None and min_value > num:
+            raise ValueError(f"ENV {name} less than {min_value}")
+        if max_value is not None and max_value < num:
+            raise ValueError(f"ENV {name} greater than {max_value}")
+
     @staticmethod
     def check_str_in(name: str, value: str, valid_values: Tuple[str] = None) -> None:
         """Check the validity of a string value.
@@ -30,7 +30,7 @@ class NewLineFormatter(logging.Formatter):
         if not isinstance(record, logging.LogRecord):
             raise TypeError(f"Record must be a logging.LogRecord, got {type(record)}")
         msg = super().format(record)
-        if record.message != "":
-            parts = msg.split(record.message)
-            msg = msg.replace("\n", "\r\n" + parts[0])
+        if record.message != "" and "\n" in msg:
+            prefix = msg.partition(record.message)[0]
+            msg = msg.replace("\n", "\r\n" + prefix)
         return msg
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import os
+import tracemalloc
+from collections import deque
+from typing import Dict, List, Optional
+
+from mis.logger import init_logger, LogType
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+
+# Allocations of the import machinery and of tracemalloc itself are noise in every report
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+_SIZED_TYPES = (dict, list, tuple, set, frozenset, deque)
+# Values whose items are summed as "name[*]", tuples are records like (count, timestamp) rather than collections
+_COLLECTION_TYPES = (dict, list, set, frozenset, deque)
+
+
+def get_rss_bytes() -> Optional[int]:
+    """
+    Read the resident set size of the current process.
+    Returns:
+        Optional[int]: The resident set size in bytes, None if it cannot be read on this platform.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def container_sizes(obj: object, depth: int = 1) -> Dict[str, int]:
+    """
+    Measure the containers held in the attributes of an object, e.g. the per client dicts of a middleware.
+    Args:
+        obj (object): The object to inspect.
+        depth (int): How many levels of MIS objects held in attributes are inspected as well.
+    Returns:
+        Dict[str, int]: Number of items per container attribute, nested attributes are named "outer.inner" and
+                        dicts of collections also report their total number of items as "name[*]".
+    """
+    sizes = {}
+    attributes = vars(obj) if hasattr(obj, "__dict__") else {}
+    for name, value in attributes.items():
+        if isinstance(value, _SIZED_TYPES):
+            sizes[name] = len(value)
+            if isinstance(value, dict) and value and all(isinstance(item, _COLLECTION_TYPES) for item in value.values()):
+                sizes[f"{name}[*]"] = sum(len(item) for item in value.values())
+        elif depth > 0 and type(value).__module__.startswith("mis.") and hasattr(value, "__dict__"):
+            for nested_name, size in container_sizes(value, depth - 1).items():
+                sizes[f"{name}.{nested_name}"] = size
+    return sizes
+
+
+def _format_stat(stat) -> Dict:
+    entry = {
+        "site": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+class MemoryDiagnostics:
+    """Allocation tracking of the process with tracemalloc.
+
+    Tracing slows down every allocation, so it only runs between `start` and `stop`. Starting takes a baseline
+    snapshot, reports list the top allocation sites of a new snapshot and their growth since the baseline, which
+    can be moved forward with `take_baseline`, e.g. once the service is warmed up.
+    """
+
+    def __init__(self) -> None:
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    @staticmethod
+    def is_tracing() -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int) -> None:
+        """
+        Start tracing allocations and take the baseline snapshot.
+        Args:
+            frames (int): Frames stored per allocation traceback.
+        """
+        if tracemalloc.is_tracing():
+            logger.error("tracemalloc is already tracing.")
+            raise RuntimeError("tracemalloc is already tracing.")
+        tracemalloc.start(frames)
+        self.take_baseline()
+        logger.info(f"tracemalloc started with {frames} frames per traceback")
+
+    def stop(self) -> None:
+        """Stop tracing allocations and drop the baseline, the traces are freed."""
+        self._baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+
+    def take_baseline(self) -> None:
+        """Take the snapshot later reports are compared to."""
+        if not tracemalloc.is_tracing():
+            logger.error("tracemalloc is not tracing.")
+            raise RuntimeError("tracemalloc is not tracing.")
+        self._baseline = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def report(self, limit: int, group_by: str) -> Dict:
+        """
+        Report the top allocation sites, blocking the calling thread while the snapshot is taken.
+        Args:
+            limit (int): Allocation sites reported per list.
+            group_by (str): How allocations are grouped, "lineno", "filename" or "traceback".
+        Returns:
+            Dict: The traced memory, the top allocation sites and the top growing sites since the baseline.
+        """
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        report = {
+            "tracing": True,
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "top": [_format_stat(stat) for stat in snapshot.statistics(group_by)[:limit]],
+        }
+        baseline = self._baseline
+        if baseline is not None:
+            growth: List = [stat for stat in snapshot.compare_to(baseline, group_by) if stat.size_diff > 0]
+            report["growth"] = [_format_stat(stat) for stat in growth[:limit]]
+        return report
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from mis.logger import init_logger, LogType
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Sampling profiler of the Python stacks of running threads.
+
+    The stacks of the profiled threads are read with `sys._current_frames` every `interval_in_sec` and counted
+    per distinct stack, so the profiled code runs unmodified and the overhead is one stack walk per sample.
+    The result is rendered in the collapsed stack format read by flame graph tools, e.g.
+    "_run_once (base_events.py:1845);dispatch (middleware.py:700) 42".
+    """
+
+    def __init__(self, interval_in_sec: float, thread_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Initialize the profiler.
+        Args:
+            interval_in_sec (float): Interval between two samples.
+            thread_ids (Iterable[int]): Identifiers of the profiled threads. Default is every thread but the
+                                        sampling one.
+        """
+        if not isinstance(interval_in_sec, (int, float)) or interval_in_sec <= 0:
+            logger.error(f"interval_in_sec of profiler must be positive, got {interval_in_sec}")
+            raise ValueError(f"interval_in_sec of profiler must be positive, got {interval_in_sec}")
+        self.interval_in_sec = interval_in_sec
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        # Labels of code objects, computed once per code object
+        self._labels: Dict[object, str] = {}
+
+    def run(self, duration_in_sec: float) -> None:
+        """
+        Sample the profiled threads for a duration, blocking the calling thread.
+        Args:
+            duration_in_sec (float): How long to sample.
+        """
+        sampler_id = threading.get_ident()
+        deadline = time.monotonic() + duration_in_sec
+        next_sample = time.monotonic()
+        while next_sample < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                self._stacks[self._collect(frame)] += 1
+            self.samples += 1
+            next_sample += self.interval_in_sec
+            delay = next_sample - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Sampling fell behind, skip the missed samples instead of catching up in a burst
+                next_sample = time.monotonic()
+
+    def collapsed(self) -> str:
+        """
+        Render the sampled stacks in the collapsed stack format, outermost frame first and most frequent first.
+        Returns:
+            str: One "frame;frame;frame count" line per distinct stack.
+        """
+        lines = []
+        for stack, count in self._stacks.most_common():
+            lines.append(";".join(self._label(code) for code in stack) + f" {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    @staticmethod
+    def _collect(frame) -> Tuple:
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        return tuple(codes)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _frame_label(code)
+        return label
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+-------------------------------------------------------------------------
+This file is part of the Mind Inference Service project.
+Copyright (c) 2025 Huawei Technologies Co.,Ltd.
+
+Mind Inference Service is licensed under Mulan PSL v2.
+You can use this software according to the terms and conditions of the Mulan PSL v2.
+You may obtain a copy of Mulan PSL v2 at:
+
+         http://license.coscl.org.cn/MulanPSL2
+
+THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND,
+EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT,
+MERCHANTABILITY OR FIT FOR A PARTICULAR PURPOSE.
+See the Mulan PSL v2 for more details.
+-------------------------------------------------------------------------
+"""
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from mis.logger import init_logger, LogType
+
+logger = init_logger(__name__, log_type=LogType.SERVICE)
+
+
+class StartupTimer:
+    """Timer of the cold start phases of the service process.
+
+    The top level phases run one after another, `lap` ends the current phase at the end of the previous one, so
+    together they cover the whole startup. Steps inside a phase are timed with `phase` and reported under the name
+    of the enclosing phase, e.g. "environment_preparation.model_path". The timer starts when it is created, so
+    importing this module first lets the "import" lap cover the module imports of the process. `anchor` moves the
+    start back to the creation of the process that started the service, covering the interpreter startups too.
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self._last_lap = self.start
+        self._reported = False
+
+    def anchor(self, started_at: float) -> None:
+        """
+        Start the timer when the service process was created, the time until the timer was created is reported as
+        the "process_start" phase.
+        Args:
+            started_at (float): The creation time of the process as seconds since the epoch, like `time.time()`.
+        """
+        elapsed = max(time.time() - started_at, 0.0) - (time.perf_counter() - self.start)
+        if elapsed <= 0:
+            return
+        self.start -= elapsed
+        self.phases = {"process_start": elapsed, **self.phases}
+
+    def lap(self, name: str) -> float:
+        """
+        End a top level phase, it started when the previous one ended.
+        Args:
+            name (str): The name of the phase.
+        Returns:
+            float: The duration of the phase in seconds.
+        """
+        now = time.perf_counter()
+        self.phases[name] = now - self._last_lap
+        self._last_lap = now
+        return self.phases[name]
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a step inside a top level phase.
+        Args:
+            name (str): The name of the step, including the name of its phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def report(self) -> Optional[Dict]:
+        """
+        Log the startup report once, as one JSON line in the service log.
+        Returns:
+            Optional[Dict]: The report, None if it was already reported.
+        """
+        if self._reported:
+            return None
+        self._reported = True
+        top_level = {name: duration for name, duration in self.phases.items() if "." not in name}
+        report = {
+            "total_in_sec": round(time.perf_counter() - self.start, 3),
+            "slowest_phase": max(top_level, key=top_level.get) if top_level else None,
+            "phases": {name: round(duration, 3) for name, duration in self.phases.items()},
+        }
+        logger.info(f"Startup report: {json.dumps(report)}")
+        return report
+
+
+STARTUP_TIMER = StartupTimer()